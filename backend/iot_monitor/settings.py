@@ -128,6 +128,31 @@ if MYSQL_LOCAL_INFILE:
     DATABASES["default"]["OPTIONS"]["local_infile"] = 1
 
 ENABLE_MYSQL_LOAD_DATA = os.getenv("ENABLE_MYSQL_LOAD_DATA", "0") == "1"
+# weeklyresult 导入模式：replace（按来源删除后全量重建）/ diff（按行哈希差异写入）
+WEEKLY_RESULT_IMPORT_MODE = os.getenv("WEEKLY_RESULT_IMPORT_MODE", "replace")
+# 多个 weeklyresult 来源同时有新文件时的并行导入数（1 为串行）
+WEEKLY_RESULT_IMPORT_WORKERS = int(os.getenv("WEEKLY_RESULT_IMPORT_WORKERS", "1"))
+# ORM 导入时每次读取的 CSV 行数，决定导入过程的内存峰值
+WEEKLY_RESULT_IMPORT_CHUNK_SIZE = int(os.getenv("WEEKLY_RESULT_IMPORT_CHUNK_SIZE", "20000"))
+# 非 UTF-8 源 CSV 转码副本的缓存目录（为空时使用系统临时目录）
+CSV_SOURCE_CACHE_DIR = os.getenv("CSV_SOURCE_CACHE_DIR", "")
+# weeklyresult 目录索引的最长复用时间（秒）；目录 mtime 变化时立即重新扫描
+WEEKLY_RESULT_SCAN_TTL = int(os.getenv("WEEKLY_RESULT_SCAN_TTL", "300"))
+# 组件 / 快照关键词搜索是否使用 FULLTEXT ngram 索引（仅 MySQL）
+KEYWORD_SEARCH_FULLTEXT = os.getenv("KEYWORD_SEARCH_FULLTEXT", "1") == "1"
+# 与 MySQL 服务端 ngram_token_size 保持一致，更短的关键词退回 LIKE 匹配
+KEYWORD_SEARCH_NGRAM_SIZE = int(os.getenv("KEYWORD_SEARCH_NGRAM_SIZE", "2"))
+# 只读机器人接口（组统计、筛选项、最后同步时间等）的响应缓存时间（秒），0 表示不缓存
+ROBOT_RESPONSE_CACHE_TTL = int(os.getenv("ROBOT_RESPONSE_CACHE_TTL", "300"))
+# 组件批量编辑接口单次允许的最大条数
+ROBOT_BULK_UPDATE_MAX_ITEMS = int(os.getenv("ROBOT_BULK_UPDATE_MAX_ITEMS", "500"))
+# 组件编辑后 robot_config CSV 后台回写的合并窗口（秒），窗口内的编辑按文件合并为一次写入
+ROBOT_CSV_WRITEBACK_DELAY = int(os.getenv("ROBOT_CSV_WRITEBACK_DELAY", "5"))
+# 单个 CSV 回写锁的持有 / 等待上限（秒）
+ROBOT_CSV_WRITEBACK_LOCK_TIMEOUT = int(os.getenv("ROBOT_CSV_WRITEBACK_LOCK_TIMEOUT", "60"))
+# 回写失败（写入异常或找不到目标 CSV）的组件重新入队的次数上限与重试间隔（秒）
+ROBOT_CSV_WRITEBACK_MAX_RETRIES = int(os.getenv("ROBOT_CSV_WRITEBACK_MAX_RETRIES", "5"))
+ROBOT_CSV_WRITEBACK_RETRY_DELAY = int(os.getenv("ROBOT_CSV_WRITEBACK_RETRY_DELAY", "60"))
 
 
 # Password validation
@@ -197,7 +222,7 @@ REST_FRAMEWORK = {
 # CORS 配置
 CORS_ALLOW_ALL_ORIGINS = True  # 开发环境允许所有来源
 CORS_ALLOW_CREDENTIALS = True
-CORS_EXPOSE_HEADERS = ["X-Server-File-Path", "Content-Disposition"]
+CORS_EXPOSE_HEADERS = ["X-Server-File-Path", "Content-Disposition", "ETag"]
 
 # CORS_ALLOWED_ORIGINS = [
 #     "http://localhost:3000",
@@ -234,6 +259,21 @@ CELERY_TIMEZONE = TIME_ZONE
 BI_BOKEH_USE_SERVER = os.getenv("BI_BOKEH_USE_SERVER", "1") == "1"
 BI_BOKEH_SERVER_PORT = int(os.getenv("BI_BOKEH_SERVER_PORT", "5008"))
 BI_BOKEH_SERVER_URL = (os.getenv("BI_BOKEH_SERVER_URL") or "").strip() or None
+# BI 图表的 program 列表与按 program 过滤下推到 MySQL，只读取所选 program 的行
+BI_SQL_PUSHDOWN = os.getenv("BI_SQL_PUSHDOWN", "1") == "1"
+# BI DataFrame 进程内 LRU 缓存（robots/df_cache.py），每个进程一份
+BI_DF_CACHE_MAX_BYTES = int(os.getenv("BI_DF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+BI_DF_CACHE_MAX_ENTRIES = int(os.getenv("BI_DF_CACHE_MAX_ENTRIES", "64"))
+BI_DF_CACHE_TTL = int(os.getenv("BI_DF_CACHE_TTL", "600"))
+BI_DF_CACHE_SWEEP_INTERVAL = int(os.getenv("BI_DF_CACHE_SWEEP_INTERVAL", "60"))
+# SG 时序库共享连接池（robots/sg_engine.py），每个进程一份
+SG_DB_POOL_SIZE = int(os.getenv("SG_DB_POOL_SIZE", "5"))
+SG_DB_POOL_MAX_OVERFLOW = int(os.getenv("SG_DB_POOL_MAX_OVERFLOW", "10"))
+SG_DB_POOL_TIMEOUT = int(os.getenv("SG_DB_POOL_TIMEOUT", "30"))
+SG_DB_POOL_RECYCLE = int(os.getenv("SG_DB_POOL_RECYCLE", "3600"))
+SG_DB_CONNECT_TIMEOUT = int(os.getenv("SG_DB_CONNECT_TIMEOUT", "10"))
+SG_DB_READ_TIMEOUT = int(os.getenv("SG_DB_READ_TIMEOUT", "300"))
+SG_DB_WRITE_TIMEOUT = int(os.getenv("SG_DB_WRITE_TIMEOUT", "300"))
 CELERY_BEAT_SCHEDULE = {
     'auto-sync-robot-data-daily': {
         'task': 'robots.tasks.auto_sync_robot_data',
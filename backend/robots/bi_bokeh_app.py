@@ -20,9 +20,11 @@ from bokeh.models import (
     Spacer,
 )
 from bokeh.plotting import figure
-from sqlalchemy import create_engine
 
-from .bokeh_charts import AXIS_CONFIG, get_db_engine
+from .bokeh_charts import (
+    AXIS_CONFIG, BI_DROP_COLUMNS, bi_dedup_columns, bi_fetch_columns, bi_loaded_axes, get_db_engine,
+)
+from .sg_engine import get_sg_engine
 
 logger = logging.getLogger(__name__)
 
@@ -127,13 +129,28 @@ def _parse_range(start_value: str, end_value: str) -> tuple[datetime | None, dat
     return start_time, end_time
 
 
-def fetch_data_from_mysql(table_name: str, start_time: datetime, end_time: datetime, engine, time_column: str = "Timestamp"):
+def fetch_data_from_mysql(
+    table_name: str,
+    start_time: datetime,
+    end_time: datetime,
+    engine,
+    time_column: str = "Timestamp",
+    columns=None,
+):
+    select_cols = ", ".join(f"`{col}`" for col in columns) if columns else "*"
     query = (
-        f"SELECT * FROM `{table_name}` "
+        f"SELECT {select_cols} FROM `{table_name}` "
         f"WHERE `{time_column}` BETWEEN '{start_time.strftime('%Y-%m-%d %H:%M:%S')}' "
         f"AND '{end_time.strftime('%Y-%m-%d %H:%M:%S')}';"
     )
-    return pd.read_sql(query, engine)
+    try:
+        return pd.read_sql(query, engine)
+    except Exception as exc:
+        if not columns:
+            raise
+        # 个别表缺少某些列时退回 SELECT *
+        logger.warning("[BI LOAD] Column fetch failed, falling back to SELECT *: %s", exc)
+        return fetch_data_from_mysql(table_name, start_time, end_time, engine, time_column=time_column)
 
 
 def _preprocess_df(df: "pd.DataFrame") -> "pd.DataFrame":
@@ -143,21 +160,20 @@ def _preprocess_df(df: "pd.DataFrame") -> "pd.DataFrame":
         # 保留 columns，避免后续 KeyError
         return df
 
-    # 与 Digitaltwin_timefree.py 一致：直接删除并去重
-    del df["A1_marker"], df["A2_marker"], df["A3_marker"], df["A4_marker"], df["A5_marker"], df["A6_marker"], df["A7_marker"], df["SUB"]
-    df = df.drop_duplicates()
+    # SELECT * 时删除 marker / SUB 列（按列读取时不包含），然后按固定的列集合去重，
+    # 裁剪列或补齐轴明细后行数保持一致
+    drop_columns = [col for col in BI_DROP_COLUMNS if col in df.columns]
+    if drop_columns:
+        df = df.drop(columns=drop_columns)
+    df = df.drop_duplicates(subset=bi_dedup_columns(df) or None)
 
     df["Time"] = pd.to_datetime(df["Timestamp"]) + timedelta(hours=8)
     df["Timestamp"] = df["Time"].astype(str)
     df["SNR_C"] = df["SNR_C"].astype(int)
 
-    df["AxisP1"] = df["AxisP1"].astype(float)
-    df["AxisP2"] = df["AxisP2"].astype(float)
-    df["AxisP3"] = df["AxisP3"].astype(float)
-    df["AxisP4"] = df["AxisP4"].astype(float)
-    df["AxisP5"] = df["AxisP5"].astype(float)
-    df["AxisP6"] = df["AxisP6"].astype(float)
-    df["AxisP7"] = df["AxisP7"].astype(float)
+    for cfg in AXIS_CONFIG.values():
+        if cfg["axisp"] in df.columns:
+            df[cfg["axisp"]] = df[cfg["axisp"]].astype(float)
 
     return df
 
@@ -247,15 +263,9 @@ def bkapp(doc):
 
     # === 数据库连接（与项目一致：SG_DB_*）===
     db_config = get_db_engine()
-    engine = create_engine(
-        f"mysql+pymysql://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}",
-        pool_recycle=3600,  # 1小时回收连接，避免 MySQL wait_timeout 断开
-        pool_pre_ping=True,  # 使用连接前检查有效性
-        connect_args={
-            "connect_timeout": 60,  # 连接超时 60 秒
-            "read_timeout": 300,    # 读超时 5 分钟
-            "write_timeout": 300,   # 写超时 5 分钟
-        }
+    # 各会话共享进程内连接池（pool_recycle / pool_pre_ping / 超时见 sg_engine）
+    engine = get_sg_engine(
+        f"mysql+pymysql://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}"
     )
 
     # === 时间范围（与 Digitaltwin_timefree.py 一致：默认最近7天；日期入参覆盖整天）===
@@ -280,9 +290,17 @@ def bkapp(doc):
         )
         return doc
 
-    # === 首次拉取数据 ===
+    # === 首次拉取数据：全部轴的电流/上下限 + 默认轴明细列，其余轴切换时再补齐 ===
     logger.info(f"[BI LOAD] Fetching data from database...")
-    df = fetch_data_from_mysql(table_name, start_time, end_time, engine, time_column="Timestamp")
+    default_axis = axis_arg if axis_arg in AXIS_CONFIG else "A1"
+    df = fetch_data_from_mysql(
+        table_name,
+        start_time,
+        end_time,
+        engine,
+        time_column="Timestamp",
+        columns=bi_fetch_columns([default_axis]),
+    )
     if df is None or df.empty:
         logger.warning(f"[BI LOAD] No data found for table={table_name}")
         _render_empty_state(
@@ -301,7 +319,6 @@ def bkapp(doc):
 
     c_opt = df["Name_C"].unique().tolist() if not df.empty and "Name_C" in df.columns else []
     default_program = program_arg if program_arg and program_arg in c_opt else (c_opt[0] if c_opt else "")
-    default_axis = axis_arg if axis_arg in AXIS_CONFIG else "A1"
 
     deft = df[df["Name_C"] == default_program] if default_program else df
     if deft is None or deft.empty:
@@ -564,6 +581,28 @@ def bkapp(doc):
 
     program_select.on_change("value", _update_program)
 
+    # === 轴切换到未加载明细列的轴：补读该轴的列后重算当前 program ===
+    def _ensure_axis_columns(attr, old, new):
+        nonlocal df
+        loaded_axes = bi_loaded_axes(df)
+        if new not in AXIS_CONFIG or new in loaded_axes:
+            return
+        logger.info(f"[BI LOAD] Fetching detail columns for axis={new}")
+        next_df = fetch_data_from_mysql(
+            table_name,
+            start_time,
+            end_time,
+            engine,
+            time_column="Timestamp",
+            columns=bi_fetch_columns(loaded_axes + [new]),
+        )
+        if next_df is None or next_df.empty:
+            return
+        df = _preprocess_df(next_df)
+        _update_program("value", None, program_select.value)
+
+    axis_select.on_change("value", _ensure_axis_columns)
+
     logger.info(f"[BI LOAD] Creating charts and layout...")
     energy_dialog = Dialog(
         title="Energy",
@@ -17,18 +17,21 @@ from bokeh.models import (
     CustomJS, LabelSet, BoxAnnotation, Band, DatePicker, Range1d
 )
 from bokeh.plotting import figure
-from sqlalchemy import create_engine
+
+from .df_cache import DataFrameLRUCache, RangeSegmentCache
+from .sg_engine import get_sg_engine
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_RANGE_DAYS = 30
 CACHE_TTL_SECONDS = 600
 CACHE_VERSION = 2
-_LOCAL_DF_CACHE: dict[str, tuple[float, "pd.DataFrame"]] = {}
+# 进程内 DataFrame 缓存：LRU + 字节预算（BI_DF_CACHE_*），后台线程清理过期条目
+_LOCAL_DF_CACHE = DataFrameLRUCache("bi_local_df")
 
-# Program 切换内存缓存：{cache_key: (df_full, energy_full, timestamp, table_name, time_range)}
-# 用于快速切换 program，避免重新查询数据库
-_PROGRAM_DATA_CACHE: dict[str, tuple] = {}
+# Program 数据分段缓存：按 (表名, program 或 "*") 保存已读取的时间段（预处理后的 DataFrame），
+# 用于快速切换 program、缩小或平移日期范围，只为未覆盖的缺口查询数据库
+_PROGRAM_DATA_CACHE = RangeSegmentCache("bi_program_data", time_column="Time", time_offset=timedelta(hours=8))
 
 try:
     from django.core.cache import cache
@@ -37,53 +40,64 @@ except Exception:  # pragma: no cover - optional when running outside Django
 
 
 def _local_df_cache_get(key: str):
-    item = _LOCAL_DF_CACHE.get(key)
-    if not item:
-        return None
-    expires_at, df = item
-    if expires_at <= time.time():
-        _LOCAL_DF_CACHE.pop(key, None)
-        return None
-    return df
+    return _LOCAL_DF_CACHE.get(key)
 
 
 def _local_df_cache_set(key: str, df: "pd.DataFrame", ttl_seconds: int):
     try:
-        _LOCAL_DF_CACHE[key] = (time.time() + int(ttl_seconds), df)
+        _LOCAL_DF_CACHE.set(key, df, ttl_seconds=ttl_seconds)
     except Exception:
         return
 
 
 # Program 数据缓存管理（用于快速切换 program）
-def _program_data_cache_key(table_name: str, start_date: str, end_date: str) -> str:
-    """生成 program 数据缓存键"""
-    return f"program_data:{table_name}:{start_date}:{end_date}"
+def _program_data_cache_key(table_name: str, program: str | None = None) -> tuple:
+    """生成 program 数据缓存键（BI_SQL_PUSHDOWN 模式下只缓存单个 program 的数据，键中带 program）"""
+    return (table_name, program or "*")
 
 
-def _program_data_cache_get(table_name: str, start_date: str, end_date: str):
-    """从缓存获取 program 数据"""
-    key = _program_data_cache_key(table_name, start_date, end_date)
-    item = _PROGRAM_DATA_CACHE.get(key)
-    if not item:
-        return None
-    timestamp, df_full, energy_full = item
-    # 检查是否过期（10分钟）
-    if time.time() - timestamp > 600:
-        _PROGRAM_DATA_CACHE.pop(key, None)
-        return None
-    return df_full, energy_full
+def _load_program_data(table_name, start_time, end_time, time_column, engine, columns=None, program=None):
+    """
+    读取 start_time ~ end_time 内预处理后的数据，优先从分段缓存切片
 
+    与按秒 BETWEEN 查询的口径一致：起点取整到秒，终点所在的整秒都包含在内，
+    即半开区间 [start 秒, end 秒 + 1s)。只为缓存未覆盖的时间缺口查询 MySQL（过期时间见 BI_DF_CACHE_TTL）。
+    返回 (df, fetched_ranges)，fetched_ranges 为空表示完全命中缓存；查询失败时抛出异常。
+    """
+    def _fetch(gap_start, gap_end, gap_columns):
+        df = fetch_data_from_mysql(
+            table_name,
+            _format_sql_datetime(gap_start),
+            _format_sql_datetime(gap_end),
+            time_column,
+            engine,
+            columns=gap_columns,
+            program=program,
+            raise_errors=True,
+            end_exclusive=True,
+        )
+        return _preprocess_bi_dataframe(df)
 
-def _program_data_cache_set(table_name: str, start_date: str, end_date: str, df_full, energy_full):
-    """缓存 program 数据"""
-    key = _program_data_cache_key(table_name, start_date, end_date)
-    _PROGRAM_DATA_CACHE[key] = (time.time(), df_full, energy_full)
+    window_start = start_time.replace(microsecond=0)
+    window_end = end_time.replace(microsecond=0) + timedelta(seconds=1)
+    df, fetched = _PROGRAM_DATA_CACHE.get_range(
+        _program_data_cache_key(table_name, program), window_start, window_end, columns, _fetch,
+    )
+    if fetched:
+        logger.info("program 数据: 查询缺口 %s 段 %s", len(fetched),
+                    ", ".join(f"[{_format_sql_datetime(s)}, {_format_sql_datetime(e)})" for s, e in fetched))
+    return df, fetched
 
 
 def _program_data_cache_clear():
     """清空 program 数据缓存"""
     _PROGRAM_DATA_CACHE.clear()
 
+
+def bi_df_cache_stats() -> list:
+    """进程内 BI DataFrame 缓存的条目数、占用字节与命中/未命中/淘汰计数"""
+    return [_PROGRAM_DATA_CACHE.stats(), _LOCAL_DF_CACHE.stats()]
+
 # 轴配置 - A1到A7
 _TABLE_NAME_CACHE = {}  # 表名缓存 {lower_name: real_name}
 AXIS_CONFIG = {
@@ -96,6 +110,52 @@ AXIS_CONFIG = {
     'A7': {'curr': 'Curr_E1', 'max_curr': 'MAXCurr_E1', 'min_curr': 'MinCurr_E1', 'torque': 'Torque7', 'speed': 'Speed7', 'fol': 'Fol7', 'axisp': 'AxisP7'},
 }
 
+# BI 读取的公共列：时间、程序、SNR、标签、温度
+BI_BASE_COLUMNS = ('Timestamp', 'Name_C', 'SNR_C', 'P_name', 'Tem_1')
+# 聚合图需要全部轴的电流及上下限（前端切换轴时直接读取）
+BI_AGG_FIELDS = ('curr', 'max_curr', 'min_curr')
+# 明细图只用当前轴的扭矩/速度/跟随误差/位置，切换轴时再按需补齐
+BI_AXIS_DETAIL_FIELDS = ('torque', 'speed', 'fol', 'axisp')
+# SELECT * 时需要删除的列（按列读取时不会出现）
+BI_DROP_COLUMNS = ('A1_marker', 'A2_marker', 'A3_marker', 'A4_marker', 'A5_marker', 'A6_marker', 'A7_marker', 'SUB')
+
+
+def bi_fetch_columns(axes=None) -> list:
+    """
+    BI 图表需要从 SG 表读取的列
+
+    axes: 需要明细列的轴，None 表示全部轴
+    """
+    if axes is None:
+        axes = list(AXIS_CONFIG)
+    columns = list(BI_BASE_COLUMNS)
+    for config in AXIS_CONFIG.values():
+        columns.extend(config[field] for field in BI_AGG_FIELDS)
+    for axis in axes:
+        config = AXIS_CONFIG.get(axis)
+        if config:
+            columns.extend(config[field] for field in BI_AXIS_DETAIL_FIELDS)
+    return list(dict.fromkeys(columns))
+
+
+def bi_dedup_columns(df) -> list:
+    """
+    去重使用的列：基础列 + 全部轴的电流/上下限（即 bi_fetch_columns([]) 总会读取的列）
+
+    不包含按轴补读的明细列，保证列裁剪与补齐轴明细后去重结果（行数）不变。
+    """
+    return [col for col in bi_fetch_columns([]) if col in df.columns]
+
+
+def bi_loaded_axes(df) -> list:
+    """df 中已包含明细列的轴"""
+    if df is None:
+        return []
+    return [
+        axis for axis, config in AXIS_CONFIG.items()
+        if all(config[field] in df.columns for field in BI_AXIS_DETAIL_FIELDS)
+    ]
+
 
 def get_db_engine():
     """获取PROGRAM CYCLE SYNC数据库连接（仅使用SG_DB_*）"""
@@ -245,35 +305,54 @@ def get_table_time_bounds(table_name, engine, time_column: str = "Timestamp"):
             return now, now
 
 
-def fetch_data_from_mysql(table_name, start_time, end_time, time_column, engine):
-    """从MySQL获取数据 - 优化版本：直接使用表名，仅在必要时查询真实表名"""
+def _resolve_table_name(table_name, engine):
     # 直接使用传入的表名（前端现在传入正确大小写）
     # 仅当表名全为小写时才查询真实表名（向后兼容）
-    real_table_name = table_name
     if table_name == table_name.lower():
-        # 只有当表名全小写时才查询（容错机制）
-        real_table_name = get_real_table_name(table_name, engine)
+        return get_real_table_name(table_name, engine)
+    return table_name
+
+
+def fetch_data_from_mysql(
+    table_name, start_time, end_time, time_column, engine, columns=None, program=None, raise_errors=False,
+    end_exclusive=False,
+):
+    """
+    从MySQL获取数据 - 优化版本：直接使用表名，仅在必要时查询真实表名
+
+    columns: 只读取这些列（见 bi_fetch_columns），为空时 SELECT *
+    program: 只读取该 Name_C 的行（BI_SQL_PUSHDOWN 模式），为空时读取全部 program
+    raise_errors: 查询失败时抛出异常而不是返回空 DataFrame（分段缓存不能把失败记为“无数据”）
+    end_exclusive: 按半开区间 >= start AND < end 查询（分段缓存），默认 BETWEEN 闭区间
+    """
+    real_table_name = _resolve_table_name(table_name, engine)
 
-    columns = None
-    program = None
     if isinstance(time_column, dict):
         # Backward-compatible shim if older call sites pass a dict of options.
         options = time_column
         time_column = options.get("time_column", "Timestamp")
-        columns = options.get("columns")
-        program = options.get("program")
+        columns = options.get("columns") or columns
+        program = options.get("program") or program
 
     select_cols = "*"
     if columns:
         safe_cols = [str(c) for c in columns if c]
         select_cols = ", ".join(f"`{c.replace('`', '')}`" for c in safe_cols)
 
-    # 与 Digitaltwin_timefree.py 一致：使用字符串拼接，不在 SQL 层过滤 program
+    # 与 Digitaltwin_timefree.py 一致：使用字符串拼接；program 以参数绑定方式过滤
+    if end_exclusive:
+        time_filter = f"`{time_column}` >= '{start_time}' AND `{time_column}` < '{end_time}'"
+    else:
+        time_filter = f"`{time_column}` BETWEEN '{start_time}' AND '{end_time}'"
     base_sql = (
         f"SELECT {select_cols} "
         f"FROM `{real_table_name}` "
-        f"WHERE `{time_column}` BETWEEN '{start_time}' AND '{end_time}';"
+        f"WHERE {time_filter}"
     )
+    params = None
+    if program:
+        base_sql += " AND `Name_C` = %(program)s"
+        params = {"program": program}
 
     try:
         # 一次性读取数据，与 Digitaltwin_timefree.py 保持一致
@@ -286,38 +365,107 @@ def fetch_data_from_mysql(table_name, start_time, end_time, time_column, engine)
             end_time,
         )
         # 直接使用字符串 SQL，与 Digitaltwin_timefree.py 一致
-        df = pd.read_sql(base_sql, engine)
+        df = pd.read_sql(base_sql, engine, params=params)
         logger.debug("查询完成，共 %s 行", len(df))
         return df
     except Exception as e:
+        if columns:
+            # 个别表缺少某些列时退回 SELECT *
+            logger.warning("按列读取失败，改为读取全部列: %s", e)
+            return fetch_data_from_mysql(
+                table_name, start_time, end_time, time_column, engine,
+                program=program, raise_errors=raise_errors, end_exclusive=end_exclusive,
+            )
         logger.error(f"获取数据失败: {e}")
+        if raise_errors:
+            raise
         return pd.DataFrame()
 
 
+def bi_sql_pushdown_enabled() -> bool:
+    """BI_SQL_PUSHDOWN：program 列表与按 program 过滤交给 MySQL"""
+    try:
+        from django.conf import settings
+        return bool(getattr(settings, "BI_SQL_PUSHDOWN", True))
+    except Exception:
+        return False
+
+
+def fetch_program_names(table_name, start_time, end_time, engine, time_column="Timestamp") -> list:
+    """时间范围内的 program 列表，按首次出现时间排序（与 pandas unique() 的顺序一致）"""
+    real_table_name = _resolve_table_name(table_name, engine)
+    sql = (
+        f"SELECT `Name_C` FROM `{real_table_name}` "
+        f"WHERE `{time_column}` BETWEEN '{start_time}' AND '{end_time}' "
+        f"AND `Name_C` IS NOT NULL AND `Name_C` <> '' "
+        f"GROUP BY `Name_C` ORDER BY MIN(`{time_column}`)"
+    )
+    df = pd.read_sql(sql, engine)
+    return df["Name_C"].tolist() if not df.empty else []
+
+
+# SNR_C 电流分位数（groupby().quantile(interpolation='nearest')）
+BI_QUANTILE_LOW = 0.01
+BI_QUANTILE_HIGH = 0.99
+
+
+def compute_program_aggregates(prog_data: "pd.DataFrame"):
+    """
+    按 SNR_C 计算 LQ/HQ 分位数、上下限与 P_name（与 Digitaltwin_timefree.py 完全一致：直接写死列名）
+
+    prog_data 为已在内存中的该 program 明细行，聚合直接在其上计算，不再额外查询数据库，
+    去重口径与明细行一致（见 bi_dedup_columns）。
+    """
+    ref = prog_data.groupby("SNR_C")[['MAXCurr_A1','MAXCurr_A2','MAXCurr_A3','MAXCurr_A4',
+                                      'MAXCurr_A5','MAXCurr_A6','MAXCurr_E1',
+                                      'MinCurr_A1','MinCurr_A2','MinCurr_A3','MinCurr_A4',
+                                      'MinCurr_A5','MinCurr_A6','MinCurr_E1']].last()
+
+    LQ = prog_data.groupby("SNR_C")[['Curr_A1','Curr_A2','Curr_A3','Curr_A4',
+                                          'Curr_A5','Curr_A6','Curr_E1']].quantile(q=BI_QUANTILE_LOW, interpolation='nearest').rename(
+        columns={'Curr_A1': 'Curr_A1_LQ', 'Curr_A2': 'Curr_A2_LQ', 'Curr_A3': 'Curr_A3_LQ',
+                 'Curr_A4': 'Curr_A4_LQ', 'Curr_A5': 'Curr_A5_LQ', 'Curr_A6': 'Curr_A6_LQ',
+                 'Curr_E1': 'Curr_E1_LQ'})
+    HQ = prog_data.groupby("SNR_C")[['Curr_A1','Curr_A2','Curr_A3','Curr_A4',
+                                          'Curr_A5','Curr_A6','Curr_E1']].quantile(q=BI_QUANTILE_HIGH, interpolation='nearest').rename(
+        columns={'Curr_A1': 'Curr_A1_HQ', 'Curr_A2': 'Curr_A2_HQ', 'Curr_A3': 'Curr_A3_HQ',
+                 'Curr_A4': 'Curr_A4_HQ', 'Curr_A5': 'Curr_A5_HQ', 'Curr_A6': 'Curr_A6_HQ',
+                 'Curr_E1': 'Curr_E1_HQ'})
+    labeltext = prog_data.groupby("SNR_C")["P_name"].last()
+
+    # 使用 Digitaltwin_timefree.py 的 merge 方式
+    Q = pd.merge(pd.merge(pd.merge(LQ, HQ, left_on=['SNR_C'], right_index=True, how='outer'),
+                          ref, left_on=['SNR_C'], right_index=True, how='inner'),
+                 labeltext, left_on=['SNR_C'], right_index=True, how='inner').reset_index()
+
+    # 生成 x_tex（与 Digitaltwin_timefree.py 一致）
+    x_tex = prog_data["SNR_C"].sort_values(ascending=True).unique().astype(str)
+    Q["SNR_C"] = x_tex
+    return Q, x_tex
+
+
 def _preprocess_bi_dataframe(df: "pd.DataFrame") -> "pd.DataFrame":
     """数据预处理 - 完全采用 Digitaltwin_timefree.py 的方式"""
     if df is None or df.empty:
         return pd.DataFrame()
 
-    # 与 Digitaltwin_timefree.py 完全一致：直接操作，不检查
-    del df['A1_marker'], df['A2_marker'], df['A3_marker'], df['A4_marker'], \
-        df['A5_marker'], df['A6_marker'], df['A7_marker'], df['SUB']
+    # SELECT * 时去掉 marker / SUB 列；按列读取时本就不包含
+    drop_columns = [col for col in BI_DROP_COLUMNS if col in df.columns]
+    if drop_columns:
+        df = df.drop(columns=drop_columns)
 
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=bi_dedup_columns(df) or None)
 
     df['Time'] = pd.to_datetime(df['Timestamp']) + timedelta(hours=8)
     df['Timestamp'] = df['Time'].astype(str)
 
     df['SNR_C'] = df['SNR_C'].astype(int)
 
-    # 与 Digitaltwin_timefree.py 完全一致：直接转换，不循环检查
-    df['AxisP1'] = df['AxisP1'].astype(float)
-    df['AxisP2'] = df['AxisP2'].astype(float)
-    df['AxisP3'] = df['AxisP3'].astype(float)
-    df['AxisP4'] = df['AxisP4'].astype(float)
-    df['AxisP5'] = df['AxisP5'].astype(float)
-    df['AxisP6'] = df['AxisP6'].astype(float)
-    df['AxisP7'] = df['AxisP7'].astype(float)
+    # 只转换已读取的轴位置列
+    for config in AXIS_CONFIG.values():
+        axisp_col = config['axisp']
+        if axisp_col in df.columns:
+            df[axisp_col] = df[axisp_col].astype(float)
 
     return df
 
@@ -355,6 +503,13 @@ def _format_datetime(value):
     return value.strftime("%Y-%m-%d %H:%M:%S")
 
 
+def _format_sql_datetime(value):
+    """分段缓存的缺口边界：有小数秒时保留微秒，避免取整后与相邻段之间漏掉或重复行"""
+    if value.microsecond:
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return _format_datetime(value)
+
+
 def create_bi_charts(
     table_name='as33_020rb_400',
     days=None,
@@ -381,7 +536,7 @@ def create_bi_charts(
     # 创建数据库连接
     try:
         _check_cancel()
-        engine = create_engine(f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}')
+        engine = get_sg_engine(f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}')
         logger.info(f"数据库连接: {host}:{port}/{database}")
     except Exception as e:
         logger.error(f"数据库连接失败: {e}")
@@ -404,61 +559,87 @@ def create_bi_charts(
 
     logger.info("请求时间范围: %s 到 %s", start_time, end_time)
 
-    # 与 Digitaltwin_timefree.py 一致：先查全量数据，再在 Python 中过滤
-    logger.info("开始从数据库获取全量数据...")
-    fetch_start = time.perf_counter()
+    # 只读取图表用到的列：全部轴的电流/上下限 + 默认轴的明细列，其余轴切换时按需补齐
+    default_axis = axis if axis in AXIS_CONFIG else "A1"
+    fetch_columns = bi_fetch_columns([default_axis])
+    start_str = _format_datetime(start_time)
+    end_str = _format_datetime(end_time)
+
+    # BI_SQL_PUSHDOWN：先查 program 列表，只读取默认 program 的行
+    c_opt = None
+    pushdown = bi_sql_pushdown_enabled()
+    if pushdown:
+        try:
+            _check_cancel()
+            c_opt = fetch_program_names(table_name, start_str, end_str, engine, time_column)
+        except Exception as e:
+            logger.warning("查询 program 列表失败，改为读取全部 program: %s", e)
+            pushdown = False
 
-    # 构建需要的列（与 Digitaltwin_timefree.py 一致，使用 SELECT *）
-    _check_cancel()
-    df_full = fetch_data_from_mysql(
-        table_name,
-        _format_datetime(start_time),
-        _format_datetime(end_time),
-        time_column,  # 传递字符串，不使用 dict
-        engine,
-    )
-    _check_cancel()
-    logger.info("全量数据: db fetch %.3fs, 行数=%s", time.perf_counter() - fetch_start, len(df_full))
+    if pushdown:
+        logger.info("可用程序列表: %s", len(c_opt))
+        if not c_opt:
+            logger.warning("表 %s 在所选时间范围内没有数据", table_name)
+            return None, None, None, None, None
+        default_program = program if program and program in c_opt else c_opt[0]
 
-    if df_full.empty:
-        logger.warning("表 %s 在所选时间范围内没有数据", table_name)
-        return None, None, None, None, None
+        fetch_start = time.perf_counter()
+        _check_cancel()
+        try:
+            df_prog, _ = _load_program_data(
+                table_name, start_time, end_time, time_column, engine,
+                columns=fetch_columns, program=default_program,
+            )
+        except Exception as e:
+            logger.error("获取程序数据失败: %s", e)
+            df_prog = pd.DataFrame()
+        _check_cancel()
+        logger.info("程序数据: 读取+预处理 %.3fs, 行数=%s (program=%s)",
+                    time.perf_counter() - fetch_start, len(df_prog), default_program)
+        if df_prog.empty:
+            logger.warning("表 %s program=%s 没有数据", table_name, default_program)
+            return None, None, None, None, None
+    else:
+        # 与 Digitaltwin_timefree.py 一致：先查全量数据，再在 Python 中过滤
+        # 全量数据按时间段缓存在内存中，用于快速切换 program；缓存未覆盖的部分才查询数据库
+        fetch_start = time.perf_counter()
 
-    # 数据预处理
-    preprocess_start = time.perf_counter()
-    _check_cancel()
-    df_full = _preprocess_bi_dataframe(df_full)
-    _check_cancel()
-    logger.info("数据预处理: %.3fs", time.perf_counter() - preprocess_start)
+        _check_cancel()
+        try:
+            df_full, _ = _load_program_data(
+                table_name, start_time, end_time, time_column, engine, columns=fetch_columns,
+            )
+        except Exception as e:
+            logger.error("获取全量数据失败: %s", e)
+            df_full = pd.DataFrame()
+        _check_cancel()
+        logger.info("全量数据: 读取+预处理 %.3fs, 行数=%s", time.perf_counter() - fetch_start, len(df_full))
 
-    # 缓存全量数据（用于快速切换 program）
-    start_date_str = start_time.strftime('%Y-%m-%d')
-    end_date_str = end_time.strftime('%Y-%m-%d')
-    _program_data_cache_set(table_name, start_date_str, end_date_str, df_full, None)
-    logger.info("数据已缓存到内存，用于快速切换 program")
+        if df_full.empty:
+            logger.warning("表 %s 在所选时间范围内没有数据", table_name)
+            return None, None, None, None, None
 
-    # 在 Python 中获取 program 列表和过滤数据（与 Digitaltwin_timefree.py 一致）
-    _check_cancel()
-    c_opt = df_full['Name_C'].unique()
-    logger.info("可用程序列表: %s", len(c_opt))
+        # 在 Python 中获取 program 列表和过滤数据（与 Digitaltwin_timefree.py 一致）
+        _check_cancel()
+        c_opt = df_full['Name_C'].unique().tolist()
+        logger.info("可用程序列表: %s", len(c_opt))
 
-    if not c_opt:
-        logger.warning("没有 program 数据")
-        return None, None, None, None, None
+        if not c_opt:
+            logger.warning("没有 program 数据")
+            return None, None, None, None, None
 
-    # 确定默认 program / axis（与 Digitaltwin_timefree.py 一致）
-    default_program = program if program and program in c_opt else c_opt[0]
-    default_axis = axis if axis in AXIS_CONFIG else "A1"
+        # 确定默认 program（与 Digitaltwin_timefree.py 一致）
+        default_program = program if program and program in c_opt else c_opt[0]
 
-    # 在 Python 中过滤 program（与 Digitaltwin_timefree.py 一致）
-    # 直接过滤，不复制（避免大数据复制开销）
-    _check_cancel()
-    df_prog = df_full[df_full['Name_C'] == default_program]
-    logger.info("程序 %s 数据条数: %s", default_program, len(df_prog))
+        # 在 Python 中过滤 program（与 Digitaltwin_timefree.py 一致）
+        # 直接过滤，不复制（避免大数据复制开销）
+        _check_cancel()
+        df_prog = df_full[df_full['Name_C'] == default_program]
+        logger.info("程序 %s 数据条数: %s", default_program, len(df_prog))
 
-    if df_prog is None or df_prog.empty:
-        logger.warning("表 %s program=%s 没有数据", table_name, default_program)
-        return None, None, None, None, None
+        if df_prog is None or df_prog.empty:
+            logger.warning("表 %s program=%s 没有数据", table_name, default_program)
+            return None, None, None, None, None
     logger.info("加载数据条数: %s, 列数=%s (program=%s)", len(df_prog), len(df_prog.columns), default_program)
 
     # 获取能量数据
@@ -502,10 +683,6 @@ def create_bi_charts(
         energy_full['LOSTENERGY'] = energy_full['LOSTENERGY'].astype(float)
         energy_full = energy_full.sort_values(by='TimeStamp2', ascending=True)
 
-    # 更新缓存（包含 energy 数据）
-    _program_data_cache_set(table_name, start_date_str, end_date_str, df_full, energy_full)
-    logger.info("缓存已更新（包含 energy 数据）")
-
     # ============ 仅为默认 program 计算数据（program 切换时重载页面再算） ============
     agg_start = time.perf_counter()
     _check_cancel()
@@ -513,32 +690,8 @@ def create_bi_charts(
     prog_data = prog_data.sort_values(by=["SNR_C", "Time"])
     prog_data["sort"] = range(1, len(prog_data) + 1)
 
-    # 聚合数据（与 Digitaltwin_timefree.py 完全一致：直接写死列名）
-    ref = prog_data.groupby("SNR_C")[['MAXCurr_A1','MAXCurr_A2','MAXCurr_A3','MAXCurr_A4',
-                                      'MAXCurr_A5','MAXCurr_A6','MAXCurr_E1',
-                                      'MinCurr_A1','MinCurr_A2','MinCurr_A3','MinCurr_A4',
-                                      'MinCurr_A5','MinCurr_A6','MinCurr_E1']].last()
-
-    LQ = prog_data.groupby("SNR_C")[['Curr_A1','Curr_A2','Curr_A3','Curr_A4',
-                                          'Curr_A5','Curr_A6','Curr_E1']].quantile(q=0.01, interpolation='nearest').rename(
-        columns={'Curr_A1': 'Curr_A1_LQ', 'Curr_A2': 'Curr_A2_LQ', 'Curr_A3': 'Curr_A3_LQ',
-                 'Curr_A4': 'Curr_A4_LQ', 'Curr_A5': 'Curr_A5_LQ', 'Curr_A6': 'Curr_A6_LQ',
-                 'Curr_E1': 'Curr_E1_LQ'})
-    HQ = prog_data.groupby("SNR_C")[['Curr_A1','Curr_A2','Curr_A3','Curr_A4',
-                                          'Curr_A5','Curr_A6','Curr_E1']].quantile(q=0.99, interpolation='nearest').rename(
-        columns={'Curr_A1': 'Curr_A1_HQ', 'Curr_A2': 'Curr_A2_HQ', 'Curr_A3': 'Curr_A3_HQ',
-                 'Curr_A4': 'Curr_A4_HQ', 'Curr_A5': 'Curr_A5_HQ', 'Curr_A6': 'Curr_A6_HQ',
-                 'Curr_E1': 'Curr_E1_HQ'})
-    labeltext = prog_data.groupby("SNR_C")["P_name"].last()
-
-    # 使用 Digitaltwin_timefree.py 的 merge 方式
-    Q = pd.merge(pd.merge(pd.merge(LQ, HQ, left_on=['SNR_C'], right_index=True, how='outer'),
-                          ref, left_on=['SNR_C'], right_index=True, how='inner'),
-                 labeltext, left_on=['SNR_C'], right_index=True, how='inner').reset_index()
-
-    # 生成 x_tex（与 Digitaltwin_timefree.py 一致）
-    x_tex = prog_data["SNR_C"].sort_values(ascending=True).unique().astype(str)
-    Q["SNR_C"] = x_tex
+    # SNR_C 聚合：直接在已加载的明细行上计算
+    Q, x_tex = compute_program_aggregates(prog_data)
 
     # 为轴切换准备固定代理列（避免在 JS 里修改 glyph.field，兼容不同 BokehJS/渲染后端）
     prog_data = prog_data.assign(
@@ -894,20 +1047,25 @@ def create_bi_charts(
         curr_plot.title.text = axis + " - Current Analysis";
 
         // Update proxy columns so glyphs keep using fixed fields (Curr/MinCurr/MaxCurr/...)
-        const s = source.data || {};
-        s['Curr'] = s[currCol] || [];
-        s['MinCurr'] = s[minCurrCol] || [];
-        s['MaxCurr'] = s[maxCurrCol] || [];
-        s['Torque'] = s[torqueCol] || [];
-        s['Speed'] = s[speedCol] || [];
-        s['Fol'] = s[folCol] || [];
-        s['AxisP'] = s[axispCol] || [];
-
-        const a = agg_source.data || {};
-        a['Curr_LQ'] = a[lqCol] || [];
-        a['Curr_HQ'] = a[hqCol] || [];
-        a['MinCurr'] = a[minCurrCol] || [];
-        a['MaxCurr'] = a[maxCurrCol] || [];
+        const applyAxisColumns = () => {
+          const s = source.data || {};
+          s['Curr'] = s[currCol] || [];
+          s['MinCurr'] = s[minCurrCol] || [];
+          s['MaxCurr'] = s[maxCurrCol] || [];
+          s['Torque'] = s[torqueCol] || [];
+          s['Speed'] = s[speedCol] || [];
+          s['Fol'] = s[folCol] || [];
+          s['AxisP'] = s[axispCol] || [];
+
+          const a = agg_source.data || {};
+          a['Curr_LQ'] = a[lqCol] || [];
+          a['Curr_HQ'] = a[hqCol] || [];
+          a['MinCurr'] = a[minCurrCol] || [];
+          a['MaxCurr'] = a[maxCurrCol] || [];
+
+          source.change.emit();
+          agg_source.change.emit();
+        };
 
         hover.tooltips = [
           ['Timestamp', '@Timestamp'],
@@ -946,8 +1104,36 @@ def create_bi_charts(
           ['99% Quantile (' + axis + ')', '@Curr_HQ'],
         ];
 
-        source.change.emit();
-        agg_source.change.emit();
+        // 首屏只加载默认轴的明细列，切换到未加载的轴时向后端补齐后再更新代理列
+        if (!(torqueCol in (source.data || {}))) {
+          const pageUrl = new URL(window.location.href);
+          const dataUrl = new URL('/api/robots/bi_program_data/', window.location.origin);
+          dataUrl.searchParams.set('table', pageUrl.searchParams.get('table') || pageUrl.searchParams.get('robot') || '');
+          dataUrl.searchParams.set('program', program_select.value);
+          dataUrl.searchParams.set('axis', axis);
+          if (pageUrl.searchParams.get('start_date')) dataUrl.searchParams.set('start_date', pageUrl.searchParams.get('start_date'));
+          if (pageUrl.searchParams.get('end_date')) dataUrl.searchParams.set('end_date', pageUrl.searchParams.get('end_date'));
+
+          const requestId = Date.now().toString(36) + Math.random().toString(36).slice(2);
+          window.__biProgramRequestId = requestId;
+          fetch(dataUrl.toString(), { method: 'GET', credentials: 'same-origin' })
+            .then((res) => res.json())
+            .then((payload) => {
+              if (window.__biProgramRequestId !== requestId) return;
+              if (!payload || !payload.ok) throw new Error((payload && payload.error) || 'AXIS_DATA_FAILED');
+              source.data = payload.source || {};
+              agg_source.data = payload.agg || {};
+              applyAxisColumns();
+            })
+            .catch((err) => {
+              try { console.error('axis switch failed', err); } catch (e) {}
+              const reloadUrl = new URL(window.location.href);
+              reloadUrl.searchParams.set('axis', axis);
+              window.location.href = reloadUrl.toString();
+            });
+        } else {
+          applyAxisColumns();
+        }
 
         // Notify parent to persist selections (without reloading).
         if (window.parent && window.parent !== window) {
@@ -1001,6 +1187,7 @@ def create_bi_charts(
         const dataUrl = new URL('/api/robots/bi_program_data/', window.location.origin);
         dataUrl.searchParams.set('table', url.searchParams.get('table') || url.searchParams.get('robot') || '');
         dataUrl.searchParams.set('program', nextProgram);
+        dataUrl.searchParams.set('axis', axis);
         if (url.searchParams.get('start_date')) dataUrl.searchParams.set('start_date', url.searchParams.get('start_date'));
         if (url.searchParams.get('end_date')) dataUrl.searchParams.set('end_date', url.searchParams.get('end_date'));
 
@@ -1169,9 +1356,12 @@ def get_bi_program_payload(
     program: str,
     start_date: str | None = None,
     end_date: str | None = None,
+    axis: str | None = None,
 ):
     """
-    获取指定 program 的数据与聚合结果，用于前端无刷新切换 program_name。
+    获取指定 program 的数据与聚合结果，用于前端无刷新切换 program_name / 补齐轴明细列。
+
+    axis: 需要包含明细列的轴；缓存数据缺少该轴的列时连同已加载的轴重新读取
     返回 dict:
       { ok: bool, error?: str, source?: dict, agg?: dict }
     """
@@ -1185,7 +1375,7 @@ def get_bi_program_payload(
     time_column = "Timestamp"
 
     try:
-        engine = create_engine(f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}")
+        engine = get_sg_engine(f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}")
     except Exception as e:
         logger.error("数据库连接失败: %s", e)
         return {"ok": False, "error": "数据库连接失败"}
@@ -1209,38 +1399,33 @@ def get_bi_program_payload(
         end_time = datetime.now()
         start_time = end_time - timedelta(days=7)
 
-    # 生成缓存键
-    start_date_str = start_time.strftime('%Y-%m-%d')
-    end_date_str = end_time.strftime('%Y-%m-%d')
-
-    # 先检查缓存（与 Digitaltwin_timefree.py 一致：数据已在内存）
-    cached_data = _program_data_cache_get(table_name, start_date_str, end_date_str)
-    df_full = None
-    from_cache = False
+    # BI_SQL_PUSHDOWN 模式只读取/缓存该 program 的行
+    pushdown = bi_sql_pushdown_enabled()
+    cache_program = program if pushdown else None
+    axis = axis if axis in AXIS_CONFIG else None
 
-    if cached_data is not None:
-        df_full, energy_full = cached_data
-        from_cache = True
-        logger.info("program切换: 从内存缓存读取数据，行数=%s", len(df_full))
-    else:
-        # 缓存未命中，查询数据库
-        fetch_start = time.perf_counter()
-        df_full = fetch_data_from_mysql(
+    # 先从分段缓存切片（与 Digitaltwin_timefree.py 一致：数据已在内存），只查询未覆盖的时间缺口；
+    # 缓存中缺少该轴的明细列时，连同已加载的列一起重新读取
+    fetch_start = time.perf_counter()
+    try:
+        df_full, fetched = _load_program_data(
             table_name,
-            _format_datetime(start_time),
-            _format_datetime(end_time),
+            start_time,
+            end_time,
             time_column,  # 传递字符串，不使用 dict
             engine,
+            columns=bi_fetch_columns([axis] if axis else []),
+            program=cache_program,
         )
-        logger.info("program切换全量数据: db fetch %.3fs, 行数=%s", time.perf_counter() - fetch_start, len(df_full))
-
-        if df_full.empty:
-            return {"ok": False, "error": "该 program 无数据"}
+    except Exception as e:
+        logger.error("program切换获取数据失败: %s", e)
+        return {"ok": False, "error": "该 program 无数据"}
+    from_cache = not fetched
+    logger.info("program切换数据: %.3fs, 行数=%s, 查询缺口=%s段",
+                time.perf_counter() - fetch_start, len(df_full), len(fetched))
 
-        # 数据预处理（只在从数据库查询时需要）
-        df_full = _preprocess_bi_dataframe(df_full)
-        # 缓存预处理后的数据
-        _program_data_cache_set(table_name, start_date_str, end_date_str, df_full, None)
+    if df_full.empty:
+        return {"ok": False, "error": "该 program 无数据"}
 
     # 数据已经预处理过（无论是从缓存还是数据库），直接过滤 program
     # 与 Digitaltwin_timefree.py 一致：从内存数据中过滤
@@ -1255,32 +1440,8 @@ def get_bi_program_payload(
     prog_data = prog_data.sort_values(by=["SNR_C", "Time"])
     prog_data["sort"] = range(1, len(prog_data) + 1)
 
-    # 聚合数据（与 Digitaltwin_timefree.py 完全一致：直接写死列名）
-    ref = prog_data.groupby("SNR_C")[['MAXCurr_A1','MAXCurr_A2','MAXCurr_A3','MAXCurr_A4',
-                                      'MAXCurr_A5','MAXCurr_A6','MAXCurr_E1',
-                                      'MinCurr_A1','MinCurr_A2','MinCurr_A3','MinCurr_A4',
-                                      'MinCurr_A5','MinCurr_A6','MinCurr_E1']].last()
-
-    LQ = prog_data.groupby("SNR_C")[['Curr_A1','Curr_A2','Curr_A3','Curr_A4',
-                                          'Curr_A5','Curr_A6','Curr_E1']].quantile(q=0.01, interpolation='nearest').rename(
-        columns={'Curr_A1': 'Curr_A1_LQ', 'Curr_A2': 'Curr_A2_LQ', 'Curr_A3': 'Curr_A3_LQ',
-                 'Curr_A4': 'Curr_A4_LQ', 'Curr_A5': 'Curr_A5_LQ', 'Curr_A6': 'Curr_A6_LQ',
-                 'Curr_E1': 'Curr_E1_LQ'})
-    HQ = prog_data.groupby("SNR_C")[['Curr_A1','Curr_A2','Curr_A3','Curr_A4',
-                                          'Curr_A5','Curr_A6','Curr_E1']].quantile(q=0.99, interpolation='nearest').rename(
-        columns={'Curr_A1': 'Curr_A1_HQ', 'Curr_A2': 'Curr_A2_HQ', 'Curr_A3': 'Curr_A3_HQ',
-                 'Curr_A4': 'Curr_A4_HQ', 'Curr_A5': 'Curr_A5_HQ', 'Curr_A6': 'Curr_A6_HQ',
-                 'Curr_E1': 'Curr_E1_HQ'})
-    labeltext = prog_data.groupby("SNR_C")["P_name"].last()
-
-    # 使用 Digitaltwin_timefree.py 的 merge 方式
-    Q = pd.merge(pd.merge(pd.merge(LQ, HQ, left_on=['SNR_C'], right_index=True, how='outer'),
-                          ref, left_on=['SNR_C'], right_index=True, how='inner'),
-                 labeltext, left_on=['SNR_C'], right_index=True, how='inner').reset_index()
-
-    # 生成 x_tex（与 Digitaltwin_timefree.py 一致）
-    x_tex = prog_data["SNR_C"].sort_values(ascending=True).unique().astype(str)
-    Q["SNR_C"] = x_tex
+    # SNR_C 聚合：直接在已加载的明细行上计算
+    Q, x_tex = compute_program_aggregates(prog_data)
 
     # 日志：显示聚合计算时间
     cache_status = "缓存" if from_cache else "数据库"
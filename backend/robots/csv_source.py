@@ -0,0 +1,126 @@
+"""
+源 CSV 文件共享读取层
+
+同一个 weeklyresult 文件在一次同步中会被多处读取（ORM 导入、LOAD DATA、robot 所属文件判断），
+这里按 (path, mtime, size) 缓存编码识别结果和转码后的 UTF-8 副本，避免每处各自整文件解码。
+"""
+import codecs
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 按优先级排列的候选编码：能完整解码为 UTF-8 的文件一定优先按 UTF-8 处理
+ENCODING_CANDIDATES = ("utf-8", "gb18030")
+UTF8_ENCODINGS = ("utf-8", "utf-8-sig")
+READ_BLOCK_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+_encoding_cache = {}  # abspath -> (signature, encoding)
+
+
+def file_signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _scan_encoding(path: str) -> str:
+    """顺序读取一遍文件，同时用各候选编码增量解码，返回第一个能完整解码的编码"""
+    decoders = {enc: codecs.getincrementaldecoder(enc)() for enc in ENCODING_CANDIDATES}
+    has_bom = False
+    with open(path, "rb") as file_obj:
+        first_block = True
+        while decoders:
+            block = file_obj.read(READ_BLOCK_SIZE)
+            if first_block:
+                has_bom = block.startswith(codecs.BOM_UTF8)
+                first_block = False
+            final = not block
+            for enc, decoder in list(decoders.items()):
+                try:
+                    decoder.decode(block, final=final)
+                except UnicodeDecodeError:
+                    del decoders[enc]
+            if final:
+                break
+
+    for enc in ENCODING_CANDIDATES:
+        if enc in decoders:
+            return "utf-8-sig" if enc == "utf-8" and has_bom else enc
+    logger.warning("无法识别 CSV 编码，按 utf-8 处理: %s", path)
+    return "utf-8"
+
+
+def detect_encoding(path: str) -> str:
+    """识别文件编码，结果按 (path, mtime, size) 缓存，文件未变化时不再读取"""
+    path = os.path.abspath(path)
+    signature = file_signature(path)
+    with _lock:
+        cached = _encoding_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    encoding = _scan_encoding(path)
+    with _lock:
+        _encoding_cache[path] = (signature, encoding)
+    return encoding
+
+
+def _cache_dir() -> str:
+    folder = getattr(settings, "CSV_SOURCE_CACHE_DIR", "") or os.path.join(
+        tempfile.gettempdir(), "sg57_csv_cache"
+    )
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def _remove_stale_copies(path_key: str, keep: str) -> None:
+    for stale in glob.glob(os.path.join(_cache_dir(), f"{path_key}_*.csv")):
+        if stale == keep:
+            continue
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+def utf8_copy(path: str) -> Tuple[str, str]:
+    """
+    返回可按 UTF-8 读取的文件路径及其编码
+
+    UTF-8 文件直接返回原路径；其他编码转码一次后写入缓存目录，
+    同一 (path, mtime, size) 的后续调用直接复用该副本。
+    """
+    encoding = detect_encoding(path)
+    if encoding in UTF8_ENCODINGS:
+        return path, encoding
+
+    path = os.path.abspath(path)
+    mtime_ns, size = file_signature(path)
+    path_key = hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+    target = os.path.join(_cache_dir(), f"{path_key}_{mtime_ns}_{size}.csv")
+    if not os.path.exists(target):
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path, "r", encoding=encoding, newline="") as src:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as dst:
+                shutil.copyfileobj(src, dst, READ_BLOCK_SIZE)
+        os.replace(tmp_path, target)
+        _remove_stale_copies(path_key, target)
+        logger.info("CSV 已转码为 UTF-8 缓存: %s -> %s (%s)", path, target, encoding)
+    return target, "utf-8"
+
+
+@contextmanager
+def open_text(path: str):
+    """按识别出的编码流式打开源 CSV（newline=""，可直接交给 csv.reader）"""
+    with open(path, "r", encoding=detect_encoding(path), newline="") as file_obj:
+        yield file_obj
@@ -0,0 +1,149 @@
+"""
+robot_config CSV 异步回写队列
+
+组件编辑接口只把组件 id 加入 Redis 中的待回写集合，并在窗口期内只投递一次延迟任务；
+窗口期内的多次编辑合并为一次 flush：worker 按数据库中的最新值生成更新、按目标 CSV 分组，
+每个文件在文件锁内读取、合并后以临时文件 + os.replace 原子替换。
+写入失败或找不到目标 CSV 的组件重新放回待回写集合并延迟重试，超过重试次数后才放弃。
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "robots:csv_writeback:pending"
+SCHEDULED_KEY = "robots:csv_writeback:scheduled"
+QUEUE_LOCK_KEY = "robots:csv_writeback:queue_lock"
+ATTEMPTS_KEY = "robots:csv_writeback:attempts"
+# 已投递标记比延迟多保留的时间（秒），worker 积压时避免重复投递
+SCHEDULE_GRACE = 300
+
+
+def _queue_lock():
+    return cache.lock(QUEUE_LOCK_KEY, timeout=10, blocking_timeout=10)
+
+
+def enqueue_robot_config_sync(component_ids) -> int:
+    """
+    登记需要回写 CSV 的组件，返回本次登记的数量
+
+    任务投递失败（如 broker 不可用）时退回在当前进程内同步回写。
+    """
+    ids = {int(pk) for pk in component_ids if pk is not None}
+    if not ids:
+        return 0
+
+    delay = getattr(settings, "ROBOT_CSV_WRITEBACK_DELAY", 5)
+    try:
+        with _queue_lock():
+            pending = set(cache.get(PENDING_KEY) or ())
+            cache.set(PENDING_KEY, sorted(pending | ids), timeout=None)
+        _schedule_flush(delay)
+    except Exception as exc:
+        logger.error("投递 CSV 回写任务失败，改为同步回写: %s", exc)
+        flush_robot_config_csv(extra_ids=ids)
+    return len(ids)
+
+
+def _schedule_flush(delay: int) -> None:
+    """窗口期内只投递一次延迟任务"""
+    if cache.add(SCHEDULED_KEY, 1, timeout=delay + SCHEDULE_GRACE):
+        from .tasks import flush_robot_config_csv_task
+
+        try:
+            flush_robot_config_csv_task.apply_async(countdown=delay)
+        except Exception:
+            cache.delete(SCHEDULED_KEY)
+            raise
+
+
+def _requeue_failed(ids: set) -> set:
+    """
+    把回写失败的组件放回待回写集合并投递重试，返回已超过重试次数而放弃的 id
+
+    每个 id 的失败次数记录在 ATTEMPTS_KEY 中，成功回写后清除。
+    """
+    max_retries = getattr(settings, "ROBOT_CSV_WRITEBACK_MAX_RETRIES", 5)
+    with _queue_lock():
+        attempts = dict(cache.get(ATTEMPTS_KEY) or {})
+        retry, dropped = set(), set()
+        for pk in ids:
+            attempts[pk] = attempts.get(pk, 0) + 1
+            if attempts[pk] > max_retries:
+                attempts.pop(pk)
+                dropped.add(pk)
+            else:
+                retry.add(pk)
+        if retry:
+            pending = set(cache.get(PENDING_KEY) or ())
+            cache.set(PENDING_KEY, sorted(pending | retry), timeout=None)
+        cache.set(ATTEMPTS_KEY, attempts, timeout=None)
+    if retry:
+        _schedule_flush(getattr(settings, "ROBOT_CSV_WRITEBACK_RETRY_DELAY", 60))
+    return dropped
+
+
+def _clear_attempts(ids: set) -> None:
+    with _queue_lock():
+        attempts = dict(cache.get(ATTEMPTS_KEY) or {})
+        if any(pk in attempts for pk in ids):
+            for pk in ids:
+                attempts.pop(pk, None)
+            cache.set(ATTEMPTS_KEY, attempts, timeout=None)
+
+
+def _take_pending() -> set:
+    with _queue_lock():
+        ids = set(cache.get(PENDING_KEY) or ())
+        cache.delete(PENDING_KEY)
+        # 取走后清除投递标记，之后的编辑会投递新的任务
+        cache.delete(SCHEDULED_KEY)
+    return ids
+
+
+def flush_robot_config_csv(extra_ids=None) -> dict:
+    """
+    取出全部待回写组件，按 CSV 文件合并后各写一次
+
+    extra_ids: 队列不可用时由调用方直接传入的组件 id
+    """
+    from .models import RobotComponent
+    from .robot_config_sync import sync_robot_components_to_csv
+
+    ids = set(extra_ids or ())
+    try:
+        ids |= _take_pending()
+    except Exception as exc:
+        logger.warning("读取 CSV 回写队列失败: %s", exc)
+    if not ids:
+        return {"components": 0, "synced": 0}
+
+    # 已删除的组件没有可回写的内容，直接丢弃
+    components = list(RobotComponent.objects.filter(id__in=ids))
+    try:
+        synced = sync_robot_components_to_csv(components)
+    except Exception as exc:
+        logger.exception("CSV 回写失败，组件放回队列重试: %s", exc)
+        synced = {}
+    # 只有成功 os.replace 写回的机器人才从队列中移除
+    succeeded = {component.id for component in components if synced.get(component.robot)}
+    failed = {component.id for component in components} - succeeded
+    dropped = set()
+    try:
+        if succeeded:
+            _clear_attempts(succeeded)
+        if failed:
+            dropped = _requeue_failed(failed)
+    except Exception as exc:
+        logger.error("CSV 回写失败的组件无法放回队列: ids=%s, %s", sorted(failed), exc)
+    if dropped:
+        logger.error("CSV 回写超过重试次数，放弃: ids=%s", sorted(dropped))
+    logger.info("CSV 回写完成: %s/%s", len(succeeded), len(components))
+    return {
+        "components": len(components),
+        "synced": len(succeeded),
+        "requeued": len(failed - dropped),
+        "dropped": len(dropped),
+    }
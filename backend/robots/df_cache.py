@@ -0,0 +1,342 @@
+"""
+BI DataFrame 进程内 LRU 缓存
+
+按字节预算（DataFrame.memory_usage(deep=True)）和条目数上限做 LRU 淘汰，
+条目带 TTL，读取时惰性过期，后台清理线程定期回收从未再次读取的过期条目，
+保证浏览多个机器人后 Django worker 的常驻内存有上限。所有操作持有同一把锁，线程安全。
+
+RangeSegmentCache 在其上按时间范围分段保存数据：任意时间窗从已缓存段切片，
+只为未覆盖的缺口查询数据库，缩小或平移日期范围时不再整段重读。
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_nbytes(value) -> int:
+    """DataFrame / Series 按 memory_usage(deep=True) 计算，tuple / list / dict 递归累加，其他对象计 0"""
+    if value is None:
+        return 0
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    memory_usage = getattr(value, "memory_usage", None)
+    if memory_usage is None:
+        return 0
+    try:
+        usage = memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    except Exception:
+        return 0
+
+
+class DataFrameLRUCache:
+    """
+    带字节预算的 LRU 缓存
+
+    容量参数默认读取 BI_DF_CACHE_*（首次使用时读取），也可在构造时显式传入。
+    超过预算的单个条目不缓存；写入后按最久未使用顺序淘汰直至满足预算。
+    """
+
+    def __init__(self, name: str, max_bytes=None, max_entries=None, ttl_seconds=None, sweep_interval=None):
+        self.name = name
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._sweep_interval = sweep_interval
+        self._lock = threading.RLock()
+        self._items = OrderedDict()  # key -> (expires_at, nbytes, value)
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+        self._sweeper = None
+        self._sweeper_pid = None
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is None:
+            return int(getattr(settings, "BI_DF_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+        return int(self._max_bytes)
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is None:
+            return int(getattr(settings, "BI_DF_CACHE_MAX_ENTRIES", 64))
+        return int(self._max_entries)
+
+    @property
+    def ttl_seconds(self) -> int:
+        if self._ttl_seconds is None:
+            return int(getattr(settings, "BI_DF_CACHE_TTL", 600))
+        return int(self._ttl_seconds)
+
+    @property
+    def sweep_interval(self) -> int:
+        if self._sweep_interval is None:
+            return int(getattr(settings, "BI_DF_CACHE_SWEEP_INTERVAL", 60))
+        return int(self._sweep_interval)
+
+    def _drop(self, key) -> None:
+        _, nbytes, _ = self._items.pop(key)
+        self._total_bytes -= nbytes
+
+    def get(self, key):
+        """命中时移到最近使用端并返回值，未命中或已过期返回 None"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            if item[0] <= time.time():
+                self._drop(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return item[2]
+
+    def set(self, key, value, ttl_seconds=None, nbytes=None) -> bool:
+        """写入条目，返回是否已缓存（单个条目超过字节预算时不缓存）；nbytes 为空时按 estimate_nbytes 计算"""
+        nbytes = estimate_nbytes(value) if nbytes is None else int(nbytes)
+        ttl = self.ttl_seconds if ttl_seconds is None else int(ttl_seconds)
+        max_bytes = self.max_bytes
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            if ttl <= 0 or nbytes > max_bytes:
+                self._rejected += 1
+                logger.info("%s 缓存跳过条目 %s（%.1f MB）", self.name, key, nbytes / 1048576)
+                return False
+            self._items[key] = (time.time() + ttl, nbytes, value)
+            self._total_bytes += nbytes
+            max_entries = max(self.max_entries, 1)
+            while self._total_bytes > max_bytes or len(self._items) > max_entries:
+                oldest = next(iter(self._items))
+                self._drop(oldest)
+                self._evictions += 1
+        self._ensure_sweeper()
+        return True
+
+    def pop(self, key) -> None:
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._total_bytes = 0
+
+    def sweep(self) -> int:
+        """移除全部过期条目，返回移除数量"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _, _) in self._items.items() if expires_at <= now]
+            for key in expired:
+                self._drop(key)
+            self._expirations += len(expired)
+        return len(expired)
+
+    def _sweep_loop(self) -> None:
+        while True:
+            time.sleep(max(self.sweep_interval, 1))
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.debug("%s 缓存清理过期条目 %s 个", self.name, removed)
+            except Exception as exc:
+                logger.warning("%s 缓存清理失败: %s", self.name, exc)
+
+    def _ensure_sweeper(self) -> None:
+        # fork 出的子进程不会继承线程，按 pid 判断是否需要重新启动
+        pid = os.getpid()
+        if self._sweeper_pid == pid and self._sweeper is not None and self._sweeper.is_alive():
+            return
+        with self._lock:
+            if self._sweeper_pid == pid and self._sweeper is not None and self._sweeper.is_alive():
+                return
+            if self.sweep_interval <= 0:
+                return
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, name=f"{self.name}-sweeper", daemon=True
+            )
+            self._sweeper_pid = pid
+            self._sweeper.start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "pid": os.getpid(),
+                "entries": len(self._items),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "rejected": self._rejected,
+            }
+
+
+def _missing_ranges(segments, start: datetime, end: datetime) -> list:
+    """[start, end) 中未被 segments（按 start 排序、互不重叠的半开区间）覆盖的缺口"""
+    gaps = []
+    cursor = start
+    for seg_start, seg_end, _, _ in segments:
+        if seg_end <= cursor:
+            continue
+        if seg_start >= end:
+            break
+        if seg_start > cursor:
+            gaps.append((cursor, seg_start))
+        cursor = seg_end
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class RangeSegmentCache:
+    """
+    按时间范围分段的 DataFrame 缓存
+
+    每个 key（如 (表名, program)）保存若干互不重叠的半开区间段 [start, end) 及其数据。
+    get_range 从覆盖请求窗口的段中切片，只对缺口调用 fetch（按 >= start AND < end 查询），
+    新读取的数据与相交或边界相等的相邻段合并成一段后写回；边界不做取整，带小数秒的行不会落入缝隙。段数据存放在 DataFrameLRUCache 中，共用其字节预算、TTL 与 LRU 淘汰。
+
+    time_column 为 DataFrame 中的时间列，time_offset 为该列相对查询时间的偏移
+    （BI 预处理后的 Time = Timestamp + 8h）。晚于当前时间的部分不记为已覆盖，下次请求会重新读取。
+    """
+
+    def __init__(self, name: str, time_column: str = "Time", time_offset: timedelta = None, **lru_options):
+        self.name = name
+        self.time_column = time_column
+        self.time_offset = time_offset or timedelta(0)
+        self._store = DataFrameLRUCache(name, **lru_options)
+        self._lock = threading.Lock()
+        self._full_hits = 0
+        self._partial_hits = 0
+        self._gap_fetches = 0
+
+    @staticmethod
+    def _covers(cached_columns: tuple, columns: tuple) -> bool:
+        # 空列集表示 SELECT *，包含任意列
+        if not cached_columns:
+            return True
+        return bool(columns) and set(columns) <= set(cached_columns)
+
+    @staticmethod
+    def _union_columns(cached_columns: tuple, columns: tuple) -> tuple:
+        if not cached_columns or not columns:
+            return ()
+        return tuple(dict.fromkeys(cached_columns + columns))
+
+    def _slice(self, df: "pd.DataFrame", start: datetime, end: datetime) -> "pd.DataFrame":
+        if df.empty or self.time_column not in df.columns:
+            return df.iloc[0:0]
+        times = df[self.time_column]
+        return df[(times >= start + self.time_offset) & (times < end + self.time_offset)]
+
+    def _concat(self, frames) -> "pd.DataFrame":
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def get_range(self, key, start: datetime, end: datetime, columns, fetch):
+        """
+        返回 [start, end) 内的数据
+
+        Args:
+            key: 缓存键，如 (表名, program 或 "*")
+            start / end: 查询时间范围（半开区间）
+            columns: 需要的列，空表示全部列；已缓存的列不足时带上已缓存列整体重读该窗口
+            fetch: fetch(gap_start, gap_end, columns) -> DataFrame，读取 [gap_start, gap_end) 的缺口；
+                抛出异常时不写缓存
+
+        Returns:
+            (df, fetched_ranges)：fetched_ranges 为本次实际查询数据库的缺口列表
+        """
+        columns = tuple(columns or ())
+        segments = []
+        entry = self._store.get(key)
+        if entry is not None:
+            cached_columns, cached_segments = entry
+            if self._covers(cached_columns, columns):
+                columns, segments = cached_columns, cached_segments
+            else:
+                # 新增的列无法从已缓存段补齐，连同已缓存列一起重读
+                columns = self._union_columns(cached_columns, columns)
+
+        gaps = _missing_ranges(segments, start, end)
+        fetched_at = datetime.now()
+        new_segments = []
+        for gap_start, gap_end in gaps:
+            new_segments.append((gap_start, gap_end, fetch(gap_start, gap_end, list(columns) or None), None))
+
+        # 与窗口相交或边界相等（相邻）的段，与新缺口合并为一段
+        touching = [seg for seg in segments if seg[0] <= end and seg[1] >= start]
+        with self._lock:
+            if not gaps:
+                self._full_hits += 1
+            elif touching:
+                self._partial_hits += 1
+            self._gap_fetches += len(gaps)
+
+        # 窗口内的数据：完全落在窗口内的段直接使用，跨越窗口边界的段切片
+        parts = sorted(touching + new_segments, key=lambda seg: seg[0])
+        result = self._concat(
+            seg_df if seg_start >= start and seg_end <= end else self._slice(seg_df, start, end)
+            for seg_start, seg_end, seg_df, _ in parts
+        )
+
+        if gaps:
+            self._store_segments(key, columns, segments, touching, parts, fetched_at)
+        return result, gaps
+
+    def _store_segments(self, key, columns, segments, touching, parts, fetched_at) -> None:
+        """把相交 / 相邻段与新读取的缺口合并为一段，晚于 fetched_at 的部分不记为已覆盖"""
+        merged_start = parts[0][0]
+        merged_end = max(seg[1] for seg in parts)
+        merged_df = self._concat(seg[2] for seg in parts)
+        if merged_end > fetched_at:
+            merged_end = fetched_at
+            merged_df = self._slice(merged_df, merged_start, merged_end)
+
+        touched = {id(seg) for seg in touching}
+        kept = [seg for seg in segments if id(seg) not in touched]
+        if merged_start < merged_end:
+            kept.append((merged_start, merged_end, merged_df, estimate_nbytes(merged_df)))
+        kept.sort(key=lambda seg: seg[0])
+        self._store.set(key, (columns, kept), nbytes=sum(seg[3] for seg in kept))
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> dict:
+        stats = self._store.stats()
+        with self._lock:
+            stats.update({
+                "full_hits": self._full_hits,
+                "partial_hits": self._partial_hits,
+                "gap_fetches": self._gap_fetches,
+            })
+        return stats
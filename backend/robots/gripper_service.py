@@ -11,7 +11,8 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+
+from .sg_engine import get_sg_engine
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -31,8 +32,7 @@ def get_db_engine():
     port = os.getenv('SG_DB_PORT', '3306')
     database = os.getenv('SG_DB_NAME', 'showdata')
 
-    engine = create_engine(f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}')
-    return engine
+    return get_sg_engine(f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}')
 
 
 def fetch_data_from_mysql(table_name, start_time, end_time, time_column, engine):
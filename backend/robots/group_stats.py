@@ -0,0 +1,140 @@
+"""
+车间（RobotGroup）统计物化表维护
+
+robot_group_stats 每个组一行，保存总数、高风险、失联（is_disconnected）、各 level 及各轴 high 数量。
+导入结束后整表重建，单条组件编辑时按差量更新，组列表接口只需按主键读取。
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STATS_LEVELS = ("H", "M", "L", "T", "C")
+STATS_AXES = ("a1", "a2", "a3", "a4", "a5", "a6", "a7")
+COUNTER_FIELDS = [
+    "total",
+    "high_risk",
+    "disconnected",
+    *[f"level_{level.lower()}" for level in STATS_LEVELS],
+    *[f"{axis}_high" for axis in STATS_AXES],
+]
+
+
+def _stats_aggregates():
+    from .models import axis_bit, axis_mask_values
+
+    aggregates = {
+        "total": Count("id"),
+        "high_risk": Count("id", filter=Q(level="H")),
+        "disconnected": Count("id", filter=Q(is_disconnected=True)),
+    }
+    for level in STATS_LEVELS:
+        aggregates[f"level_{level.lower()}"] = Count("id", filter=Q(level=level))
+    for axis in STATS_AXES:
+        high_values = axis_mask_values(required=axis_bit(axis))
+        aggregates[f"{axis}_high"] = Count("id", filter=Q(axis_high_mask__in=high_values))
+    return aggregates
+
+
+def component_stat_values(component) -> dict:
+    """单条组件对各计数列的贡献（0/1）"""
+    from .models import axis_bit
+
+    level = component.level
+    values = {
+        "total": 1,
+        "high_risk": int(level == "H"),
+        "disconnected": int(bool(component.is_disconnected)),
+    }
+    for item in STATS_LEVELS:
+        values[f"level_{item.lower()}"] = int(level == item)
+    for axis in STATS_AXES:
+        values[f"{axis}_high"] = int(bool(component.axis_high_mask & axis_bit(axis)))
+    return values
+
+
+def snapshot_component(component) -> dict:
+    values = component_stat_values(component)
+    values["group_id"] = component.group_id
+    return values
+
+
+def rebuild_group_stats(group_ids=None) -> int:
+    """
+    按 robot_components 重新计算统计表
+
+    group_ids 为空时重建全部组（没有组件的组也写入全 0 行），返回写入的行数。
+    """
+    from .models import RobotComponent, RobotGroup, RobotGroupStats
+
+    groups = RobotGroup.objects.all()
+    components = RobotComponent.objects.all()
+    if group_ids is not None:
+        group_ids = list(group_ids)
+        groups = groups.filter(id__in=group_ids)
+        components = components.filter(group_id__in=group_ids)
+
+    counts = {
+        row.pop("group_id"): row
+        for row in components.order_by().values("group_id").annotate(**_stats_aggregates())
+    }
+    rows = []
+    for group_id in groups.values_list("id", flat=True):
+        values = counts.get(group_id) or dict.fromkeys(COUNTER_FIELDS, 0)
+        rows.append(RobotGroupStats(group_id=group_id, **values))
+
+    with transaction.atomic():
+        stale = RobotGroupStats.objects.all()
+        if group_ids is not None:
+            stale = stale.filter(group_id__in=group_ids)
+        stale.delete()
+        RobotGroupStats.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def apply_component_change(before, after) -> None:
+    """
+    按组件编辑前后的差量更新统计表
+
+    before / after 为 snapshot_component 的结果（计数贡献 + group_id）；
+    统计行不存在时改为重建该组。
+    """
+    from .models import RobotGroupStats
+
+    deltas = {}
+    for group_id, values, sign in (
+        (before["group_id"], before, -1),
+        (after["group_id"], after, 1),
+    ):
+        group_delta = deltas.setdefault(group_id, dict.fromkeys(COUNTER_FIELDS, 0))
+        for field in COUNTER_FIELDS:
+            group_delta[field] += sign * values[field]
+
+    missing = []
+    with transaction.atomic():
+        for group_id, group_delta in deltas.items():
+            changes = {field: F(field) + delta for field, delta in group_delta.items() if delta}
+            if not changes:
+                continue
+            changes["updated_at"] = timezone.now()
+            if not RobotGroupStats.objects.filter(group_id=group_id).update(**changes):
+                missing.append(group_id)
+    if missing:
+        rebuild_group_stats(missing)
+
+
+def load_group_stats(group_ids) -> dict:
+    """按主键读取统计表，返回 {group_id: RobotGroupStats}；缺少统计行的组先按需重建"""
+    from .models import RobotGroupStats
+
+    group_ids = list(group_ids)
+    stats = RobotGroupStats.objects.in_bulk(group_ids)
+    missing = [group_id for group_id in group_ids if group_id not in stats]
+    if missing:
+        logger.info("组统计缺失 %s 个，按需重建", len(missing))
+        rebuild_group_stats(missing)
+        stats.update(RobotGroupStats.objects.in_bulk(missing))
+    return stats
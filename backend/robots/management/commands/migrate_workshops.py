@@ -15,6 +15,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 
+from robots.group_stats import rebuild_group_stats
 from robots.models import RiskEvent, RobotComponent, RobotGroup
 
 # Workshop mapping for renaming
@@ -377,6 +378,7 @@ class Command(BaseCommand):
         if components and not dry_run:
             RobotComponent.objects.bulk_create(components, batch_size=2000)
             self.stdout.write(self.style.SUCCESS(f"  Bulk created {len(components)} components"))
+            rebuild_group_stats()
 
         # Step 4: Create risk events for new workshops
         self.stdout.write(self.style.SUCCESS("\n=== Step 4: Creating risk events for new workshops ==="))
@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 
+from robots.group_stats import rebuild_group_stats
 from robots.models import RiskEvent, RobotComponent, RobotGroup
 
 
@@ -339,6 +340,7 @@ class Command(BaseCommand):
 
         RobotComponent.objects.bulk_create(components, batch_size=2000)
         seed_risk_events(groups, total_events=event_count)
+        rebuild_group_stats()
 
         self.stdout.write(self.style.SUCCESS(f"Seeded groups={len(ROBOT_GROUPS)}, components={len(components)}, events={event_count}"))
 
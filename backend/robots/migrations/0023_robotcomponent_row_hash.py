@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0022_add_source_key_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="robotcomponent",
+            name="row_hash",
+            field=models.CharField(blank=True, max_length=40, null=True, verbose_name="row_hash"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0023_robotcomponent_row_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportStageMetric",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("stage", models.CharField(choices=[("config_sync", "路径配置同步"), ("discover", "文件发现"), ("archive", "高风险归档"), ("decode", "编码识别/转码"), ("parse", "解析"), ("delete", "删除旧数据"), ("insert", "写入"), ("reference_dict", "reference 字典刷新")], max_length=32, verbose_name="阶段")),
+                ("source_file", models.CharField(blank=True, default="", max_length=255, verbose_name="源文件名")),
+                ("duration", models.FloatField(default=0, verbose_name="耗时(秒)")),
+                ("rows", models.PositiveIntegerField(default=0, verbose_name="处理行数")),
+                ("rows_per_sec", models.FloatField(blank=True, null=True, verbose_name="吞吐(行/秒)")),
+                ("peak_rss_mb", models.FloatField(blank=True, null=True, verbose_name="进程内存峰值(MB)")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="创建时间")),
+                ("refresh_log", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="stage_metrics", to="robots.refreshlog", verbose_name="刷新日志")),
+            ],
+            options={
+                "verbose_name": "导入阶段耗时",
+                "verbose_name_plural": "导入阶段耗时",
+                "db_table": "import_stage_metrics",
+                "ordering": ["id"],
+            },
+        ),
+    ]
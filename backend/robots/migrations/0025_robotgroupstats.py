@@ -0,0 +1,44 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0024_importstagemetric"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RobotGroupStats",
+            fields=[
+                ("group", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="stats", serialize=False, to="robots.robotgroup", verbose_name="组")),
+                ("total", models.PositiveIntegerField(default=0, verbose_name="总数")),
+                ("high_risk", models.PositiveIntegerField(default=0, verbose_name="高风险数")),
+                ("disconnected", models.PositiveIntegerField(default=0, verbose_name="失联数")),
+                ("level_h", models.PositiveIntegerField(default=0, verbose_name="level H")),
+                ("level_m", models.PositiveIntegerField(default=0, verbose_name="level M")),
+                ("level_l", models.PositiveIntegerField(default=0, verbose_name="level L")),
+                ("level_t", models.PositiveIntegerField(default=0, verbose_name="level T")),
+                ("level_c", models.PositiveIntegerField(default=0, verbose_name="level C")),
+                ("a1_high", models.PositiveIntegerField(default=0, verbose_name="A1 high")),
+                ("a2_high", models.PositiveIntegerField(default=0, verbose_name="A2 high")),
+                ("a3_high", models.PositiveIntegerField(default=0, verbose_name="A3 high")),
+                ("a4_high", models.PositiveIntegerField(default=0, verbose_name="A4 high")),
+                ("a5_high", models.PositiveIntegerField(default=0, verbose_name="A5 high")),
+                ("a6_high", models.PositiveIntegerField(default=0, verbose_name="A6 high")),
+                ("a7_high", models.PositiveIntegerField(default=0, verbose_name="A7 high")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="更新时间")),
+            ],
+            options={
+                "verbose_name": "车间统计",
+                "verbose_name_plural": "车间统计",
+                "db_table": "robot_group_stats",
+            },
+        ),
+        migrations.AlterField(
+            model_name="importstagemetric",
+            name="stage",
+            field=models.CharField(choices=[("config_sync", "路径配置同步"), ("discover", "文件发现"), ("archive", "高风险归档"), ("decode", "编码识别/转码"), ("parse", "解析"), ("delete", "删除旧数据"), ("insert", "写入"), ("reference_dict", "reference 字典刷新"), ("group_stats", "车间统计重建")], max_length=32, verbose_name="阶段"),
+        ),
+    ]
@@ -0,0 +1,95 @@
+from django.db import migrations, models
+from django.db.models import Q
+
+
+DISCONNECTED_FIELDS = [
+    "error1_c1",
+    "tem1_m",
+    "tem2_m",
+    "tem3_m",
+    "tem4_m",
+    "tem5_m",
+    "tem6_m",
+    "tem7_m",
+    "a1_e_rate",
+    "a2_e_rate",
+    "a3_e_rate",
+    "a4_e_rate",
+    "a5_e_rate",
+    "a6_e_rate",
+    "a7_e_rate",
+    "a1_rms",
+    "a2_rms",
+    "a3_rms",
+    "a4_rms",
+    "a5_rms",
+    "a6_rms",
+    "a7_rms",
+    "a1_e",
+    "a2_e",
+    "a3_e",
+    "a4_e",
+    "a5_e",
+    "a6_e",
+    "a7_e",
+    "q1",
+    "q2",
+    "q3",
+    "q4",
+    "q5",
+    "q6",
+    "q7",
+    "curr_a1_max",
+    "curr_a2_max",
+    "curr_a3_max",
+    "curr_a4_max",
+    "curr_a5_max",
+    "curr_a6_max",
+    "curr_a7_max",
+    "curr_a1_min",
+    "curr_a2_min",
+    "curr_a3_min",
+    "curr_a4_min",
+    "curr_a5_min",
+    "curr_a6_min",
+    "curr_a7_min",
+]
+
+
+def backfill_is_disconnected(apps, schema_editor):
+    """按现有指标列回填 is_disconnected"""
+    query = Q()
+    for field in DISCONNECTED_FIELDS:
+        query &= Q(**{f"{field}__isnull": True})
+    for model_name in ("RobotComponent", "RobotHighRiskSnapshot"):
+        model = apps.get_model("robots", model_name)
+        model.objects.filter(query).update(is_disconnected=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0025_robotgroupstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="robotcomponent",
+            name="is_disconnected",
+            field=models.BooleanField(default=False, verbose_name="是否失联"),
+        ),
+        migrations.AddField(
+            model_name="robothighrisksnapshot",
+            name="is_disconnected",
+            field=models.BooleanField(default=False, verbose_name="是否失联"),
+        ),
+        migrations.AddIndex(
+            model_name="robotcomponent",
+            index=models.Index(fields=["is_disconnected", "group"], name="robot_compo_disconn_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="robothighrisksnapshot",
+            index=models.Index(fields=["is_disconnected", "group"], name="robot_snaps_disconn_idx"),
+        ),
+        migrations.RunPython(backfill_is_disconnected, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# robot_components 与 _robot_high_risk_snapshots 的关键词搜索列（顺序需与 robots.search.KEYWORD_FIELDS 一致）
+KEYWORD_INDEXES = (
+    ("robot_components", "robot_compo_keyword_ft"),
+    ("_robot_high_risk_snapshots", "robot_snaps_keyword_ft"),
+)
+KEYWORD_COLUMNS = "`robot`, `shop`, `reference`, `type`, `tech`, `remark`"
+
+
+def create_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    for table, index_name in KEYWORD_INDEXES:
+        schema_editor.execute(
+            f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{index_name}` ({KEYWORD_COLUMNS}) WITH PARSER ngram"
+        )
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    for table, index_name in KEYWORD_INDEXES:
+        schema_editor.execute(f"ALTER TABLE `{table}` DROP INDEX `{index_name}`")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0026_is_disconnected"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_indexes, drop_fulltext_indexes, atomic=False),
+    ]
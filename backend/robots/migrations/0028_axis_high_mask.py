@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+
+AXIS_FIELDS = ("a1", "a2", "a3", "a4", "a5", "a6", "a7")
+BATCH_SIZE = 1000
+
+
+def _axis_mask(values) -> int:
+    # 与 models.is_axis_high 相同的判断（strip + lower），保证回填结果与之后保存时一致
+    mask = 0
+    for bit, value in enumerate(values):
+        if str(value or "").strip().lower() == "high":
+            mask |= 1 << bit
+    return mask
+
+
+def backfill_axis_high_mask(apps, schema_editor):
+    """按现有 A1~A7 回填 axis_high_mask"""
+    for model_name in ("RobotComponent", "RobotHighRiskSnapshot"):
+        model = apps.get_model("robots", model_name)
+        ids_by_mask = defaultdict(list)
+        rows = model.objects.order_by().values_list("id", *AXIS_FIELDS).iterator(chunk_size=BATCH_SIZE)
+        for pk, *values in rows:
+            mask = _axis_mask(values)
+            if mask:
+                ids_by_mask[mask].append(pk)
+        for mask, ids in ids_by_mask.items():
+            for start in range(0, len(ids), BATCH_SIZE):
+                model.objects.filter(id__in=ids[start:start + BATCH_SIZE]).update(axis_high_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0027_keyword_fulltext_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="robotcomponent",
+            name="axis_high_mask",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="轴 high 位掩码"),
+        ),
+        migrations.AddField(
+            model_name="robothighrisksnapshot",
+            name="axis_high_mask",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="轴 high 位掩码"),
+        ),
+        migrations.AddIndex(
+            model_name="robotcomponent",
+            index=models.Index(fields=["axis_high_mask"], name="robot_compo_axis_mask_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="robothighrisksnapshot",
+            index=models.Index(fields=["axis_high_mask"], name="robot_snaps_axis_mask_idx"),
+        ),
+        migrations.RunPython(backfill_axis_high_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0028_axis_high_mask"),
+    ]
+
+    operations = [
+        # ru_maxrss 是整个进程生命周期的峰值，不是单个阶段的峰值
+        migrations.RenameField(
+            model_name="importstagemetric",
+            old_name="peak_rss_mb",
+            new_name="process_peak_rss_mb",
+        ),
+        migrations.AlterField(
+            model_name="importstagemetric",
+            name="process_peak_rss_mb",
+            field=models.FloatField(blank=True, null=True, verbose_name="进程内存历史峰值(MB)"),
+        ),
+    ]
@@ -1,5 +1,94 @@
 from django.db import models
 
+# 全部为空即视为失联的指标列；导入和编辑时据此写入 is_disconnected
+DISCONNECTED_FIELDS = [
+    "error1_c1",
+    "tem1_m",
+    "tem2_m",
+    "tem3_m",
+    "tem4_m",
+    "tem5_m",
+    "tem6_m",
+    "tem7_m",
+    "a1_e_rate",
+    "a2_e_rate",
+    "a3_e_rate",
+    "a4_e_rate",
+    "a5_e_rate",
+    "a6_e_rate",
+    "a7_e_rate",
+    "a1_rms",
+    "a2_rms",
+    "a3_rms",
+    "a4_rms",
+    "a5_rms",
+    "a6_rms",
+    "a7_rms",
+    "a1_e",
+    "a2_e",
+    "a3_e",
+    "a4_e",
+    "a5_e",
+    "a6_e",
+    "a7_e",
+    "q1",
+    "q2",
+    "q3",
+    "q4",
+    "q5",
+    "q6",
+    "q7",
+    "curr_a1_max",
+    "curr_a2_max",
+    "curr_a3_max",
+    "curr_a4_max",
+    "curr_a5_max",
+    "curr_a6_max",
+    "curr_a7_max",
+    "curr_a1_min",
+    "curr_a2_min",
+    "curr_a3_min",
+    "curr_a4_min",
+    "curr_a5_min",
+    "curr_a6_min",
+    "curr_a7_min",
+]
+
+
+def compute_is_disconnected(obj) -> bool:
+    return all(getattr(obj, field) is None for field in DISCONNECTED_FIELDS)
+
+
+# A1~A7 轴状态位：第 i 位为 1 表示 A(i+1) 为 high
+AXIS_FIELDS = ("a1", "a2", "a3", "a4", "a5", "a6", "a7")
+AXIS_MASK_VALUES = range(1 << len(AXIS_FIELDS))
+
+
+def axis_bit(axis: str) -> int:
+    """轴名（A1 / a1）对应的位"""
+    return 1 << AXIS_FIELDS.index(axis.lower())
+
+
+def is_axis_high(value) -> bool:
+    return str(value or "").strip().lower() == "high"
+
+
+def axis_mask_values(required: int = 0, forbidden: int = 0) -> list:
+    """
+    满足条件的全部掩码取值（共 128 种），用于生成 axis_high_mask IN (...) 条件
+
+    required 中的位必须为 high，forbidden 中的位必须不为 high。
+    """
+    return [value for value in AXIS_MASK_VALUES if value & required == required and not value & forbidden]
+
+
+def compute_axis_high_mask(obj) -> int:
+    mask = 0
+    for index, field in enumerate(AXIS_FIELDS):
+        if is_axis_high(getattr(obj, field)):
+            mask |= 1 << index
+    return mask
+
 
 class RobotGroup(models.Model):
     key = models.CharField(max_length=32, unique=True, verbose_name="组Key")
@@ -128,6 +217,12 @@ class RobotComponent(models.Model):
         verbose_name="source_key",
     )
     source_path = models.TextField(null=True, blank=True, verbose_name="source_path")
+    # DISCONNECTED_FIELDS 全部为空时为 True，失联筛选只走该列索引
+    is_disconnected = models.BooleanField(default=False, verbose_name="是否失联")
+    # A1~A7 为 high 的位掩码（见 AXIS_FIELDS），轴筛选按取值集合走索引
+    axis_high_mask = models.PositiveSmallIntegerField(default=0, verbose_name="轴 high 位掩码")
+    # 导入时按 CSV 字段计算的行哈希，差异导入模式据此判断是否需要更新
+    row_hash = models.CharField(max_length=40, null=True, blank=True, verbose_name="row_hash")
 
     # 元数据字段
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
@@ -143,16 +238,65 @@ class RobotComponent(models.Model):
             models.Index(fields=["shop"]),
             models.Index(fields=["level"]),
             models.Index(fields=["group"]),
+            models.Index(fields=["is_disconnected", "group"], name="robot_compo_disconn_idx"),
+            models.Index(fields=["axis_high_mask"], name="robot_compo_axis_mask_idx"),
         ]
 
     def __str__(self):
         return f"{self.robot} ({self.shop})"
 
+    def save(self, *args, **kwargs):
+        self.is_disconnected = compute_is_disconnected(self)
+        self.axis_high_mask = compute_axis_high_mask(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "is_disconnected", "axis_high_mask"}
+        super().save(*args, **kwargs)
+
     @property
     def is_high_risk(self) -> bool:
         return self.level == "H"
 
 
+class RobotGroupStats(models.Model):
+    """
+    车间统计物化表
+
+    导入结束后由 group_stats.rebuild_group_stats 整表重建，组件编辑时按差量更新。
+    """
+    group = models.OneToOneField(
+        RobotGroup,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="组",
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name="总数")
+    high_risk = models.PositiveIntegerField(default=0, verbose_name="高风险数")
+    disconnected = models.PositiveIntegerField(default=0, verbose_name="失联数")
+    level_h = models.PositiveIntegerField(default=0, verbose_name="level H")
+    level_m = models.PositiveIntegerField(default=0, verbose_name="level M")
+    level_l = models.PositiveIntegerField(default=0, verbose_name="level L")
+    level_t = models.PositiveIntegerField(default=0, verbose_name="level T")
+    level_c = models.PositiveIntegerField(default=0, verbose_name="level C")
+    a1_high = models.PositiveIntegerField(default=0, verbose_name="A1 high")
+    a2_high = models.PositiveIntegerField(default=0, verbose_name="A2 high")
+    a3_high = models.PositiveIntegerField(default=0, verbose_name="A3 high")
+    a4_high = models.PositiveIntegerField(default=0, verbose_name="A4 high")
+    a5_high = models.PositiveIntegerField(default=0, verbose_name="A5 high")
+    a6_high = models.PositiveIntegerField(default=0, verbose_name="A6 high")
+    a7_high = models.PositiveIntegerField(default=0, verbose_name="A7 high")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        db_table = "robot_group_stats"
+        verbose_name = "车间统计"
+        verbose_name_plural = "车间统计"
+
+    def __str__(self):
+        return f"{self.group_id}: {self.total}"
+
+
 class RiskEvent(models.Model):
     SEVERITY_CHOICES = [
         ("critical", "严重"),
@@ -408,6 +552,8 @@ class RobotHighRiskSnapshot(models.Model):
         verbose_name="source_key",
     )
     source_path = models.TextField(null=True, blank=True, verbose_name="source_path")
+    is_disconnected = models.BooleanField(default=False, verbose_name="是否失联")
+    axis_high_mask = models.PositiveSmallIntegerField(default=0, verbose_name="轴 high 位掩码")
 
     # 元数据字段
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
@@ -424,6 +570,8 @@ class RobotHighRiskSnapshot(models.Model):
             models.Index(fields=["level"]),
             models.Index(fields=["group"]),
             models.Index(fields=["-created_at"]),
+            models.Index(fields=["is_disconnected", "group"], name="robot_snaps_disconn_idx"),
+            models.Index(fields=["axis_high_mask"], name="robot_snaps_axis_mask_idx"),
         ]
 
     def __str__(self):
@@ -513,6 +661,46 @@ class RefreshLog(models.Model):
         return f"{self.get_source_display()} - {self.sync_time.strftime('%Y-%m-%d %H:%M:%S')}"
 
 
+class ImportStageMetric(models.Model):
+    """
+    导入阶段耗时表
+    记录一次同步中每个阶段（按文件或整体）的耗时、吞吐和进程内存峰值
+    """
+    STAGE_CHOICES = [
+        ("config_sync", "路径配置同步"),
+        ("discover", "文件发现"),
+        ("archive", "高风险归档"),
+        ("decode", "编码识别/转码"),
+        ("parse", "解析"),
+        ("delete", "删除旧数据"),
+        ("insert", "写入"),
+        ("reference_dict", "reference 字典刷新"),
+        ("group_stats", "车间统计重建"),
+    ]
+
+    refresh_log = models.ForeignKey(
+        RefreshLog, on_delete=models.CASCADE, related_name="stage_metrics", verbose_name="刷新日志"
+    )
+    stage = models.CharField(max_length=32, choices=STAGE_CHOICES, verbose_name="阶段")
+    # 空字符串表示整次同步级别的阶段
+    source_file = models.CharField(max_length=255, blank=True, default="", verbose_name="源文件名")
+    duration = models.FloatField(default=0, verbose_name="耗时(秒)")
+    rows = models.PositiveIntegerField(default=0, verbose_name="处理行数")
+    rows_per_sec = models.FloatField(null=True, blank=True, verbose_name="吞吐(行/秒)")
+    # 记录阶段结束时进程的内存历史峰值（ru_maxrss），不是该阶段自身的峰值
+    process_peak_rss_mb = models.FloatField(null=True, blank=True, verbose_name="进程内存历史峰值(MB)")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+
+    class Meta:
+        db_table = "import_stage_metrics"
+        verbose_name = "导入阶段耗时"
+        verbose_name_plural = "导入阶段耗时"
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.refresh_log_id} - {self.stage} {self.source_file} ({self.duration:.3f}s)"
+
+
 class SystemConfig(models.Model):
     """
     系统配置模型
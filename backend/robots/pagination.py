@@ -0,0 +1,235 @@
+"""
+组件 / 高风险快照列表的键集（cursor）分页
+
+请求带 cursor 参数（首屏传空值 ``cursor=``）时启用：按 (排序字段, id) 做键集比较，
+任意深度的翻页都只需一次索引范围扫描，不再执行 COUNT(*) + OFFSET。
+排序字段沿用视图的 sort_by / sort_order 白名单，id 作为同值时的决胜字段。
+关键词搜索（apply_keyword_search）且未显式指定 sort_by 时，按 (keyword_rank, keyword_score, id)
+降序翻页，与页码分页的相关度排序一致。
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .search import RELEVANCE_ANNOTATIONS
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def approximate_count(queryset):
+    """
+    表行数估计，不执行 COUNT(*)
+
+    未带筛选条件时读取 information_schema.TABLES.TABLE_ROWS（InnoDB 统计值，可能有百分之几十的偏差）；
+    带筛选条件或非 MySQL 数据库时没有廉价估计，返回 None。
+    """
+    connection = connections[queryset.db]
+    if queryset.query.where or connection.vendor != "mysql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if not row or row[0] is None:
+        return None
+    return int(row[0])
+
+
+class KeysetPagination(BasePagination):
+    """
+    (sort_by, id) 键集分页
+
+    视图需提供 sort_fields（允许排序的字段集合）和 default_sort（默认排序，形如 "-updated_at"）。
+    返回 {"next", "previous", "results"}，带 with_count=1 且没有筛选条件时附加表行数估计 count。
+    """
+
+    # apply_keyword_search 添加的相关度注解，未显式排序时按其降序翻页
+    relevance_keys = RELEVANCE_ANNOTATIONS
+
+    cursor_query_param = "cursor"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    count_query_param = "with_count"
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def _resolve_ordering(self, queryset, request, view):
+        """
+        返回 (keys, descending)
+
+        keys 为 [(列名, 模型字段或 None)]，按字典序比较，最后以 id 决胜；descending 为整体方向。
+        """
+        model = queryset.model
+        sort_by = (request.query_params.get("sort_by") or "").strip()
+        sort_order = (request.query_params.get("sort_order") or "").lower()
+        if sort_by in getattr(view, "sort_fields", ()):
+            descending = sort_order == "desc"
+        elif all(name in queryset.query.annotations for name in self.relevance_keys):
+            return [(name, None) for name in self.relevance_keys], True
+        else:
+            default_sort = getattr(view, "default_sort", "-id")
+            sort_by = default_sort.lstrip("-")
+            descending = default_sort.startswith("-")
+        try:
+            field = model._meta.get_field(sort_by)
+        except FieldDoesNotExist:
+            field, descending = model._meta.pk, True
+        return [(field.attname, field)], descending
+
+    def _decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param) or ""
+        if not raw:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")).decode("utf-8"))
+            values = payload["v"]
+            if not isinstance(values, list):
+                values = [values]
+            return values, int(payload["id"]), bool(payload.get("r"))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound("无效的 cursor")
+
+    def _encode_cursor(self, values, pk, reverse: bool) -> str:
+        values = [_encode_value(value) for value in values]
+        payload = {"v": values[0] if len(values) == 1 else values, "id": pk}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _after(names, values, pk: int, descending: bool) -> Q:
+        """
+        按 (names..., id) 字典序排在 (values..., pk) 之后的记录
+
+        空值位置与 MySQL 默认一致：升序时排在最前，降序时排在最后。
+        """
+        result = Q()
+        equal = Q()
+        for name, value in zip(names, values):
+            if value is None:
+                # 降序时空值排在最后，之后没有严格更“后”的非空值
+                strictly_after = None if descending else Q(**{f"{name}__isnull": False})
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                lookup = "lt" if descending else "gt"
+                strictly_after = Q(**{f"{name}__{lookup}": value})
+                if descending:
+                    strictly_after |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            if strictly_after is not None:
+                result |= equal & strictly_after
+            equal &= same
+        return result | (equal & Q(**{"id__lt" if descending else "id__gt": pk}))
+
+    @staticmethod
+    def _order_by(names, descending: bool):
+        if descending:
+            return [*(F(name).desc(nulls_last=True) for name in names), F("id").desc()]
+        return [*(F(name).asc(nulls_first=True) for name in names), F("id").asc()]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        keys, descending = self._resolve_ordering(queryset, request, view)
+        self._field_names = names = [name for name, _ in keys]
+        fields = getattr(queryset, "_fields", None)
+        if fields and any(name not in fields for name in names):
+            # .values() 投影的列表需要带上排序列才能生成游标
+            queryset = queryset.values(*fields, *(name for name in names if name not in fields))
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = approximate_count(queryset)
+
+        cursor = self._decode_cursor(request)
+        reverse = bool(cursor and cursor[2])
+        # 向前翻页时反向扫描，取到后再翻转回原顺序
+        scan_descending = descending != reverse
+        if cursor is not None:
+            values, pk, _ = cursor
+            if len(values) != len(keys):
+                raise NotFound("无效的 cursor")
+            converted = []
+            for (_, field), value in zip(keys, values):
+                if value is not None and field is not None:
+                    try:
+                        value = field.to_python(value)
+                    except ValidationError:
+                        raise NotFound("无效的 cursor")
+                converted.append(value)
+            queryset = queryset.filter(self._after(names, converted, pk, scan_descending))
+
+        rows = list(queryset.order_by(*self._order_by(names, scan_descending))[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = True if reverse else has_more
+        self.has_previous = has_more if reverse else cursor is not None
+        self.rows = rows
+        return rows
+
+    def _cursor_url(self, row, reverse: bool):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.count_query_param)
+        if isinstance(row, dict):
+            values, pk = [row[name] for name in self._field_names], row["id"]
+        else:
+            values, pk = [getattr(row, name) for name in self._field_names], row.pk
+        return replace_query_param(url, self.cursor_query_param, self._encode_cursor(values, pk, reverse))
+
+    def get_next_link(self):
+        if not self.rows or not self.has_next:
+            return None
+        return self._cursor_url(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.rows or not self.has_previous:
+            return None
+        return self._cursor_url(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.count is not None:
+            payload["count"] = self.count
+            payload["countApproximate"] = True
+        return Response(payload)
+
+
+class KeysetPaginationMixin:
+    """请求带 cursor 参数时改用 KeysetPagination，否则保持 pagination_class 的页码分页"""
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if KeysetPagination.cursor_query_param in self.request.query_params:
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
@@ -0,0 +1,97 @@
+"""
+只读机器人接口的响应缓存
+
+缓存键包含数据代号（data generation）：导入、reference 字典刷新和组件编辑后调用
+bump_data_generation 使代号加一，旧代号下的缓存自然失效，不需要逐个删除。
+响应附带由代号计算的 ETag，前端带 If-None-Match 轮询时未变化直接返回 304，
+只需读取一次 Redis 中的代号。
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+DATA_GENERATION_KEY = "robots:data_generation"
+RESPONSE_CACHE_PREFIX = "robots:response"
+
+
+def _new_generation() -> int:
+    # 代号键被驱逐后从时间戳重新开始，避免与残留的旧缓存键撞号
+    return int(time.time() * 1000)
+
+
+def get_data_generation() -> int:
+    generation = cache.get(DATA_GENERATION_KEY)
+    if generation is None:
+        cache.add(DATA_GENERATION_KEY, _new_generation(), timeout=None)
+        generation = cache.get(DATA_GENERATION_KEY) or 0
+    return int(generation)
+
+
+def bump_data_generation() -> int:
+    """robot_components / 刷新日志 / reference 字典变化后调用，使全部响应缓存失效"""
+    try:
+        return cache.incr(DATA_GENERATION_KEY)
+    except ValueError:
+        generation = _new_generation()
+        cache.set(DATA_GENERATION_KEY, generation, timeout=None)
+        return generation
+    except Exception as exc:
+        # Redis 不可用时缓存本身也读不到，不影响写入流程
+        logger.warning("更新数据代号失败: %s", exc)
+        return 0
+
+
+def _params_digest(request) -> str:
+    items = sorted((key, tuple(request.query_params.getlist(key))) for key in request.query_params)
+    return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()[:16]
+
+
+def _etag_matches(request, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    return any(tag.strip() in (etag, "*") for tag in header.split(",") if tag.strip())
+
+
+def cached_response(request, namespace: str, build, timeout=None, version=None) -> Response:
+    """
+    按 (namespace, 数据代号, 查询参数) 缓存 build() 返回的数据并生成 Response
+
+    Args:
+        request: DRF 请求
+        namespace: 接口标识
+        build: 无参函数，返回可 JSON 序列化的响应数据
+        timeout: 缓存时间（秒），默认 ROBOT_RESPONSE_CACHE_TTL
+        version: 额外的数据水位（如 risk_events 的 max id / updated_at），
+            用于不经过 bump_data_generation 的数据源，变化后缓存键与 ETag 随之变化
+    """
+    if timeout is None:
+        timeout = getattr(settings, "ROBOT_RESPONSE_CACHE_TTL", 300)
+    if not timeout:
+        return Response(build())
+
+    try:
+        generation = get_data_generation()
+    except Exception as exc:
+        logger.warning("读取数据代号失败，跳过响应缓存: %s", exc)
+        return Response(build())
+
+    digest = _params_digest(request)
+    if version is not None:
+        digest = f"{digest}-{hashlib.sha1(str(version).encode('utf-8')).hexdigest()[:8]}"
+    etag = f'W/"{namespace}-{generation}-{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = f"{RESPONSE_CACHE_PREFIX}:{namespace}:{generation}:{digest}"
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=timeout)
+    return Response(data, headers=headers)
@@ -4,12 +4,18 @@
 用于在编辑机器人数据后同步更新本地CSV配置文件
 """
 import csv
+import hashlib
 import logging
 import os
-import glob
+import shutil
+import tempfile
+from contextlib import nullcontext
 from pathlib import Path
 from django.conf import settings
+from django.core.cache import cache
+from .csv_source import open_text
 from .models import PathConfig
+from .weekly_result_index import latest_weeklyresult_file
 
 logger = logging.getLogger(__name__)
 
@@ -155,13 +161,8 @@ def get_weekly_to_reference_dict_map() -> list:
 
 
 def _find_latest_weeklyresult_csv(folder: str):
-    if not folder:
-        return None
-    pattern = os.path.join(folder, "*weeklyresult.csv")
-    matched = glob.glob(pattern)
-    if not matched:
-        return None
-    return max(matched, key=os.path.getctime)
+    latest = latest_weeklyresult_file(folder, key="ctime")
+    return latest["path"] if latest else None
 
 
 def _robot_in_weeklyresult_csv(robot: str, csv_path: str) -> bool:
@@ -171,28 +172,108 @@ def _robot_in_weeklyresult_csv(robot: str, csv_path: str) -> bool:
     if not robot:
         return False
 
-    for encoding in ("utf-8", "utf-8-sig", "gb18030"):
-        try:
-            with open(csv_path, "r", encoding=encoding, newline="") as file_obj:
-                reader = csv.reader(file_obj)
-                header = next(reader, None)
-                if not header:
-                    return False
-                header_norm = [(h or "").strip().lower() for h in header]
-                if "robot" not in header_norm:
-                    return False
-                robot_idx = header_norm.index("robot")
-                for row in reader:
-                    if robot_idx < len(row) and str(row[robot_idx]).strip() == robot:
-                        return True
-            return False
-        except UnicodeDecodeError:
+    try:
+        with open_text(csv_path) as file_obj:
+            reader = csv.reader(file_obj)
+            header = next(reader, None)
+            if not header:
+                return False
+            header_norm = [(h or "").strip().lstrip("\ufeff").lower() for h in header]
+            if "robot" not in header_norm:
+                return False
+            robot_idx = header_norm.index("robot")
+            for row in reader:
+                if robot_idx < len(row) and str(row[robot_idx]).strip() == robot:
+                    return True
+        return False
+    except Exception as exc:
+        logger.warning("读取 weeklyresult 失败: %s (%s)", csv_path, exc)
+        return False
+
+
+def _robots_in_weeklyresult_csv(robots, csv_path: str) -> set:
+    """一次扫描 weeklyresult，返回 robots 中出现在该文件里的机器人"""
+    wanted = {str(robot).strip() for robot in robots if robot and str(robot).strip()}
+    found = set()
+    if not wanted or not csv_path:
+        return found
+
+    try:
+        with open_text(csv_path) as file_obj:
+            reader = csv.reader(file_obj)
+            header = next(reader, None)
+            if not header:
+                return found
+            header_norm = [(h or "").strip().lstrip("\ufeff").lower() for h in header]
+            if "robot" not in header_norm:
+                return found
+            robot_idx = header_norm.index("robot")
+            for row in reader:
+                if robot_idx < len(row):
+                    value = str(row[robot_idx]).strip()
+                    if value in wanted:
+                        found.add(value)
+                        if len(found) == len(wanted):
+                            break
+    except Exception as exc:
+        logger.warning("读取 weeklyresult 失败: %s (%s)", csv_path, exc)
+    return found
+
+
+def _normalize_folder(folder) -> str:
+    return os.path.normcase(os.path.normpath(str(folder)))
+
+
+def _resolve_from_source_index(robots, mapping) -> dict:
+    """
+    按机器人来源索引把机器人映射到 mapping 中对应的目标文件
+
+    mapping: [(weekly 目录, 目标文件)]；索引失效或未命中的机器人不在结果中
+    """
+    from .robot_source_index import lookup_robot_source_folders
+
+    try:
+        folders = lookup_robot_source_folders(robots)
+    except Exception as exc:
+        logger.warning("读取机器人来源索引失败，改为扫描 weeklyresult: %s", exc)
+        return {}
+    if not folders:
+        return {}
+    targets = {}
+    for weekly_folder, target in mapping:
+        targets.setdefault(_normalize_folder(weekly_folder), target)
+    resolved = {}
+    for robot, folder in folders.items():
+        target = targets.get(_normalize_folder(folder))
+        if target is not None:
+            resolved[robot] = target
+    return resolved
+
+
+def resolve_robot_config_csv_paths(robots) -> dict:
+    """
+    批量定位机器人对应的 robot_config CSV，每个 weeklyresult 文件只扫描一次
+
+    返回: {robot: Path}，未命中的机器人不在结果中
+    """
+    robots = [str(robot).strip() for robot in robots if robot and str(robot).strip()]
+    mapping = get_weekly_to_config_csv_map()
+    if not mapping or not robots:
+        return {}
+    if len(mapping) == 1:
+        return {robot: mapping[0][1] for robot in robots}
+
+    resolved = _resolve_from_source_index(robots, mapping)
+    for weekly_folder, config_path in mapping:
+        pending = [robot for robot in robots if robot not in resolved]
+        if not pending:
+            break
+        latest_file = _find_latest_weeklyresult_csv(weekly_folder)
+        if not latest_file:
             continue
-        except Exception as exc:
-            logger.warning("读取 weeklyresult 失败: %s (%s)", csv_path, exc)
-            return False
-    logger.warning("无法识别 weeklyresult 编码: %s", csv_path)
-    return False
+        for robot in _robots_in_weeklyresult_csv(pending, latest_file):
+            resolved[robot] = config_path
+    return resolved
 
 
 def resolve_robot_config_csv_path(robot: str) -> Path | None:
@@ -205,6 +286,10 @@ def resolve_robot_config_csv_path(robot: str) -> Path | None:
     if len(mapping) == 1:
         return mapping[0][1]
 
+    indexed = _resolve_from_source_index([robot], mapping)
+    if robot in indexed:
+        return indexed[robot]
+
     matched_paths = []
     for weekly_folder, config_path in mapping:
         latest_file = _find_latest_weeklyresult_csv(weekly_folder)
@@ -234,6 +319,10 @@ def resolve_reference_dict_csv_path(robot: str) -> Path | None:
     if len(mapping) == 1:
         return mapping[0][1]
 
+    indexed = _resolve_from_source_index([robot], mapping)
+    if robot in indexed:
+        return indexed[robot]
+
     matched_paths = []
     for weekly_folder, dict_path in mapping:
         latest_file = _find_latest_weeklyresult_csv(weekly_folder)
@@ -382,18 +471,11 @@ def write_robot_config_csv(data, csv_path=None):
         return
 
     try:
-        # 定义字段顺序
-        fieldnames = ['robot', 'shop', 'reference', 'number', 'type', 'tech', 'mark', 'remark']
-
         results = []
         for path in csv_paths:
             # 确保目录存在
             path.parent.mkdir(parents=True, exist_ok=True)
-
-            with path.open("w", encoding="utf-8-sig", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
+            _atomic_write_csv(path, data)
 
             logger.info(f"写入CSV配置文件成功: {len(data)} 条记录 -> {path}")
             results.append(True)
@@ -403,34 +485,92 @@ def write_robot_config_csv(data, csv_path=None):
         return False
 
 
+ROBOT_CONFIG_FIELDNAMES = ['robot', 'shop', 'reference', 'number', 'type', 'tech', 'mark', 'remark']
+
+
+def _atomic_write_csv(path: Path, rows, encoding="utf-8-sig"):
+    """
+    先写同目录临时文件再 os.replace，读取方不会看到写了一半的文件
+
+    mkstemp 创建的文件权限为 0600，替换前沿用原文件的权限（新文件使用 0644），
+    避免其他读取该 CSV 的工具失去读权限。
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=ROBOT_CONFIG_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        else:
+            os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
 def _update_robot_in_single_csv(robot, updates, csv_path):
+    return robot in _update_robots_in_single_csv({robot: updates}, csv_path)
+
+
+def _csv_file_lock(csv_path: Path):
+    """同一个 CSV 的读取-合并-替换跨进程串行执行，避免并发回写互相覆盖"""
+    lock = getattr(cache, "lock", None)
+    if lock is None:
+        return nullcontext()
+    digest = hashlib.sha1(str(csv_path).encode("utf-8")).hexdigest()[:16]
+    timeout = getattr(settings, "ROBOT_CSV_WRITEBACK_LOCK_TIMEOUT", 60)
+    return lock(f"robots:csv_writeback:file:{digest}", timeout=timeout, blocking_timeout=timeout)
+
+
+def _update_robots_in_single_csv(updates_by_robot: dict, csv_path) -> set:
+    """
+    在一个 CSV 中按机器人批量更新并只重写一次文件（持有该文件的写锁）
+
+    Args:
+        updates_by_robot: {robot: {字段: 值}}
+        csv_path: CSV文件路径
+
+    返回: set - 在文件中找到并已写回的机器人
+    """
+    csv_path = Path(csv_path)
+    with _csv_file_lock(csv_path):
+        return _merge_robots_into_csv(updates_by_robot, csv_path)
+
+
+def _merge_robots_into_csv(updates_by_robot: dict, csv_path: Path) -> set:
+    """读取 CSV、合并各机器人的更新并原子替换原文件"""
     if not csv_path.exists():
         logger.warning(f"CSV配置文件不存在: {csv_path}")
-        return False
+        return set()
 
     # 尝试多种编码读取 CSV 文件
     data = None
     detected_encoding = None
+    found = set()
     for encoding in ("utf-8-sig", "utf-8", "gb18030", "gbk", "gb2312"):
         try:
             temp_data = []
-            found = False
+            temp_found = set()
             with csv_path.open("r", encoding=encoding, newline="") as f:
                 reader = csv.DictReader(f)
                 for row in reader:
-                    if row['robot'] == robot:
+                    updates = updates_by_robot.get(row['robot'])
+                    if updates is not None:
                         # 更新匹配的行
                         for key, value in updates.items():
                             if value is not None:
                                 row[key] = str(value)
-                        found = True
+                        temp_found.add(row['robot'])
                     temp_data.append(row)
 
-            if not found:
-                logger.warning(f"在CSV中未找到机器人: {robot} ({csv_path})")
-                return False
-
             data = temp_data
+            found = temp_found
             detected_encoding = encoding
             break
         except UnicodeDecodeError:
@@ -441,23 +581,25 @@ def _update_robot_in_single_csv(robot, updates, csv_path):
 
     if data is None:
         logger.error(f"无法识别CSV文件编码: {csv_path}")
-        return False
+        return set()
+
+    missing = set(updates_by_robot) - found
+    if missing:
+        logger.warning(f"在CSV中未找到机器人: {sorted(missing)} ({csv_path})")
+    if not found:
+        return set()
 
     try:
         # 写回文件（使用检测到的编码或默认 utf-8-sig）
         write_encoding = detected_encoding if detected_encoding and detected_encoding != "utf-8-sig" else "utf-8-sig"
-        fieldnames = ['robot', 'shop', 'reference', 'number', 'type', 'tech', 'mark', 'remark']
-        with csv_path.open("w", encoding=write_encoding, newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
+        _atomic_write_csv(csv_path, data, encoding=write_encoding)
 
-        logger.info(f"CSV文件更新成功: robot={robot}, updates={updates}, file={csv_path}, 编码: {write_encoding}")
-        return True
+        logger.info(f"CSV文件更新成功: robots={sorted(found)}, file={csv_path}, 编码: {write_encoding}")
+        return found
 
     except Exception as e:
         logger.error(f"更新CSV文件失败: {e}")
-        return False
+        return set()
 
 
 def update_robot_in_csv(robot, updates, csv_path=None):
@@ -484,6 +626,19 @@ def update_robot_in_csv(robot, updates, csv_path=None):
     return any(results) if results else False
 
 
+def component_csv_updates(robot_component) -> dict:
+    """RobotComponent 中需要写回 robot_config CSV 的字段"""
+    return {
+        'shop': robot_component.shop or '',
+        'reference': robot_component.reference or '',
+        'number': robot_component.number if robot_component.number is not None else '',
+        'type': robot_component.type or '',
+        'tech': robot_component.tech or '',
+        'mark': robot_component.mark or 0,
+        'remark': robot_component.remark or '',
+    }
+
+
 def sync_robot_component_to_csv(robot_component):
     """
     将RobotComponent的数据同步到CSV配置文件
@@ -493,15 +648,7 @@ def sync_robot_component_to_csv(robot_component):
 
     返回: bool - 是否同步成功
     """
-    updates = {
-        'shop': robot_component.shop or '',
-        'reference': robot_component.reference or '',
-        'number': robot_component.number if robot_component.number is not None else '',
-        'type': robot_component.type or '',
-        'tech': robot_component.tech or '',
-        'mark': robot_component.mark or 0,
-        'remark': robot_component.remark or '',
-    }
+    updates = component_csv_updates(robot_component)
 
     target_path = resolve_robot_config_csv_path(robot_component.robot)
     if target_path is None:
@@ -513,6 +660,28 @@ def sync_robot_component_to_csv(robot_component):
     return update_robot_in_csv(robot_component.robot, updates, csv_path=target_path)
 
 
+def sync_robot_components_to_csv(robot_components) -> dict:
+    """
+    批量同步多个 RobotComponent 到 CSV 配置文件，每个受影响的 CSV 只重写一次
+
+    返回: {robot: bool} - 各机器人是否同步成功
+    """
+    updates_by_robot = {component.robot: component_csv_updates(component) for component in robot_components}
+    target_paths = resolve_robot_config_csv_paths(updates_by_robot)
+
+    grouped = {}
+    for robot, path in target_paths.items():
+        grouped.setdefault(Path(path), {})[robot] = updates_by_robot[robot]
+    unresolved = sorted(set(updates_by_robot) - set(target_paths))
+    if unresolved:
+        logger.warning("未找到匹配的 robot_config CSV，跳过同步: robots=%s", unresolved)
+
+    synced = set()
+    for path, updates in grouped.items():
+        synced |= _update_robots_in_single_csv(updates, path)
+    return {robot: robot in synced for robot in updates_by_robot}
+
+
 def get_csv_backup_path(csv_path=None):
     """
     获取CSV备份文件路径
@@ -0,0 +1,94 @@
+"""
+机器人 → weeklyresult 来源目录索引
+
+导入结束后按 robot_components.source_path 建立 {robot: 来源目录} 映射写入 Redis，
+同时记录各目录当时最新 weeklyresult 文件的路径和 mtime。查询时只比对这些文件签名
+（走 weekly_result_index 的目录缓存，不读取 CSV 内容）：签名一致直接查字典；
+不一致说明有新文件尚未导入，返回 None，由调用方退回逐文件扫描。
+进程内按版本号保留一份映射，版本未变时不重复从 Redis 反序列化。
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+from .weekly_result_index import latest_weeklyresult_file
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = "robots:source_index"
+INDEX_VERSION_KEY = "robots:source_index:version"
+
+_lock = threading.Lock()
+_local = {"version": None, "index": None}
+
+
+def _folder_signature(folder: str):
+    # 与 robot_config_sync 定位文件时一致，按 ctime 取最新文件
+    latest = latest_weeklyresult_file(folder, key="ctime")
+    if not latest:
+        return None
+    return [latest["path"], latest["mtime"]]
+
+
+def rebuild_robot_source_index() -> int:
+    """按 robot_components 重建索引，返回收录的机器人数量"""
+    from .models import RobotComponent
+
+    robots = {}
+    rows = (
+        RobotComponent.objects.exclude(source_path__isnull=True)
+        .exclude(source_path="")
+        .order_by("id")
+        .values_list("robot", "source_path")
+    )
+    for robot, folder in rows.iterator(chunk_size=5000):
+        robot = (robot or "").strip()
+        if robot:
+            # 同一机器人出现在多个来源时保留第一条，与逐文件扫描取第一个命中一致
+            robots.setdefault(robot, folder)
+
+    version = time.time_ns()
+    index = {
+        "version": version,
+        "folders": {folder: _folder_signature(folder) for folder in set(robots.values())},
+        "robots": robots,
+    }
+    cache.set(INDEX_KEY, index, timeout=None)
+    cache.set(INDEX_VERSION_KEY, version, timeout=None)
+    with _lock:
+        _local.update(version=version, index=index)
+    return len(robots)
+
+
+def _load_index():
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        return None
+    with _lock:
+        if _local["version"] == version:
+            return _local["index"]
+    index = cache.get(INDEX_KEY)
+    if not index or index.get("version") != version:
+        return None
+    with _lock:
+        _local.update(version=version, index=index)
+    return index
+
+
+def lookup_robot_source_folders(robots):
+    """
+    返回 {robot: 来源目录}，索引中没有的机器人不在结果中
+
+    索引不存在或任一来源目录的最新 weeklyresult 已变化时返回 None。
+    """
+    index = _load_index()
+    if index is None:
+        return None
+    for folder, signature in index["folders"].items():
+        if _folder_signature(folder) != signature:
+            logger.info("来源目录 weeklyresult 已变化，机器人来源索引失效: %s", folder)
+            return None
+    mapping = index["robots"]
+    return {robot: mapping[robot] for robot in robots if robot in mapping}
@@ -0,0 +1,72 @@
+"""
+组件 / 快照关键词搜索
+
+MySQL 下使用 robot_components 与 _robot_high_risk_snapshots 上的 FULLTEXT ngram 索引
+（迁移 0027 创建），按 MATCH ... AGAINST 的相关度排序；关键词短于 ngram 长度或非 MySQL
+数据库时退回 icontains。两种方式都会把 robot 精确匹配 / 前缀匹配排在最前。
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+# 与 FULLTEXT 索引列顺序一致，MATCH() 的列列表必须和索引完全相同
+KEYWORD_FIELDS = ("robot", "shop", "reference", "type", "tech", "remark")
+
+# BOOLEAN MODE 下有特殊含义的字符，关键词中出现时直接去掉
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+# apply_keyword_search 添加的相关度注解，按此顺序降序排列
+RELEVANCE_ANNOTATIONS = ("keyword_rank", "keyword_score")
+
+
+def _fulltext_enabled(keyword: str) -> bool:
+    if connection.vendor != "mysql":
+        return False
+    if not getattr(settings, "KEYWORD_SEARCH_FULLTEXT", True):
+        return False
+    return len(keyword) >= getattr(settings, "KEYWORD_SEARCH_NGRAM_SIZE", 2)
+
+
+def _robot_rank(keyword: str):
+    """robot 精确匹配 > 前缀匹配 > 其他"""
+    return Case(
+        When(robot__iexact=keyword, then=Value(2)),
+        When(robot__istartswith=keyword, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def apply_keyword_search(qs, keyword: str):
+    """
+    按关键词过滤并按匹配度排序（之后再调用 order_by 会覆盖该排序）
+
+    Args:
+        qs: RobotComponent 或 RobotHighRiskSnapshot 查询集
+        keyword: 已去除首尾空白的关键词
+    """
+    term = _BOOLEAN_OPERATORS.sub(" ", keyword).strip()
+    if term and _fulltext_enabled(term):
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(qs.model._meta.get_field(name).column) for name in KEYWORD_FIELDS)
+        # 短语模式：ngram 分词后要求所有 n-gram 连续出现，近似子串匹配
+        qs = qs.annotate(
+            keyword_score=RawSQL(
+                f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)",
+                (f'"{term}"',),
+                output_field=FloatField(),
+            )
+        ).filter(keyword_score__gt=0)
+    else:
+        query = Q()
+        for name in KEYWORD_FIELDS:
+            query |= Q(**{f"{name}__icontains": keyword})
+        qs = qs.filter(query).annotate(keyword_score=Value(0.0, output_field=FloatField()))
+
+    ordering = list(qs.model._meta.ordering or []) + ["-id"]
+    return qs.annotate(keyword_rank=_robot_rank(keyword)).order_by(
+        "-keyword_rank", "-keyword_score", *ordering
+    )
@@ -1,6 +1,15 @@
 from rest_framework import serializers
 
-from .models import RobotGroup, RobotComponent, RiskEvent, RobotHighRiskSnapshot, RefreshLog, RobotReferenceDict
+from .models import (
+    RobotGroup,
+    RobotComponent,
+    RiskEvent,
+    RobotHighRiskSnapshot,
+    RefreshLog,
+    RobotReferenceDict,
+    ImportStageMetric,
+)
+from .group_stats import load_group_stats
 
 
 class RobotGroupSerializer(serializers.ModelSerializer):
@@ -14,63 +23,12 @@ class RobotGroupSerializer(serializers.ModelSerializer):
         stats = getattr(obj, "_stats", None)
         if stats is not None:
             return stats
-        disconnected_fields = [
-            "error1_c1",
-            "tem1_m",
-            "tem2_m",
-            "tem3_m",
-            "tem4_m",
-            "tem5_m",
-            "tem6_m",
-            "tem7_m",
-            "a1_e_rate",
-            "a2_e_rate",
-            "a3_e_rate",
-            "a4_e_rate",
-            "a5_e_rate",
-            "a6_e_rate",
-            "a7_e_rate",
-            "a1_rms",
-            "a2_rms",
-            "a3_rms",
-            "a4_rms",
-            "a5_rms",
-            "a6_rms",
-            "a7_rms",
-            "a1_e",
-            "a2_e",
-            "a3_e",
-            "a4_e",
-            "a5_e",
-            "a6_e",
-            "a7_e",
-            "q1",
-            "q2",
-            "q3",
-            "q4",
-            "q5",
-            "q6",
-            "q7",
-            "curr_a1_max",
-            "curr_a2_max",
-            "curr_a3_max",
-            "curr_a4_max",
-            "curr_a5_max",
-            "curr_a6_max",
-            "curr_a7_max",
-            "curr_a1_min",
-            "curr_a2_min",
-            "curr_a3_min",
-            "curr_a4_min",
-            "curr_a5_min",
-            "curr_a6_min",
-            "curr_a7_min",
-        ]
-        disconnected_filters = {f"{field}__isnull": True for field in disconnected_fields}
+        # 未预先注入 _stats 时按主键读取车间统计物化表
+        group_stats = load_group_stats([obj.id]).get(obj.id)
         return {
-            "total": obj.components.count(),
-            "highRisk": obj.components.filter(level="H").count(),
-            "disconnected": obj.components.filter(**disconnected_filters).count(),
+            "total": group_stats.total if group_stats else 0,
+            "highRisk": group_stats.high_risk if group_stats else 0,
+            "disconnected": group_stats.disconnected if group_stats else 0,
         }
 
 
@@ -187,20 +145,51 @@ class RobotComponentSerializer(serializers.ModelSerializer):
         )
 
 
-class RobotComponentListSerializer(serializers.ModelSerializer):
-    """机器人组件列表序列化器 - 用于减少列表加载字段量"""
-    group = serializers.CharField(source="group.key", read_only=True)
-    isHighRisk = serializers.BooleanField(source="is_high_risk", read_only=True)
-    referenceNo = serializers.CharField(source="reference", read_only=True)
+class ValuesRowSerializer(serializers.BaseSerializer):
+    """
+    基于 .values() 字典行的只读列表序列化器
 
-    class Meta:
-        model = RobotComponent
-        fields = (
-            "id",
-            "group",
-            "robot",
-            "shop",
-            "referenceNo",
+    列表接口只查询 value_fields() 列出的列，逐行直接拼字典，不经过 DRF 字段对象；
+    输出与等价 ModelSerializer 一致（时间字段按 DateTimeField 格式化）。
+    """
+    # (输出字段, values() 中的字段)
+    field_map = ()
+    datetime_fields = ()
+    # 由 level 推导 isHighRisk
+    high_risk_flag = "isHighRisk"
+
+    _datetime_field = serializers.DateTimeField()
+
+    @classmethod
+    def value_fields(cls) -> list:
+        fields = [source for _, source in cls.field_map]
+        if cls.high_risk_flag and "level" not in fields:
+            fields.append("level")
+        return fields
+
+    def to_representation(self, row):
+        data = {output: row[source] for output, source in self.field_map}
+        for output in self.datetime_fields:
+            value = data[output]
+            if value is not None:
+                data[output] = self._datetime_field.to_representation(value)
+        if self.high_risk_flag:
+            data[self.high_risk_flag] = row["level"] == "H"
+        return data
+
+
+def _passthrough(*names):
+    return tuple((name, name) for name in names)
+
+
+class RobotComponentListSerializer(ValuesRowSerializer):
+    """机器人组件列表序列化器 - 用于减少列表加载字段量"""
+    field_map = (
+        ("id", "id"),
+        ("group", "group__key"),
+        *_passthrough("robot", "shop"),
+        ("referenceNo", "reference"),
+        *_passthrough(
             "number",
             "type",
             "tech",
@@ -215,9 +204,10 @@ class RobotComponentListSerializer(serializers.ModelSerializer):
             "a7",
             "p_change",
             "level",
-            "isHighRisk",
             "updated_at",
-        )
+        ),
+    )
+    datetime_fields = ("updated_at",)
 
 
 class RobotReferenceDictSerializer(serializers.ModelSerializer):
@@ -462,16 +452,12 @@ class RobotHighRiskSnapshotSerializer(serializers.ModelSerializer):
         )
 
 
-class RobotHighRiskSnapshotListSerializer(serializers.ModelSerializer):
+class RobotHighRiskSnapshotListSerializer(ValuesRowSerializer):
     """历史高风险机器人列表序列化器 - 用于减少列表加载字段量"""
-    group = serializers.CharField(source="group.key", read_only=True)
-    isHighRisk = serializers.BooleanField(source="is_high_risk", read_only=True)
-
-    class Meta:
-        model = RobotHighRiskSnapshot
-        fields = (
-            "id",
-            "group",
+    field_map = (
+        ("id", "id"),
+        ("group", "group__key"),
+        *_passthrough(
             "robot",
             "shop",
             "reference",
@@ -489,10 +475,11 @@ class RobotHighRiskSnapshotListSerializer(serializers.ModelSerializer):
             "a7",
             "p_change",
             "level",
-            "isHighRisk",
             "created_at",
             "updated_at",
-        )
+        ),
+    )
+    datetime_fields = ("created_at", "updated_at")
 
 
 class RefreshLogSerializer(serializers.ModelSerializer):
@@ -520,3 +507,22 @@ class RefreshLogSerializer(serializers.ModelSerializer):
             "error_message",
             "sync_time",
         )
+
+
+class ImportStageMetricSerializer(serializers.ModelSerializer):
+    """导入阶段耗时序列化器"""
+    stage_display = serializers.CharField(source="get_stage_display", read_only=True)
+
+    class Meta:
+        model = ImportStageMetric
+        fields = (
+            "id",
+            "stage",
+            "stage_display",
+            "source_file",
+            "duration",
+            "rows",
+            "rows_per_sec",
+            "process_peak_rss_mb",
+            "created_at",
+        )
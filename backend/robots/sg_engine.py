@@ -0,0 +1,106 @@
+"""
+SG 时序库（PROGRAM CYCLE SYNC）SQLAlchemy 引擎注册表
+
+按 DSN 在进程内复用一个带连接池的 Engine，BI 页面、程序列表、时间范围、夹爪检查等
+请求不再每次重新建立 TCP + 认证握手。Celery prefork / gunicorn 等 fork 出的子进程
+沿用父进程的注册表时，会先以 dispose(close=False) 丢弃继承的连接，再按需建立自己的连接。
+"""
+import logging
+import os
+import threading
+
+from django.conf import settings
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_engines = {}  # dsn -> Engine
+_owner_pid = os.getpid()
+
+
+def sg_db_url() -> str:
+    """按 SG_DB_* 环境变量拼接 SG 库 DSN"""
+    from .bokeh_charts import get_db_engine
+
+    db_config = get_db_engine()
+    return (
+        f"mysql+pymysql://{db_config['user']}:{db_config['password']}"
+        f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+    )
+
+
+def _engine_options() -> dict:
+    return {
+        "pool_size": getattr(settings, "SG_DB_POOL_SIZE", 5),
+        "max_overflow": getattr(settings, "SG_DB_POOL_MAX_OVERFLOW", 10),
+        "pool_timeout": getattr(settings, "SG_DB_POOL_TIMEOUT", 30),
+        # 早于 MySQL wait_timeout 回收连接，并在取出连接前检查有效性
+        "pool_recycle": getattr(settings, "SG_DB_POOL_RECYCLE", 3600),
+        "pool_pre_ping": True,
+        "connect_args": {
+            "connect_timeout": getattr(settings, "SG_DB_CONNECT_TIMEOUT", 10),
+            "read_timeout": getattr(settings, "SG_DB_READ_TIMEOUT", 300),
+            "write_timeout": getattr(settings, "SG_DB_WRITE_TIMEOUT", 300),
+        },
+    }
+
+
+def _forget_inherited_connections() -> None:
+    """fork 后在子进程中调用：丢弃从父进程继承的连接，但不关闭父进程仍在使用的 socket"""
+    global _owner_pid
+    for engine in _engines.values():
+        engine.dispose(close=False)
+    _owner_pid = os.getpid()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_inherited_connections)
+
+
+def get_sg_engine(url=None):
+    """
+    返回 DSN 对应的共享 Engine（不存在时创建）
+
+    Args:
+        url: 数据库 DSN，默认使用 SG_DB_* 配置
+    """
+    url = url or sg_db_url()
+    with _lock:
+        if os.getpid() != _owner_pid:
+            _forget_inherited_connections()
+        engine = _engines.get(url)
+        if engine is None:
+            engine = create_engine(url, **_engine_options())
+            _engines[url] = engine
+            logger.info("创建 SG 数据库连接池: %s", make_url(url).render_as_string(hide_password=True))
+    return engine
+
+
+def sg_pool_stats() -> list:
+    """各连接池的当前状态，DSN 中的密码已隐藏"""
+    with _lock:
+        engines = list(_engines.items())
+    stats = []
+    for url, engine in engines:
+        pool = engine.pool
+        stats.append({
+            "url": make_url(url).render_as_string(hide_password=True),
+            "pid": os.getpid(),
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "status": pool.status(),
+        })
+    return stats
+
+
+def dispose_sg_engines() -> None:
+    """关闭并移除全部 Engine（配置变更或测试时使用）"""
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
@@ -85,14 +85,89 @@ def _format_source_file(paths, max_len: int) -> str:
     return f"{names[:max_len - 3]}..."
 
 
-def _refresh_reference_dict():
+REFERENCE_DICT_STATE_KEY = "reference_dict_source_state"
+
+
+def _load_reference_dict_state() -> dict:
+    import json
+    from .models import SystemConfig
+
+    try:
+        state = json.loads(SystemConfig.get(REFERENCE_DICT_STATE_KEY, "{}") or "{}")
+    except (TypeError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _save_reference_dict_state(files: list) -> None:
+    import json
+    from .models import SystemConfig
+
+    SystemConfig.set(
+        REFERENCE_DICT_STATE_KEY,
+        json.dumps({"files": files}, ensure_ascii=False),
+        "reference 字典源文件指纹（path/mtime/size/sha1），未变化时跳过刷新",
+    )
+
+
+def _reference_dict_stats(csv_files) -> list:
+    stats = []
+    for csv_path in csv_files:
+        try:
+            stat = csv_path.stat()
+        except OSError:
+            stats.append({"path": str(csv_path), "mtime": None, "size": None})
+            continue
+        stats.append({"path": str(csv_path), "mtime": stat.st_mtime_ns, "size": stat.st_size})
+    return stats
+
+
+def _parse_reference_rows(data: bytes):
+    """解析 dic information .csv 内容，返回 ([(robot, reference, number)], skipped)"""
+    import csv
+    import io
+
+    rows = []
+    skipped = 0
+    reader = csv.reader(io.StringIO(data.decode("utf-8-sig"), newline=""))
+    for row in reader:
+        if not row or len(row) < 3:
+            skipped += 1
+            continue
+        robot = row[0].strip()
+        reference = row[1].strip()
+        number_raw = row[2].strip()
+        if not robot or not reference:
+            skipped += 1
+            continue
+        try:
+            number = float(number_raw) if number_raw != "" else None
+        except ValueError:
+            skipped += 1
+            continue
+        rows.append((robot, reference, number))
+    return rows, skipped
+
+
+def _refresh_reference_dict(force: bool = False):
+    """
+    从 dic information .csv 刷新 reference 字典
+
+    源文件的 (mtime, size) 与上次一致时直接跳过；有变化时再比较内容哈希，
+    内容确实变化才按 (robot, reference) 做差异写入（新增/更新/删除），
+    不再整表删除重建，刷新期间 resolve / 编辑始终能查到字典。
+
+    Args:
+        force: 忽略源文件指纹，强制比对并写入
+    """
     from django.conf import settings
     from django.utils import timezone
     from django.db import transaction
     from pathlib import Path
-    import csv
+    import hashlib
 
     from .models import RobotReferenceDict, RefreshLog, PathConfig
+    from .response_cache import bump_data_generation
 
     default_path = Path(
         getattr(
@@ -110,46 +185,61 @@ def _refresh_reference_dict():
         configured_paths = [str(default_path)]
 
     csv_paths = [Path(path) for path in configured_paths]
+    csv_files = [folder / "dic information .csv" for folder in csv_paths]
     logger.info("Reference dict refresh started: paths=%s", csv_paths)
     source_file_max_len = RefreshLog._meta.get_field("source_file").max_length
     source_file_value = _format_source_file(csv_paths, source_file_max_len)
 
+    skipped_result = {
+        "success": True,
+        "skipped": True,
+        "file": [str(p) for p in csv_paths],
+        "records_created": 0,
+        "records_updated": 0,
+        "records_deleted": 0,
+        "records_skipped": 0,
+    }
+
     try:
+        previous_files = _load_reference_dict_state().get("files") or []
+        file_stats = _reference_dict_stats(csv_files)
+        unchanged_stat = [
+            {key: item.get(key) for key in ("path", "mtime", "size")} for item in previous_files
+        ] == file_stats
+        if not force and unchanged_stat and RobotReferenceDict.objects.exists():
+            logger.info("Reference dict refresh skipped: source files unchanged")
+            return skipped_result
+
         rows = []
         skipped = 0
-        now = timezone.now()
         missing_paths = []
-        for folder in csv_paths:
-            csv_path = folder / "dic information .csv"
-            if not csv_path.exists():
+        file_states = []
+        for csv_path, file_stat in zip(csv_files, file_stats):
+            if file_stat["mtime"] is None:
                 missing_paths.append(str(csv_path))
+                file_states.append({**file_stat, "sha1": None})
                 continue
-            with csv_path.open("r", encoding="utf-8-sig", newline="") as file_obj:
-                reader = csv.reader(file_obj)
-                for row in reader:
-                    if not row or len(row) < 3:
-                        skipped += 1
-                        continue
-                    robot = row[0].strip()
-                    reference = row[1].strip()
-                    number_raw = row[2].strip()
-                    if not robot or not reference:
-                        skipped += 1
-                        continue
-                    try:
-                        number = float(number_raw) if number_raw != "" else None
-                    except ValueError:
-                        skipped += 1
-                        continue
-                    rows.append((robot, reference, number))
+            data = csv_path.read_bytes()
+            file_states.append({**file_stat, "sha1": hashlib.sha1(data).hexdigest()})
+            file_rows, file_skipped = _parse_reference_rows(data)
+            rows.extend(file_rows)
+            skipped += file_skipped
+
+        previous_hashes = [(item.get("path"), item.get("sha1")) for item in previous_files]
+        current_hashes = [(item["path"], item["sha1"]) for item in file_states]
+        if not force and previous_hashes == current_hashes and RobotReferenceDict.objects.exists():
+            # 只是 mtime 变化（例如被重新保存），内容未变
+            _save_reference_dict_state(file_states)
+            logger.info("Reference dict refresh skipped: source content unchanged")
+            return skipped_result
 
         if missing_paths:
             logger.warning("Reference dict missing files: %s", missing_paths)
 
         if not rows:
             logger.info(
-                "Reference dict refresh finished: empty file=%s skipped=%s",
-                csv_path,
+                "Reference dict refresh finished: empty files=%s skipped=%s",
+                csv_files,
                 skipped,
             )
             RefreshLog.objects.create(
@@ -160,11 +250,13 @@ def _refresh_reference_dict():
                 total_records=0,
                 error_message=f"skipped_rows={skipped};missing_files={missing_paths}",
             )
+            bump_data_generation()
             return {
                 "success": True,
                 "file": [str(p) for p in csv_paths],
                 "records_created": 0,
                 "records_updated": 0,
+                "records_deleted": 0,
                 "records_skipped": skipped,
             }
 
@@ -172,23 +264,39 @@ def _refresh_reference_dict():
         for robot, reference, number in rows:
             deduped[(robot, reference)] = number
 
-        create_objs = [
-            RobotReferenceDict(
-                robot=robot,
-                reference=reference,
-                number=number,
-                updated_at=now,
+        now = timezone.now()
+        create_objs = []
+        update_objs = []
+        existing = {
+            (robot, reference): (pk, number)
+            for pk, robot, reference, number in RobotReferenceDict.objects.values_list(
+                "id", "robot", "reference", "number"
             )
-            for (robot, reference), number in deduped.items()
-        ]
+        }
+        for key, number in deduped.items():
+            current = existing.pop(key, None)
+            if current is None:
+                create_objs.append(
+                    RobotReferenceDict(robot=key[0], reference=key[1], number=number, updated_at=now)
+                )
+            elif current[1] != number:
+                update_objs.append(RobotReferenceDict(id=current[0], number=number, updated_at=now))
+        delete_ids = [pk for pk, _ in existing.values()]
 
         with transaction.atomic():
-            RobotReferenceDict.objects.all().delete()
+            # 先删除旧行：MySQL 默认排序规则不区分大小写和尾部空格，
+            # 仅大小写 / 尾部空格变化的 reference 若先插入会与旧行触发唯一约束
+            for start in range(0, len(delete_ids), 1000):
+                RobotReferenceDict.objects.filter(id__in=delete_ids[start:start + 1000]).delete()
+            if update_objs:
+                RobotReferenceDict.objects.bulk_update(update_objs, ["number", "updated_at"], batch_size=1000)
             if create_objs:
-                RobotReferenceDict.objects.bulk_create(create_objs)
+                RobotReferenceDict.objects.bulk_create(create_objs, batch_size=1000)
 
         created = len(create_objs)
-        updated = 0
+        updated = len(update_objs)
+        deleted = len(delete_ids)
+        _save_reference_dict_state(file_states)
 
         RefreshLog.objects.create(
             source="manual",
@@ -197,17 +305,20 @@ def _refresh_reference_dict():
             source_file=source_file_value,
             records_created=created,
             records_updated=updated,
-            records_deleted=0,
+            records_deleted=deleted,
             total_records=len(rows),
             error_message=f"skipped_rows={skipped};missing_files={missing_paths}",
         )
+        # 字典与刷新日志都已变化，使缓存的只读响应失效
+        bump_data_generation()
 
         logger.info(
-            "Reference dict refresh finished: paths=%s total=%s created=%s updated=%s skipped=%s missing=%s",
+            "Reference dict refresh finished: paths=%s total=%s created=%s updated=%s deleted=%s skipped=%s missing=%s",
             csv_paths,
             len(rows),
             created,
             updated,
+            deleted,
             skipped,
             len(missing_paths),
         )
@@ -217,6 +328,7 @@ def _refresh_reference_dict():
             "file": [str(p) for p in csv_paths],
             "records_created": created,
             "records_updated": updated,
+            "records_deleted": deleted,
             "records_skipped": skipped,
         }
     except Exception as exc:
@@ -277,8 +389,15 @@ def auto_sync_robot_data():
 
 
 @shared_task
-def refresh_reference_dict_task():
-    return _refresh_reference_dict()
+def refresh_reference_dict_task(force=False):
+    return _refresh_reference_dict(force=force)
+
+
+@shared_task
+def flush_robot_config_csv_task():
+    from .csv_writeback import flush_robot_config_csv
+
+    return flush_robot_config_csv()
 
 
 @shared_task
@@ -305,7 +424,14 @@ def refresh_portal_overview_snapshot_task():
 
 
 @shared_task
-def import_robot_components_csv_task(file_path=None, folder_path=None, project=None, use_mysql_load_data=None):
+def import_robot_components_csv_task(
+    file_path=None,
+    folder_path=None,
+    project=None,
+    use_mysql_load_data=None,
+    import_mode=None,
+    workers=None,
+):
     from .weekly_result_service import import_robot_components_csv
 
     return import_robot_components_csv(
@@ -314,6 +440,8 @@ def import_robot_components_csv_task(file_path=None, folder_path=None, project=N
         project=project,
         source="manual",
         use_mysql_load_data=use_mysql_load_data,
+        import_mode=import_mode,
+        workers=workers,
     )
 
 
@@ -0,0 +1,36 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import RobotComponent, RobotGroup
+
+
+class ComponentKeywordCursorTests(TestCase):
+    """关键词搜索 + 键集分页：列表 values() 投影后仍按相关度翻页"""
+
+    def setUp(self):
+        group = RobotGroup.objects.create(key="g1", name="G1")
+        # 单字符关键词走 icontains，robot 精确匹配 > 前缀匹配 > 其他，同级按 id 降序
+        for robot in ("XR1", "R1", "R2", "R", "XR2", "ZZZ"):
+            RobotComponent.objects.create(group=group, robot=robot)
+        self.client = APIClient()
+
+    def _page(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_keyword_with_cursor_follows_relevance_order(self):
+        page = self._page("/api/robots/components/", {"keyword": "R", "cursor": "", "page_size": 2})
+        robots = [row["robot"] for row in page["results"]]
+        self.assertEqual(robots, ["R", "R2"])
+        self.assertIsNone(page["previous"])
+
+        pages = [robots]
+        while page["next"]:
+            page = self._page(page["next"])
+            pages.append([row["robot"] for row in page["results"]])
+        self.assertEqual(pages, [["R", "R2"], ["R1", "XR2"], ["XR1"]])
+
+        # 从最后一页向前翻回第二页
+        previous = self._page(page["previous"])
+        self.assertEqual([row["robot"] for row in previous["results"]], ["R1", "XR2"])
@@ -18,7 +18,9 @@ from .views import (
     bi_programs_view,
     get_last_sync_time,
     get_bi_logs,
+    get_sg_pool_stats,
     get_refresh_logs,
+    get_refresh_log_metrics,
     get_keypath_warnings,
     get_portal_overview_snapshot,
     gripper_check_events,
@@ -70,7 +72,9 @@ urlpatterns = [
     path("charts/<path:filename>", serve_chart, name="robot-chart"),
     path("last_sync_time/", get_last_sync_time, name="last-sync-time"),
     path("bi_logs/", get_bi_logs, name="bi-logs"),
+    path("bi_pool_stats/", get_sg_pool_stats, name="bi-pool-stats"),
     path("refresh_logs/", get_refresh_logs, name="refresh-logs"),
+    path("refresh_logs/<int:log_id>/metrics/", get_refresh_log_metrics, name="refresh-log-metrics"),
     path("portal-overview/snapshot/", get_portal_overview_snapshot, name="portal-overview-snapshot"),
     path("portal-overview/refresh/", refresh_portal_overview_snapshot, name="portal-overview-refresh"),
     path("keypath-warnings/", get_keypath_warnings, name="keypath-warnings"),
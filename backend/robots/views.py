@@ -9,7 +9,8 @@ from django.conf import settings
 from django.core.cache import cache
 from django.http import JsonResponse, FileResponse
 from django.shortcuts import render
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Count, Max, Q
 from django.utils import timezone
 from django.views.decorators.clickjacking import xframe_options_exempt
 from django.views.decorators.http import require_GET
@@ -18,7 +19,16 @@ from rest_framework.decorators import action, api_view
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
-from .models import RiskEvent, RobotComponent, RobotGroup, RobotHighRiskSnapshot, RobotReferenceDict
+from .models import (
+    AXIS_FIELDS,
+    RiskEvent,
+    RobotComponent,
+    RobotGroup,
+    RobotHighRiskSnapshot,
+    RobotReferenceDict,
+    axis_bit,
+    axis_mask_values,
+)
 from .serializers import (
     RiskEventSerializer,
     RobotComponentSerializer,
@@ -30,6 +40,8 @@ from .serializers import (
     RobotHighRiskSnapshotListSerializer,
     RobotReferenceDictSerializer,
     RefreshLogSerializer,
+    ImportStageMetricSerializer,
+    ValuesRowSerializer,
 )
 from .gripper_check_state import (
     get_gripper_check_latest,
@@ -37,8 +49,14 @@ from .gripper_check_state import (
     set_gripper_check_status,
     request_gripper_check_cancel,
 )
+from .csv_writeback import enqueue_robot_config_sync
 from .error_trend_chart import generate_trend_chart, chart_exists
+from .group_stats import apply_component_change, load_group_stats, rebuild_group_stats, snapshot_component
 from .overview_service import load_saved_overview_snapshot, refresh_overview_snapshot
+from .pagination import KeysetPaginationMixin
+from .response_cache import bump_data_generation, cached_response
+from .search import RELEVANCE_ANNOTATIONS, apply_keyword_search
+from .sg_engine import get_sg_engine, sg_pool_stats
 from .tasks import gripper_check_csv_task, gripper_check_task
 import json
 import uuid
@@ -47,67 +65,6 @@ from .bi_jobs import BiCancelledError, bi_job_registry
 
 logger = logging.getLogger(__name__)
 
-DISCONNECTED_FIELDS = [
-    "error1_c1",
-    "tem1_m",
-    "tem2_m",
-    "tem3_m",
-    "tem4_m",
-    "tem5_m",
-    "tem6_m",
-    "tem7_m",
-    "a1_e_rate",
-    "a2_e_rate",
-    "a3_e_rate",
-    "a4_e_rate",
-    "a5_e_rate",
-    "a6_e_rate",
-    "a7_e_rate",
-    "a1_rms",
-    "a2_rms",
-    "a3_rms",
-    "a4_rms",
-    "a5_rms",
-    "a6_rms",
-    "a7_rms",
-    "a1_e",
-    "a2_e",
-    "a3_e",
-    "a4_e",
-    "a5_e",
-    "a6_e",
-    "a7_e",
-    "q1",
-    "q2",
-    "q3",
-    "q4",
-    "q5",
-    "q6",
-    "q7",
-    "curr_a1_max",
-    "curr_a2_max",
-    "curr_a3_max",
-    "curr_a4_max",
-    "curr_a5_max",
-    "curr_a6_max",
-    "curr_a7_max",
-    "curr_a1_min",
-    "curr_a2_min",
-    "curr_a3_min",
-    "curr_a4_min",
-    "curr_a5_min",
-    "curr_a6_min",
-    "curr_a7_min",
-]
-
-
-def build_disconnected_q(prefix=""):
-    query = Q()
-    for field in DISCONNECTED_FIELDS:
-        query &= Q(**{f"{prefix}{field}__isnull": True})
-    return query
-
-
 def get_sort_fields(model):
     fields = set()
     for field in model._meta.get_fields():
@@ -143,6 +100,74 @@ def parse_axis_ok(value):
     return None
 
 
+def parse_axis_mask(params) -> int:
+    """axisKeys（逗号分隔）/ axisKey 参数合并为 axis_high_mask 位掩码，忽略非法轴名"""
+    axis_keys_raw = (params.get("axisKeys") or "").strip()
+    axis_keys = [k.strip() for k in axis_keys_raw.split(",") if k.strip()] if axis_keys_raw else []
+    axis_key = (params.get("axisKey") or "").strip()
+    if axis_key:
+        axis_keys.append(axis_key)
+
+    mask = 0
+    for key in axis_keys:
+        if key.lower() in AXIS_FIELDS:
+            mask |= axis_bit(key)
+    return mask
+
+
+def apply_axis_filter(qs, params):
+    """
+    按 axisKeys + axisOk 筛选轴状态
+
+    条件展开为 axis_high_mask 的取值集合（最多 128 个），由索引直接定位。
+    """
+    mask = parse_axis_mask(params)
+    axis_ok = params.get("axisOk")
+    if not mask or axis_ok is None:
+        return qs
+    axis_ok_bool = parse_axis_ok(axis_ok)
+    if axis_ok_bool is True:
+        # 轴状态为 ok（所选轴都不为 high，空值代表正常）
+        return qs.filter(axis_high_mask__in=axis_mask_values(forbidden=mask))
+    if axis_ok_bool is False:
+        # 轴状态为 high（所有所选轴都为 high）
+        return qs.filter(axis_high_mask__in=axis_mask_values(required=mask))
+    return qs
+
+
+def count_axis_high_combinations(qs) -> list:
+    """按 axis_high_mask 分组计数，返回每种 high 轴组合的机器人数量（不含全部正常）"""
+    rows = (
+        qs.order_by()
+        .exclude(axis_high_mask=0)
+        .values("axis_high_mask")
+        .annotate(count=Count("id"))
+    )
+    results = [
+        {
+            "mask": row["axis_high_mask"],
+            "axes": [field.upper() for field in AXIS_FIELDS if row["axis_high_mask"] & axis_bit(field)],
+            "count": row["count"],
+        }
+        for row in rows
+    ]
+    results.sort(key=lambda item: (-item["count"], item["mask"]))
+    return results
+
+
+def project_list_queryset(view, qs):
+    """列表接口使用 ValuesRowSerializer 时只查询其需要的列，返回字典行"""
+    if view.action != "list":
+        return qs
+    serializer_class = view.get_serializer_class()
+    if not issubclass(serializer_class, ValuesRowSerializer):
+        return qs
+    fields = serializer_class.value_fields()
+    # 关键词搜索的相关度注解需一并投影，否则 values() 后无法再选出，键集分页无法按其翻页
+    fields += [name for name in RELEVANCE_ANNOTATIONS if name in qs.query.annotations and name not in fields]
+    return qs.values(*fields)
+
+
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
@@ -163,70 +188,73 @@ class RobotGroupViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
         )
 
     def list(self, request, *args, **kwargs):
-        # 获取时间范围参数（用于统计特定时间段内的风险事件）
+        # 被各看板轮询，按数据代号缓存并支持 ETag / 304
+        date_range = self._parse_date_range(request)
+        version = None
+        if date_range:
+            # 写入风险事件不会更新数据代号，按时间范围内事件的水位区分缓存
+            version = tuple(
+                RiskEvent.objects.filter(triggered_at__range=date_range)
+                .aggregate(max_id=Max("id"), max_updated=Max("updated_at"), n=Count("id"))
+                .values()
+            )
+        return cached_response(
+            request, "group_list", lambda: self._build_group_list(request, date_range), version=version,
+        )
+
+    @staticmethod
+    def _parse_date_range(request):
+        """start_date / end_date（用于统计特定时间段内的风险事件），缺失或格式错误时返回 None"""
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
-
-        # 使用 annotate 预先计算统计数据，避免 N+1 查询
-        disconnected_q = build_disconnected_q("components__")
-
-        if start_date and end_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-                end_dt = end_dt.replace(hour=23, minute=59, second=59)
-
-                # 预先计算每个组的统计数据
-                groups = self.get_queryset().annotate(
-                    total_count=Count('components'),
-                    high_risk_count=Count(
-                        'components',
-                        filter=Q(components__level='H') & Q(components__riskevent__triggered_at__range=(start_dt, end_dt))
-                    ),
-                    disconnected_count=Count('components', filter=disconnected_q),
-                ).distinct()
-
-                for group in groups:
-                    group._stats = {
-                        "total": group.total_count,
-                        "highRisk": group.high_risk_count,
-                        "disconnected": group.disconnected_count,
-                        "timeRange": f"{start_date} ~ {end_date}"
-                    }
-            except ValueError:
-                # 日期格式错误，使用默认统计
-                groups = self.get_queryset().annotate(
-                    total_count=Count('components'),
-                    high_risk_count=Count('components', filter=Q(components__level='H')),
-                    disconnected_count=Count('components', filter=disconnected_q),
+        if not (start_date and end_date):
+            return None
+        try:
+            start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+            end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+        except ValueError:
+            # 日期格式错误，使用默认统计
+            return None
+        return start_dt, end_dt.replace(hour=23, minute=59, second=59)
+
+    def _build_group_list(self, request, date_range=None):
+        # 总数 / 失联数等直接读取车间统计物化表（按主键），不再对 robot_components 做聚合
+        groups = list(self.get_queryset())
+        stats_map = load_group_stats(group.id for group in groups)
+
+        time_range = None
+        high_risk_in_range = None
+        if date_range:
+            start_dt, end_dt = date_range
+            time_range = f"{start_dt:%Y-%m-%d} ~ {end_dt:%Y-%m-%d}"
+            high_risk_in_range = dict(
+                RobotComponent.objects.filter(
+                    level='H',
+                    risk_events__triggered_at__range=(start_dt, end_dt),
                 )
-
-                for group in groups:
-                    group._stats = {
-                        "total": group.total_count,
-                        "highRisk": group.high_risk_count,
-                        "disconnected": group.disconnected_count,
-                    }
-        else:
-            # 默认统计（不限制时间范围）
-            groups = self.get_queryset().annotate(
-                total_count=Count('components'),
-                high_risk_count=Count('components', filter=Q(components__level='H')),
-                disconnected_count=Count('components', filter=disconnected_q),
+                .order_by()
+                .values('group_id')
+                .annotate(n=Count('id', distinct=True))
+                .values_list('group_id', 'n')
             )
 
-            for group in groups:
-                group._stats = {
-                    "total": group.total_count,
-                    "highRisk": group.high_risk_count,
-                    "disconnected": group.disconnected_count,
-                }
+        for group in groups:
+            stats = stats_map.get(group.id)
+            group._stats = {
+                "total": stats.total if stats else 0,
+                "highRisk": stats.high_risk if stats else 0,
+                "disconnected": stats.disconnected if stats else 0,
+            }
+            if time_range:
+                group._stats["highRisk"] = high_risk_in_range.get(group.id, 0)
+                group._stats["timeRange"] = time_range
 
         serializer = self.get_serializer(groups, many=True)
-        return Response(serializer.data)
+        return list(serializer.data)
 
 
 class RobotComponentViewSet(
+    KeysetPaginationMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -235,6 +263,9 @@ class RobotComponentViewSet(
     queryset = RobotComponent.objects.select_related("group").all()
     serializer_class = RobotComponentSerializer
     pagination_class = StandardResultsSetPagination
+    # 带 cursor 参数时按 (sort_by, id) 键集分页
+    sort_fields = COMPONENT_SORT_FIELDS
+    default_sort = "-updated_at"
     
     def get_serializer_class(self):
         if self.action == "list":
@@ -259,14 +290,7 @@ class RobotComponentViewSet(
 
         keyword = (self.request.query_params.get("keyword") or "").strip()
         if keyword:
-            qs = qs.filter(
-                Q(robot__icontains=keyword)
-                | Q(shop__icontains=keyword)
-                | Q(reference__icontains=keyword)
-                | Q(type__icontains=keyword)
-                | Q(tech__icontains=keyword)
-                | Q(remark__icontains=keyword)
-            )
+            qs = apply_keyword_search(qs, keyword)
 
         level_filter = self.request.query_params.get("level")
         if level_filter:
@@ -283,26 +307,7 @@ class RobotComponentViewSet(
         elif mark_mode == "nonzero":
             qs = qs.exclude(mark=0)
 
-        axis_keys_raw = (self.request.query_params.get("axisKeys") or "").strip()
-        axis_keys = [k.strip() for k in axis_keys_raw.split(",") if k.strip()] if axis_keys_raw else []
-        axis_key = (self.request.query_params.get("axisKey") or "").strip()
-        if axis_key and axis_key not in axis_keys:
-            axis_keys.append(axis_key)
-
-        axis_ok = self.request.query_params.get("axisOk")
-        allowed_axes = {"A1", "A2", "A3", "A4", "A5", "A6", "A7"}
-        axis_keys = [k for k in axis_keys if k in allowed_axes]
-        if axis_keys and axis_ok is not None:
-            axis_ok_bool = parse_axis_ok(axis_ok)
-            if axis_ok_bool is True:
-                # 轴状态为 ok（排除 high，允许空值代表正常）
-                for k in axis_keys:
-                    field = k.lower()
-                    qs = qs.exclude(**{f"{field}__iexact": "high"})
-            elif axis_ok_bool is False:
-                # 轴状态为 high（所有所选轴都为 high）
-                for k in axis_keys:
-                    qs = qs.filter(**{f"{k.lower()}__iexact": "high"})
+        qs = apply_axis_filter(qs, self.request.query_params)
 
         sort_by = (self.request.query_params.get("sort_by") or "").strip()
         sort_order = (self.request.query_params.get("sort_order") or "").lower()
@@ -310,27 +315,35 @@ class RobotComponentViewSet(
             sort_order = "asc"
         qs = apply_ordering(qs, sort_by, sort_order, COMPONENT_SORT_FIELDS)
 
-        return qs
+        return project_list_queryset(self, qs)
 
     def perform_update(self, serializer):
-        instance = self.get_object()
+        instance = serializer.instance
+        before = snapshot_component(instance)
+        self._save_component(serializer, instance)
+        # 按编辑前后差量更新车间统计物化表
+        apply_component_change(before, snapshot_component(serializer.instance))
+        bump_data_generation()
+
+    def _save_component(self, serializer, instance):
         reference = serializer.validated_data.get("reference")
         number_provided = "number" in serializer.validated_data
         number = serializer.validated_data.get("number")
 
+        # 手动编辑后清空行哈希，下次差异导入时以 CSV 为准重新写入该行
         if reference:
             mapped_number = RobotReferenceDict.objects.filter(
                 robot=instance.robot,
                 reference=reference,
             ).values_list("number", flat=True).first()
             if mapped_number is not None:
-                serializer.save(number=mapped_number)
+                serializer.save(number=mapped_number, row_hash=None)
                 return
 
         if number_provided:
-            serializer.save(number=number)
+            serializer.save(number=number, row_hash=None)
         else:
-            serializer.save()
+            serializer.save(row_hash=None)
 
     def update(self, request, *args, **kwargs):
         """添加调试日志来查看请求详情"""
@@ -339,15 +352,11 @@ class RobotComponentViewSet(
             response = super().update(request, *args, **kwargs)
             logger.info(f"PATCH success for id {kwargs.get('pk')}")
 
-            # 同步更新到CSV配置文件
+            # CSV配置文件由后台队列合并回写，请求只负责登记
             try:
-                instance = self.get_object()
-                from .robot_config_sync import sync_robot_component_to_csv
-                sync_success = sync_robot_component_to_csv(instance)
-                if sync_success:
-                    logger.info(f"CSV同步成功: robot={instance.robot}")
+                enqueue_robot_config_sync([response.data.get("id") or kwargs.get("pk")])
             except Exception as csv_error:
-                logger.error(f"CSV同步失败: {csv_error}")
+                logger.error(f"CSV回写登记失败: {csv_error}")
                 # CSV同步失败不影响主流程，只记录日志
 
             return response
@@ -355,6 +364,89 @@ class RobotComponentViewSet(
             logger.error(f"PATCH error for id {kwargs.get('pk')}: {type(e).__name__}: {e}")
             raise
 
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk_update(self, request):
+        """
+        批量编辑组件：{"items": [{"id": 1, "mark": 1, ...}, ...]}（也接受直接传列表）
+
+        全部校验通过后在一个事务中保存；reference 对应的 number 一次查询解析，
+        车间统计与响应缓存代号各更新一次，robot_config CSV 交给后台回写队列按文件合并。
+        任一条校验失败时不做任何修改，返回 400 和按下标的错误信息。
+        """
+        items = request.data.get("items") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "items 必须是非空列表"}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = getattr(settings, "ROBOT_BULK_UPDATE_MAX_ITEMS", 500)
+        if len(items) > max_items:
+            return Response(
+                {"detail": f"单次最多编辑 {max_items} 条"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = []
+        for item in items:
+            try:
+                ids.append(int(item.get("id")))
+            except (AttributeError, TypeError, ValueError):
+                return Response({"detail": "每条记录都需要整数 id"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(set(ids)) != len(ids):
+            return Response({"detail": "id 不能重复"}, status=status.HTTP_400_BAD_REQUEST)
+
+        instances = RobotComponent.objects.select_related("group").in_bulk(ids)
+        errors = {}
+        serializers = []
+        for index, (pk, item) in enumerate(zip(ids, items)):
+            instance = instances.get(pk)
+            if instance is None:
+                errors[index] = {"id": [f"组件 {pk} 不存在"]}
+                continue
+            data = {key: value for key, value in item.items() if key != "id"}
+            serializer = RobotComponentSerializer(instance, data=data, partial=True)
+            if not serializer.is_valid():
+                errors[index] = serializer.errors
+                continue
+            serializers.append(serializer)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 一次查询解析所有 (robot, reference) 对应的 number
+        pairs = {
+            (serializer.instance.robot, serializer.validated_data["reference"])
+            for serializer in serializers
+            if serializer.validated_data.get("reference")
+        }
+        mapped_numbers = {}
+        if pairs:
+            rows = RobotReferenceDict.objects.filter(
+                robot__in={robot for robot, _ in pairs},
+                reference__in={reference for _, reference in pairs},
+            ).values_list("robot", "reference", "number")
+            mapped_numbers = {(robot, reference): number for robot, reference, number in rows if (robot, reference) in pairs}
+
+        group_ids = set()
+        with transaction.atomic():
+            for serializer in serializers:
+                instance = serializer.instance
+                # 编辑前后的组都需要重算统计
+                group_ids.add(instance.group_id)
+                extra = {"row_hash": None}
+                reference = serializer.validated_data.get("reference")
+                mapped_number = mapped_numbers.get((instance.robot, reference)) if reference else None
+                if mapped_number is not None:
+                    extra["number"] = mapped_number
+                serializer.save(**extra)
+                group_ids.add(serializer.instance.group_id)
+
+        rebuild_group_stats(group_ids)
+        bump_data_generation()
+
+        saved = [serializer.instance for serializer in serializers]
+        try:
+            enqueue_robot_config_sync(instance.pk for instance in saved)
+        except Exception as csv_error:
+            logger.error(f"批量CSV回写登记失败: {csv_error}")
+
+        return Response({"updated": len(saved), "results": RobotComponentSerializer(saved, many=True).data})
+
     @action(detail=False, methods=["get"])
     def bi_robots(self, request):
         """
@@ -386,12 +478,12 @@ class RobotComponentViewSet(
             return f"mysql+pymysql://{sg_user}:{sg_password}@{sg_host}:{sg_port}/{sg_name}"
 
         def _find_sg_table_exact(table_name: str):
-            from sqlalchemy import create_engine, text
+            from sqlalchemy import text
             name = (table_name or "").strip()
             if not name:
                 return None
 
-            engine = create_engine(_get_sg_db_url())
+            engine = get_sg_engine(_get_sg_db_url())
             with engine.connect() as conn:
                 # 使用 information_schema 避免全库 SHOW TABLES；精确匹配（大小写不敏感）
                 sg_db_name = os.getenv("SG_DB_NAME")
@@ -455,7 +547,6 @@ class RobotComponentViewSet(
             }
         """
         from .bokeh_charts import get_table_time_bounds, get_db_engine
-        from sqlalchemy import create_engine
 
         table_name = request.query_params.get("robot")
         if not table_name:
@@ -469,7 +560,7 @@ class RobotComponentViewSet(
             # 获取数据库连接配置
             db_config = get_db_engine()
             engine_url = f"mysql+pymysql://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}"
-            engine = create_engine(engine_url)
+            engine = get_sg_engine(engine_url)
 
             # 获取真实时间边界（MIN/MAX）
             start_time, end_time = get_table_time_bounds(table_name, engine)
@@ -569,7 +660,7 @@ class RobotComponentViewSet(
             "shop_stats": {"MRA1": {"created": 50, "updated": 5}}
         }
         """
-        from .weekly_result_service import import_robot_components_csv
+        from .weekly_result_service import IMPORT_MODES, import_robot_components_csv
         from rest_framework import serializers
 
         class ImportCSVSerializer(serializers.Serializer):
@@ -577,6 +668,7 @@ class RobotComponentViewSet(
             project = serializers.CharField(required=False, default='reuse')
             file_path = serializers.CharField(required=False, allow_blank=True)
             use_mysql_load_data = serializers.BooleanField(required=False)
+            import_mode = serializers.ChoiceField(choices=IMPORT_MODES, required=False)
 
         serializer = ImportCSVSerializer(data=request.data)
         if not serializer.is_valid():
@@ -593,6 +685,7 @@ class RobotComponentViewSet(
                 folder_path=data.get('folder_path') or None,
                 project=data.get('project') or None,
                 use_mysql_load_data=data.get('use_mysql_load_data'),
+                import_mode=data.get('import_mode'),
             )
             return Response(result)
         except FileNotFoundError as e:
@@ -613,12 +706,14 @@ class RobotComponentViewSet(
         """
         from rest_framework import serializers
         from .tasks import import_robot_components_csv_task
+        from .weekly_result_service import IMPORT_MODES
 
         class ImportCSVAsyncSerializer(serializers.Serializer):
             folder_path = serializers.CharField(required=False, allow_blank=True)
             project = serializers.CharField(required=False, default='reuse')
             file_path = serializers.CharField(required=False, allow_blank=True)
             use_mysql_load_data = serializers.BooleanField(required=False)
+            import_mode = serializers.ChoiceField(choices=IMPORT_MODES, required=False)
 
         serializer = ImportCSVAsyncSerializer(data=request.data)
         if not serializer.is_valid():
@@ -634,6 +729,7 @@ class RobotComponentViewSet(
             folder_path=data.get('folder_path') or None,
             project=data.get('project') or None,
             use_mysql_load_data=data.get('use_mysql_load_data'),
+            import_mode=data.get('import_mode'),
         )
         return Response({
             'success': True,
@@ -679,16 +775,25 @@ class RobotComponentViewSet(
                 "disconnected": 8
             }
         """
-        qs = self.get_queryset()
-        total = qs.count()
-        high_risk = qs.filter(level='H').count()
-        disconnected = qs.filter(build_disconnected_q()).count()
+        def build():
+            qs = self.get_queryset()
+            return {
+                'total': qs.count(),
+                'high_risk': qs.filter(level='H').count(),
+                'disconnected': qs.filter(is_disconnected=True).count(),
+            }
 
-        return Response({
-            'total': total,
-            'high_risk': high_risk,
-            'disconnected': disconnected,
-        })
+        return cached_response(request, "stats_summary", build)
+
+    @action(detail=False, methods=["get"], url_path="axis_high_combinations")
+    def axis_high_combinations(self, request):
+        """
+        按 high 轴组合统计机器人数量（沿用列表的筛选参数）
+
+        返回:
+            [{"mask": 18, "axes": ["A2", "A5"], "count": 6}, ...]
+        """
+        return Response(count_axis_high_combinations(self.filter_queryset(self.get_queryset())))
 
 
 class RiskEventViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
@@ -925,12 +1030,15 @@ def bi_program_data_view(request):
     program = request.GET.get("program", None)
     start_date = request.GET.get("start_date", None)
     end_date = request.GET.get("end_date", None)
+    # 切换到首屏未加载明细列的轴时，前端带 axis 请求补齐
+    axis = (request.GET.get("axis") or "").strip() or None
 
     payload = get_bi_program_payload(
         table_name=table_name,
         program=program,
         start_date=start_date,
         end_date=end_date,
+        axis=axis,
     )
     status_code = 200 if payload.get("ok") else 400
     return JsonResponse(payload, status=status_code)
@@ -943,7 +1051,7 @@ def bi_programs_view(request):
     为避免首屏阻塞，BI 页面会延迟调用此接口填充下拉选项。
     """
     from .bokeh_charts import get_db_engine, get_real_table_name, _normalize_date_bounds, _format_datetime
-    from sqlalchemy import create_engine, text
+    from sqlalchemy import text
     import logging
     import re
     import pandas as pd
@@ -965,7 +1073,7 @@ def bi_programs_view(request):
 
     db_config = get_db_engine()
     try:
-        engine = create_engine(
+        engine = get_sg_engine(
             f"mysql+pymysql://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}"
         )
     except Exception as e:
@@ -1393,6 +1501,9 @@ class GripperCheckViewSet(viewsets.GenericViewSet):
             ]
         }
         """
+        return cached_response(request, "robot_tables", lambda: self._build_robot_tables(request))
+
+    def _build_robot_tables(self, request):
         # 获取车间筛选参数
         group_key = request.query_params.get('group')
         keyword = request.query_params.get('keyword', '').strip()
@@ -1432,29 +1543,30 @@ class GripperCheckViewSet(viewsets.GenericViewSet):
                 'tech': t.get('tech', '') or '',
             })
 
-        return Response({'results': results})
+        return {'results': results}
 
     @action(detail=False, methods=["get"], url_path="filter_options")
     def filter_options(self, request):
         group_key = (request.query_params.get("group") or "").strip()
-        qs = RobotComponent.objects.all()
-        if group_key:
-            qs = qs.filter(group__key=group_key)
 
-        types = [
-            value for value in qs.exclude(type__isnull=True).exclude(type__exact="").values_list("type", flat=True).distinct().order_by("type")
-        ]
-        techs = [
-            value for value in qs.exclude(tech__isnull=True).exclude(tech__exact="").values_list("tech", flat=True).distinct().order_by("tech")
-        ]
+        def build():
+            qs = RobotComponent.objects.all()
+            if group_key:
+                qs = qs.filter(group__key=group_key)
 
-        return Response(
-            {
+            types = [
+                value for value in qs.exclude(type__isnull=True).exclude(type__exact="").values_list("type", flat=True).distinct().order_by("type")
+            ]
+            techs = [
+                value for value in qs.exclude(tech__isnull=True).exclude(tech__exact="").values_list("tech", flat=True).distinct().order_by("tech")
+            ]
+            return {
                 "success": True,
                 "types": types,
                 "techs": techs,
             }
-        )
+
+        return cached_response(request, "filter_options", build)
 
     @action(detail=False, methods=['get'])
     def config_template(self, request):
@@ -1498,11 +1610,14 @@ def gripper_check_events(request):
     )
 
 
-class RobotHighRiskSnapshotViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class RobotHighRiskSnapshotViewSet(KeysetPaginationMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """历史高风险机器人 ViewSet - 读取 _robot_high_risk_snapshots 表"""
     queryset = RobotHighRiskSnapshot.objects.all()
     serializer_class = RobotHighRiskSnapshotSerializer
     pagination_class = StandardResultsSetPagination
+    # 带 cursor 参数时按 (sort_by, id) 键集分页，深翻历史与首页代价相同
+    sort_fields = SNAPSHOT_SORT_FIELDS
+    default_sort = "-created_at"
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -1537,14 +1652,7 @@ class RobotHighRiskSnapshotViewSet(mixins.ListModelMixin, viewsets.GenericViewSe
         # 搜索关键词
         keyword = (self.request.query_params.get('keyword') or '').strip()
         if keyword:
-            qs = qs.filter(
-                Q(robot__icontains=keyword)
-                | Q(shop__icontains=keyword)
-                | Q(reference__icontains=keyword)
-                | Q(type__icontains=keyword)
-                | Q(tech__icontains=keyword)
-                | Q(remark__icontains=keyword)
-            )
+            qs = apply_keyword_search(qs, keyword)
 
         mark_mode = self.request.query_params.get("markMode")
         if mark_mode == "zero":
@@ -1552,26 +1660,7 @@ class RobotHighRiskSnapshotViewSet(mixins.ListModelMixin, viewsets.GenericViewSe
         elif mark_mode == "nonzero":
             qs = qs.exclude(mark=0)
 
-        axis_keys_raw = (self.request.query_params.get("axisKeys") or "").strip()
-        axis_keys = [k.strip() for k in axis_keys_raw.split(",") if k.strip()] if axis_keys_raw else []
-        axis_key = (self.request.query_params.get("axisKey") or "").strip()
-        if axis_key and axis_key not in axis_keys:
-            axis_keys.append(axis_key)
-
-        axis_ok = self.request.query_params.get("axisOk")
-        allowed_axes = {"A1", "A2", "A3", "A4", "A5", "A6", "A7"}
-        axis_keys = [k for k in axis_keys if k in allowed_axes]
-        if axis_keys and axis_ok is not None:
-            axis_ok_bool = parse_axis_ok(axis_ok)
-            if axis_ok_bool is True:
-                # 轴状态为 ok（排除 high，允许空值代表正常）
-                for k in axis_keys:
-                    field = k.lower()
-                    qs = qs.exclude(**{f"{field}__iexact": "high"})
-            elif axis_ok_bool is False:
-                # 轴状态为 high（所有所选轴都为 high）
-                for k in axis_keys:
-                    qs = qs.filter(**{f"{k.lower()}__iexact": "high"})
+        qs = apply_axis_filter(qs, self.request.query_params)
 
         sort_by = (self.request.query_params.get("sort_by") or "").strip()
         sort_order = (self.request.query_params.get("sort_order") or "").lower()
@@ -1579,7 +1668,12 @@ class RobotHighRiskSnapshotViewSet(mixins.ListModelMixin, viewsets.GenericViewSe
             sort_order = "asc"
         qs = apply_ordering(qs, sort_by, sort_order, SNAPSHOT_SORT_FIELDS)
 
-        return qs
+        return project_list_queryset(self, qs)
+
+    @action(detail=False, methods=["get"], url_path="axis_high_combinations")
+    def axis_high_combinations(self, request):
+        """按 high 轴组合统计历史快照数量（沿用列表的筛选参数）"""
+        return Response(count_axis_high_combinations(self.filter_queryset(self.get_queryset())))
 
     @action(detail=True, methods=["get"])
     def error_trend_chart(self, request, pk=None):
@@ -1653,7 +1747,8 @@ class RobotReferenceDictViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     def refresh(self, request):
         from .tasks import refresh_reference_dict_task
 
-        task = refresh_reference_dict_task.delay()
+        # 手动刷新忽略源文件指纹，按差异重新写入
+        task = refresh_reference_dict_task.delay(force=True)
         return Response(
             {"task_id": task.id, "status": "queued"},
             status=status.HTTP_202_ACCEPTED,
@@ -1707,6 +1802,10 @@ def get_last_sync_time(request):
     """
     获取最后同步时间（从 refresh_logs 表读取最新的记录）
     """
+    return cached_response(request, "last_sync_time", _build_last_sync_time)
+
+
+def _build_last_sync_time():
     from .models import RefreshLog
 
     # 获取最新的成功同步记录
@@ -1731,7 +1830,7 @@ def get_last_sync_time(request):
         records_deleted = 0
         total_records = 0
 
-    return Response({
+    return {
         'last_sync_time': last_sync_time,
         'source': source,
         'source_file': source_file,
@@ -1739,7 +1838,7 @@ def get_last_sync_time(request):
         'records_updated': records_updated,
         'records_deleted': records_deleted,
         'total_records': total_records,
-    })
+    }
 
 
 @api_view(['GET'])
@@ -1759,6 +1858,22 @@ def get_refresh_logs(request):
     return Response({'logs': serializer.data})
 
 
+@api_view(['GET'])
+def get_refresh_log_metrics(request, log_id):
+    """获取某次刷新的分阶段耗时（按文件与阶段）"""
+    from .models import RefreshLog
+
+    log = RefreshLog.objects.filter(id=log_id).first()
+    if log is None:
+        return Response({'error': '刷新日志不存在'}, status=status.HTTP_404_NOT_FOUND)
+
+    metrics = log.stage_metrics.all().order_by('id')
+    return Response({
+        'log': RefreshLogSerializer(log).data,
+        'metrics': ImportStageMetricSerializer(metrics, many=True).data,
+    })
+
+
 def _tail_lines(file_path, max_lines=200, chunk_size=65536):
     if not os.path.exists(file_path):
         return []
@@ -1806,6 +1921,14 @@ def get_bi_logs(request):
     return Response({"lines": filtered[-limit:]})
 
 
+@api_view(['GET'])
+def get_sg_pool_stats(request):
+    """当前进程内 SG 数据库连接池与 BI DataFrame 缓存状态"""
+    from .bokeh_charts import bi_df_cache_stats
+
+    return Response({"pools": sg_pool_stats(), "df_caches": bi_df_cache_stats()})
+
+
 @api_view(['GET'])
 def get_portal_overview_snapshot(request):
     """读取门户核心数据看板最近一次快照；若不存在则即时生成。"""
@@ -0,0 +1,132 @@
+"""
+weeklyresult 目录索引
+
+按文件夹缓存 *weeklyresult.csv 的文件名、mtime、ctime、大小和解析出的周日期。
+目录 mtime 未变化且未超过 WEEKLY_RESULT_SCAN_TTL 时复用索引，避免在网络共享目录上
+每次调用都执行 glob；复用时仍逐个 stat 已索引的文件，按文件自身的 (mtime_ns, size)
+更新条目，原地覆盖写入（不改变目录 mtime）也能立即反映出来。
+"""
+import fnmatch
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WEEKLY_RESULT_PATTERN = "*weeklyresult.csv"
+
+_lock = threading.Lock()
+_index = {}  # folder -> {"dir_mtime", "scanned_at", "entries", "signatures"}
+
+
+def _scan_folder(folder: str, previous: dict):
+    """返回 (entries, signatures)，signatures 为 文件名 -> (st_mtime_ns, st_size)"""
+    from .weekly_result_service import parse_week_from_filename
+
+    entries = []
+    signatures = {}
+    with os.scandir(folder) as iterator:
+        for dir_entry in iterator:
+            name = dir_entry.name
+            if name.startswith(".") or not fnmatch.fnmatch(name, WEEKLY_RESULT_PATTERN):
+                continue
+            try:
+                if not dir_entry.is_file():
+                    continue
+                stat = dir_entry.stat()
+            except OSError:
+                continue
+            cached = previous.get(name)
+            if cached is not None:
+                week_start, week_end = cached["week_start"], cached["week_end"]
+            else:
+                week_start, week_end = parse_week_from_filename(name)
+            entries.append({
+                "path": os.path.join(folder, name),
+                "name": name,
+                "mtime": stat.st_mtime,
+                "ctime": stat.st_ctime,
+                "size": stat.st_size,
+                "week_start": week_start,
+                "week_end": week_end,
+            })
+            signatures[name] = (stat.st_mtime_ns, stat.st_size)
+    return entries, signatures
+
+
+def _revalidate(entries: list, signatures: dict):
+    """
+    按各文件自身的 stat 校验缓存条目
+
+    返回 (entries, signatures, changed)；有文件无法 stat（已删除或重命名）时返回 None，由调用方重新扫描。
+    """
+    refreshed = []
+    current = {}
+    changed = False
+    for entry in entries:
+        try:
+            stat = os.stat(entry["path"])
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signatures.get(entry["name"]) != signature:
+            entry = {**entry, "mtime": stat.st_mtime, "ctime": stat.st_ctime, "size": stat.st_size}
+            changed = True
+        current[entry["name"]] = signature
+        refreshed.append(entry)
+    return refreshed, current, changed
+
+
+def list_weeklyresult_files(folder: str) -> list:
+    """
+    返回目录下全部 weeklyresult CSV 的元信息（字典列表，调用方可自由修改返回的列表）
+
+    目录不存在或不可访问时返回空列表。
+    """
+    if not folder:
+        return []
+    try:
+        dir_mtime = os.stat(folder).st_mtime_ns
+    except OSError:
+        return []
+
+    ttl = getattr(settings, "WEEKLY_RESULT_SCAN_TTL", 300)
+    now = time.monotonic()
+    with _lock:
+        cached = _index.get(folder)
+    if cached and cached["dir_mtime"] == dir_mtime and now - cached["scanned_at"] < ttl:
+        # 目录 mtime 只反映增删改名，原地覆盖写入需按文件自身的 stat 判断
+        revalidated = _revalidate(cached["entries"], cached["signatures"])
+        if revalidated is not None:
+            entries, signatures, changed = revalidated
+            if changed:
+                with _lock:
+                    _index[folder] = {**cached, "entries": entries, "signatures": signatures}
+            return list(entries)
+
+    previous = {entry["name"]: entry for entry in cached["entries"]} if cached else {}
+    try:
+        entries, signatures = _scan_folder(folder, previous)
+    except OSError as exc:
+        logger.warning("扫描 weeklyresult 目录失败: %s (%s)", folder, exc)
+        return []
+
+    with _lock:
+        _index[folder] = {
+            "dir_mtime": dir_mtime,
+            "scanned_at": now,
+            "entries": entries,
+            "signatures": signatures,
+        }
+    return list(entries)
+
+
+def latest_weeklyresult_file(folder: str, key: str = "mtime"):
+    """返回目录下按 key（mtime / ctime）最新的 weeklyresult 文件元信息，没有文件时返回 None"""
+    entries = list_weeklyresult_files(folder)
+    if not entries:
+        return None
+    return max(entries, key=lambda entry: entry[key])
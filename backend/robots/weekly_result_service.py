@@ -3,19 +3,25 @@
 从 weeklyresult.csv 文件导入数据到数据库
 """
 import os
-import glob
 import logging
 import csv
-import tempfile
 import hashlib
 import json
+import multiprocessing
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Optional, Tuple
 import pandas as pd
-from django.db import transaction, connection
+from django.db import transaction, connection, connections
 from datetime import datetime
 from django.utils import timezone
 from django.conf import settings
 
+from .csv_source import UTF8_ENCODINGS, detect_encoding, utf8_copy
+from .weekly_result_index import WEEKLY_RESULT_PATTERN, latest_weeklyresult_file, list_weeklyresult_files
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,6 +93,281 @@ CSV_FIELD_SPECS = [
     ("level", "level", "'L'"),
 ]
 
+IMPORT_MODE_REPLACE = "replace"
+IMPORT_MODE_DIFF = "diff"
+IMPORT_MODES = (IMPORT_MODE_REPLACE, IMPORT_MODE_DIFF)
+
+# 参与行哈希的字段：shop + CSV 中的全部指标列
+COMPONENT_HASH_FIELDS = ["shop"] + [target_col for target_col, _, _ in CSV_FIELD_SPECS]
+COMPONENT_DIFF_UPDATE_FIELDS = [
+    "group",
+    *COMPONENT_HASH_FIELDS,
+    "source_key",
+    "source_path",
+    "is_disconnected",
+    "axis_high_mask",
+    "row_hash",
+    "updated_at",
+]
+
+# ORM 导入时按整数写入的列（其余非文本列按浮点处理）
+CSV_INT_FIELDS = {"mark"}
+
+
+def _csv_spec_default(default_sql: Optional[str]):
+    """把 CSV_FIELD_SPECS 中的 SQL 默认值转换为 Python 值"""
+    if default_sql is None:
+        return None
+    if default_sql.startswith("'"):
+        return default_sql.strip("'")
+    return float(default_sql)
+
+
+# 以文本读取的列，避免 pandas 把编号、等级之类的列推断成数值
+CSV_TEXT_DTYPES = {
+    "robot": str,
+    "shop": str,
+    **{
+        source_col: str
+        for _, source_col, default_sql in CSV_FIELD_SPECS
+        if isinstance(_csv_spec_default(default_sql), str)
+    },
+}
+
+# ORM 导入时每行插入元组的字段顺序，row_hash 固定在最后
+COMPONENT_INSERT_FIELDS = [
+    "group_id",
+    "robot",
+    *COMPONENT_HASH_FIELDS,
+    "source_key",
+    "source_path",
+    "is_disconnected",
+    "axis_high_mask",
+    "row_hash",
+]
+
+# 高风险快照从 robot_components 复制的字段（两张表结构一致，快照表没有 row_hash）
+SNAPSHOT_COPY_FIELDS = [field for field in COMPONENT_INSERT_FIELDS if field != "row_hash"]
+
+
+def _resolve_import_mode(import_mode: Optional[str]) -> str:
+    mode = (import_mode or getattr(settings, "WEEKLY_RESULT_IMPORT_MODE", IMPORT_MODE_REPLACE) or "").strip().lower()
+    if mode not in IMPORT_MODES:
+        logger.warning("未知的导入模式 %s，使用 %s", mode, IMPORT_MODE_REPLACE)
+        return IMPORT_MODE_REPLACE
+    return mode
+
+
+def _hash_payload(payload) -> str:
+    raw = json.dumps(list(payload), ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _component_row_hash(values: dict) -> str:
+    return _hash_payload(values.get(field) for field in COMPONENT_HASH_FIELDS)
+
+
+def _apply_component_diff(scope_qs, row_chunks, batch_size: int = 1000) -> dict:
+    """
+    差异导入：按 (source_key, robot) 对齐新旧数据，只对行哈希变化的记录执行写入
+
+    Args:
+        scope_qs: 当前来源在 robot_components 中的旧数据范围
+        row_chunks: 待导入数据块的可迭代对象，每块为字段字典列表（与 RobotComponent 字段一致），
+            逐块比对写入，旧数据只在内存中保留 (id, robot, row_hash)
+        batch_size: 批量写入大小
+
+    Returns:
+        写入统计（created/updated/deleted/unchanged 以及按车间的统计）
+    """
+    from .models import RobotComponent
+
+    now = timezone.now()
+    existing = {}
+    stale_ids = []
+    for pk, robot, row_hash in scope_qs.order_by("id").values_list("id", "robot", "row_hash"):
+        if robot in existing:
+            # 同一来源下重复的 robot 只保留一条
+            stale_ids.append(pk)
+            continue
+        existing[robot] = (pk, row_hash)
+
+    written = {}  # robot -> id（本次新增的记录为 None）
+    late_duplicates = {}  # 在之前数据块中已写入的 robot，最后统一覆盖
+    duplicate_rows = 0
+    shop_stats = {}
+    created = 0
+    updated = 0
+    unchanged = 0
+
+    with transaction.atomic():
+        for rows in row_chunks:
+            incoming = {}
+            for values in rows:
+                if not values.get("row_hash"):
+                    values["row_hash"] = _component_row_hash(values)
+                robot = values["robot"]
+                if robot in written:
+                    duplicate_rows += 1
+                    late_duplicates[robot] = values
+                    continue
+                if robot in incoming:
+                    duplicate_rows += 1
+                incoming[robot] = values
+
+            to_create = []
+            to_update = []
+            for robot, values in incoming.items():
+                stats = shop_stats.setdefault(values["shop"], {"created": 0, "updated": 0})
+                current = existing.pop(robot, None)
+                if current is None:
+                    to_create.append(RobotComponent(**values))
+                    written[robot] = None
+                    stats["created"] += 1
+                    continue
+                pk, row_hash = current
+                written[robot] = pk
+                if row_hash == values["row_hash"]:
+                    unchanged += 1
+                    continue
+                obj = RobotComponent(id=pk, **values)
+                obj.updated_at = now
+                to_update.append(obj)
+                stats["updated"] += 1
+
+            if to_update:
+                RobotComponent.objects.bulk_update(to_update, COMPONENT_DIFF_UPDATE_FIELDS, batch_size=batch_size)
+            if to_create:
+                RobotComponent.objects.bulk_create(to_create, batch_size=batch_size)
+            created += len(to_create)
+            updated += len(to_update)
+
+        for robot, values in late_duplicates.items():
+            pk = written[robot]
+            target_qs = RobotComponent.objects.filter(id=pk) if pk else scope_qs.filter(robot=robot)
+            target_qs.update(updated_at=now, **values)
+
+        stale_ids.extend(pk for pk, _ in existing.values())
+        for start in range(0, len(stale_ids), batch_size):
+            RobotComponent.objects.filter(id__in=stale_ids[start:start + batch_size]).delete()
+
+    return {
+        "records_created": created,
+        "records_updated": updated,
+        "records_deleted": len(stale_ids),
+        "records_unchanged": unchanged,
+        "duplicate_rows": duplicate_rows,
+        "shop_stats": shop_stats,
+    }
+
+
+def _text_column(df, col: str, default: str = ""):
+    if col not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    series = df[col].astype(object)
+    return series.where(series.notna() & (series != ""), default).astype(str)
+
+
+def _component_key_columns(df):
+    """返回 (robot, shop) 两列，空 shop 归入“未分配”"""
+    robot_col = _text_column(df, "robot")
+    shop_col = _text_column(df, "shop", "未分配")
+    return robot_col, shop_col
+
+
+def _convert_csv_column(df, source_col: str, target_col: str, default_sql: Optional[str]) -> list:
+    """
+    按列转换 CSV 字段，语义与 LOAD DATA 的 _sql_value 保持一致：
+    空值取默认值，数值列无法解析时按空值处理
+    """
+    default = _csv_spec_default(default_sql)
+    if isinstance(default, str):
+        return _text_column(df, source_col, default).tolist()
+
+    is_int = target_col in CSV_INT_FIELDS
+    if source_col not in df.columns:
+        value = int(default or 0) if is_int else default
+        return [value] * len(df)
+
+    values = pd.to_numeric(df[source_col], errors="coerce")
+    values = values.mask(values.abs() == float("inf"))
+    if is_int:
+        return values.fillna(default or 0).astype("int64").tolist()
+    if default is not None:
+        return values.fillna(default).astype(float).tolist()
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _convert_component_frame(df, group_ids: dict, source_key=None, source_path=None) -> Tuple[list, int]:
+    """
+    把 weeklyresult DataFrame 整列转换为插入元组（字段顺序见 COMPONENT_INSERT_FIELDS）
+
+    Args:
+        df: pd.read_csv 读取的数据块（文本列以 str 读取）
+        group_ids: 车间 key -> RobotGroup.id
+        source_key: 数据来源 key
+        source_path: 数据来源路径
+
+    Returns:
+        (rows, skipped): 插入元组列表，以及缺少 robot 或车间的跳过行数
+    """
+    from .models import AXIS_FIELDS, DISCONNECTED_FIELDS, is_axis_high
+
+    robot_col, shop_col = _component_key_columns(df)
+    group_col = shop_col.map(group_ids)
+    valid = (robot_col != "") & group_col.notna()
+    skipped = int((~valid).sum())
+    df = df[valid]
+
+    columns = [
+        group_col[valid].astype("int64").tolist(),
+        robot_col[valid].tolist(),
+        shop_col[valid].tolist(),
+    ]
+    columns.extend(
+        _convert_csv_column(df, source_col, target_col, default_sql)
+        for target_col, source_col, default_sql in CSV_FIELD_SPECS
+    )
+
+    hash_stop = 2 + len(COMPONENT_HASH_FIELDS)
+    # 失联判断与轴状态位用到的列在插入元组中的位置
+    disconnected_indexes = [COMPONENT_INSERT_FIELDS.index(field) for field in DISCONNECTED_FIELDS]
+    axis_indexes = [(COMPONENT_INSERT_FIELDS.index(field), 1 << bit) for bit, field in enumerate(AXIS_FIELDS)]
+    rows = [
+        (
+            *values,
+            source_key,
+            source_path,
+            all(values[index] is None for index in disconnected_indexes),
+            sum(bit for index, bit in axis_indexes if is_axis_high(values[index])),
+            _hash_payload(values[2:hash_stop]),
+        )
+        for values in zip(*columns)
+    ]
+    return rows, skipped
+
+
+def _bulk_insert_component_rows(rows: list, batch_size: int = 1000) -> int:
+    """用 executemany 直接写入 _convert_component_frame 生成的元组，不再逐行构造模型实例"""
+    from .models import RobotComponent
+
+    if not rows:
+        return 0
+    meta = RobotComponent._meta
+    quote = connection.ops.quote_name
+    columns = [meta.get_field(name).column for name in COMPONENT_INSERT_FIELDS]
+    columns += [meta.get_field("created_at").column, meta.get_field("updated_at").column]
+    sql = (
+        f"INSERT INTO {quote(meta.db_table)} ({', '.join(quote(col) for col in columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, [(*row, now, now) for row in rows[start:start + batch_size]])
+    return len(rows)
+
+
 def _load_path_config_file() -> dict:
     config_path = getattr(
         settings,
@@ -144,15 +425,7 @@ def sync_weekly_result_path_config() -> list:
 
 
 def _detect_csv_encoding(file_path: str) -> str:
-    with open(file_path, "rb") as file_obj:
-        sample = file_obj.read(4096)
-    for enc in ("utf-8-sig", "utf-8", "gb18030"):
-        try:
-            sample.decode(enc)
-            return enc
-        except UnicodeDecodeError:
-            continue
-    return "utf-8"
+    return detect_encoding(file_path)
 
 
 def _read_csv_header(file_path: str, encoding: str) -> list:
@@ -165,15 +438,11 @@ def _read_csv_header(file_path: str, encoding: str) -> list:
 
 
 def _ensure_utf8_csv(file_path: str, encoding: str) -> Tuple[str, str, bool]:
-    if encoding in ("utf-8", "utf-8-sig"):
+    if encoding in UTF8_ENCODINGS:
         return file_path, encoding, False
-    with open(file_path, "r", encoding=encoding, newline="") as src:
-        with tempfile.NamedTemporaryFile(
-            "w", delete=False, suffix=".csv", encoding="utf-8", newline=""
-        ) as dst:
-            for line in src:
-                dst.write(line)
-            return dst.name, "utf-8", True
+    # 转码副本由共享读取层缓存复用，调用方无需删除
+    utf8_path, utf8_encoding = utf8_copy(file_path)
+    return utf8_path, utf8_encoding, False
 
 
 def _sql_value(headers: set, source_col: str, default_sql: Optional[str]) -> str:
@@ -190,6 +459,27 @@ def _mysql_load_csv(
     source_key: Optional[str] = None,
     source_path: Optional[str] = None,
 ) -> dict:
+    """
+    MySQL LOAD DATA 快速导入
+
+    CSV 先载入临时表并规整，再在会话级影子表中拼好目标行，最后用一个短事务
+    删除来源旧数据并从影子表整批写入。换入前 robot_components 不受影响，
+    看板在导入期间始终读到完整数据。
+
+    Returns:
+        导入统计，timings 为各阶段耗时（秒）：decode / load / normalize / insert / delete / swap
+    """
+    from .models import AXIS_FIELDS, DISCONNECTED_FIELDS
+
+    timings = {}
+    phase_start = time.perf_counter()
+
+    def mark_phase(name: str) -> None:
+        nonlocal phase_start
+        now = time.perf_counter()
+        timings[name] = round(now - phase_start, 3)
+        phase_start = now
+
     encoding = _detect_csv_encoding(file_path)
     header = _read_csv_header(file_path, encoding)
     if not header or "robot" not in header:
@@ -204,17 +494,21 @@ def _mysql_load_csv(
     if encoding not in ("utf-8", "utf-8-sig"):
         tmp_file_path, encoding, cleanup_tmp = _ensure_utf8_csv(file_path, encoding)
         log_print_func(f"CSV 已转换为 UTF-8: {tmp_file_path}")
+    mark_phase("decode")
 
     tmp_table = "tmp_weeklyresult_import"
+    stage_table = "tmp_weeklyresult_stage"
 
     columns_sql = ", ".join(f"`{col}`" for col in normalized_header)
+    # 规整列直接建在临时表里，避免 ALTER TABLE 触发隐式提交
     create_columns_sql = ", ".join(f"`{col}` TEXT NULL" for col in normalized_header)
 
     try:
         with connection.cursor() as cursor:
             cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{tmp_table}`")
             cursor.execute(
-                f"CREATE TEMPORARY TABLE `{tmp_table}` (`__row_id` BIGINT NOT NULL, {create_columns_sql}) "
+                f"CREATE TEMPORARY TABLE `{tmp_table}` (`__row_id` BIGINT NOT NULL, {create_columns_sql}, "
+                "`__robot_norm` VARCHAR(64) NULL, `__shop_norm` VARCHAR(64) NULL) "
                 "CHARACTER SET utf8mb4"
             )
             cursor.execute("SET @rownum := 0")
@@ -233,12 +527,8 @@ def _mysql_load_csv(
                 cursor.execute(
                     f"UPDATE `{tmp_table}` SET `{last_col}` = TRIM(TRAILING '\\r' FROM `{last_col}`)"
                 )
+            mark_phase("load")
 
-            cursor.execute(
-                f"ALTER TABLE `{tmp_table}` "
-                "ADD COLUMN `__robot_norm` VARCHAR(64) NULL, "
-                "ADD COLUMN `__shop_norm` VARCHAR(64) NULL"
-            )
             cursor.execute(
                 f"UPDATE `{tmp_table}` SET "
                 f"`__robot_norm` = NULLIF(`robot`, ''), "
@@ -263,16 +553,7 @@ def _mysql_load_csv(
             shop_stats = {row[0]: {"created": int(row[1]), "updated": 0} for row in cursor.fetchall()}
             records_created = sum(stat["created"] for stat in shop_stats.values())
             records_updated = 0
-
-            delete_sql = "DELETE FROM robot_components"
-            delete_params = []
-            if source_key:
-                delete_sql += " WHERE source_key = %s"
-                delete_params.append(source_key)
-            elif source_path:
-                delete_sql += " WHERE source_path = %s"
-                delete_params.append(source_path)
-            cursor.execute(delete_sql, delete_params)
+            mark_phase("normalize")
 
             cursor.execute(
                 "INSERT IGNORE INTO robot_groups (`key`, `name`, `expected_total`, `created_at`, `updated_at`) "
@@ -300,29 +581,82 @@ def _mysql_load_csv(
                 insert_columns.append("`source_path`")
                 insert_values.append("%s")
                 insert_params.append(source_path)
+            csv_values = {}
             for target_col, source_col, default_sql in CSV_FIELD_SPECS:
+                csv_values[target_col] = _sql_value(header_set, source_col, default_sql)
                 insert_columns.append(f"`{target_col}`")
-                insert_values.append(_sql_value(header_set, source_col, default_sql))
+                insert_values.append(csv_values[target_col])
+            # is_disconnected / axis_high_mask 没有数据库默认值，必须在同一条 INSERT ... SELECT 中算出
+            insert_columns.append("`is_disconnected`")
+            insert_values.append(
+                "(" + " AND ".join(f"({csv_values.get(field, 'NULL')}) IS NULL" for field in DISCONNECTED_FIELDS) + ")"
+            )
+            insert_columns.append("`axis_high_mask`")
+            insert_values.append(
+                "(" + " + ".join(
+                    f"IF(LOWER(TRIM({csv_values.get(field, 'NULL')})) = 'high', {1 << bit}, 0)"
+                    for bit, field in enumerate(AXIS_FIELDS)
+                ) + ")"
+            )
             insert_columns.extend(["`created_at`", "`updated_at`"])
             insert_values.extend(["NOW()", "NOW()"])
-            insert_sql = (
-                f"INSERT INTO robot_components ({', '.join(insert_columns)}) "
+
+            # 影子表：只含目标列的会话级临时表，先在这里拼好全部目标行。
+            # 不用 LIKE robot_components：InnoDB 临时表不支持其上的 FULLTEXT 索引
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{stage_table}`")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE `{stage_table}` "
+                f"SELECT {', '.join(insert_columns)} FROM robot_components WHERE 1 = 0"
+            )
+            cursor.execute(
+                f"INSERT INTO `{stage_table}` ({', '.join(insert_columns)}) "
                 f"SELECT {', '.join(insert_values)} "
                 f"FROM `{tmp_table}` s "
                 "JOIN robot_groups g ON g.`key` = s.__shop_norm "
-                "WHERE s.__robot_norm IS NOT NULL"
+                "WHERE s.__robot_norm IS NOT NULL",
+                insert_params,
             )
-            cursor.execute(insert_sql, insert_params)
+            mark_phase("insert")
+
+            delete_sql = "DELETE FROM robot_components"
+            delete_params = []
+            if source_key:
+                delete_sql += " WHERE source_key = %s"
+                delete_params.append(source_key)
+            elif source_path:
+                delete_sql += " WHERE source_path = %s"
+                delete_params.append(source_path)
+
+            # 换入：删除旧分区与写入新分区在同一个短事务内完成
+            with transaction.atomic():
+                cursor.execute(delete_sql, delete_params)
+                records_deleted = max(cursor.rowcount or 0, 0)
+                mark_phase("delete")
+                cursor.execute(
+                    f"INSERT INTO robot_components ({', '.join(insert_columns)}) "
+                    f"SELECT {', '.join(insert_columns)} FROM `{stage_table}`"
+                )
+            mark_phase("swap")
+
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{stage_table}`")
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{tmp_table}`")
     finally:
         if cleanup_tmp and os.path.exists(tmp_file_path):
             os.remove(tmp_file_path)
 
+    log_print_func(
+        "LOAD DATA 各阶段耗时: "
+        + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items())
+    )
+
     return {
         "records_created": records_created,
         "records_updated": records_updated,
+        "records_deleted": records_deleted,
         "shop_stats": shop_stats,
         "skipped_no_robot": skipped_no_robot,
         "total_rows": records_created + records_updated + skipped_no_robot,
+        "timings": timings,
     }
 
 
@@ -440,6 +774,67 @@ def log_print(message: str):
     return f"[{timestamp}] {message}"
 
 
+def _process_peak_rss_mb() -> Optional[float]:
+    """
+    当前进程自启动以来的内存历史峰值（MB），Windows 等没有 resource 模块的平台返回 None
+
+    ru_maxrss 只增不减，各阶段记录的是截至该阶段结束时的进程峰值，而不是阶段自身的内存占用。
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def _stage_metric(stage: str, duration: float, rows: int = 0, source_file: str = "") -> dict:
+    """构造一条导入阶段指标，字段与 ImportStageMetric 一致"""
+    duration = max(float(duration or 0), 0.0)
+    rows = int(rows or 0)
+    return {
+        "stage": stage,
+        "source_file": source_file,
+        "duration": round(duration, 3),
+        "rows": rows,
+        "rows_per_sec": round(rows / duration, 1) if rows and duration > 0 else None,
+        "process_peak_rss_mb": _process_peak_rss_mb(),
+    }
+
+
+def _file_stage_metrics(result: dict, source_file: str) -> list:
+    """把单文件导入的 timings 映射为 decode / parse / delete / insert 四个阶段"""
+    timings = result.get("timings") or {}
+    if "parse" in timings:
+        parse = timings["parse"]
+    else:
+        # LOAD DATA：载入临时表 + 规整
+        parse = timings.get("load", 0) + timings.get("normalize", 0)
+    insert = timings.get("insert", 0) + timings.get("swap", 0)
+    return [
+        _stage_metric("decode", timings.get("decode", 0), result["total_rows"], source_file),
+        _stage_metric("parse", parse, result["total_rows"], source_file),
+        _stage_metric("delete", timings.get("delete", 0), result["records_deleted"], source_file),
+        _stage_metric("insert", insert, result["records_created"] + result["records_updated"], source_file),
+    ]
+
+
+def _save_stage_metrics(refresh_log, stage_metrics: list) -> None:
+    from django.db.utils import DatabaseError
+    from .models import ImportStageMetric
+
+    try:
+        ImportStageMetric.objects.bulk_create(
+            [ImportStageMetric(refresh_log=refresh_log, **metric) for metric in stage_metrics]
+        )
+    except DatabaseError as exc:
+        # 指标写入失败不影响同步结果
+        logger.warning("写入导入阶段指标失败: %s", exc)
+
+
 def create_high_risk_snapshot(component) -> bool:
     """
     为高风险机器人创建数据快照
@@ -454,80 +849,54 @@ def create_high_risk_snapshot(component) -> bool:
 
     # 字段与 RobotComponent 完全一致
     RobotHighRiskSnapshot.objects.create(
-        group=component.group,
-        robot=component.robot,
-        shop=component.shop,
-        reference=component.reference,
-        number=component.number,
-        type=component.type,
-        tech=component.tech,
-        mark=component.mark,
-        remark=component.remark,
-        error1_c1=component.error1_c1,
-        tem1_m=component.tem1_m,
-        tem2_m=component.tem2_m,
-        tem3_m=component.tem3_m,
-        tem4_m=component.tem4_m,
-        tem5_m=component.tem5_m,
-        tem6_m=component.tem6_m,
-        tem7_m=component.tem7_m,
-        a1_e_rate=component.a1_e_rate,
-        a2_e_rate=component.a2_e_rate,
-        a3_e_rate=component.a3_e_rate,
-        a4_e_rate=component.a4_e_rate,
-        a5_e_rate=component.a5_e_rate,
-        a6_e_rate=component.a6_e_rate,
-        a7_e_rate=component.a7_e_rate,
-        a1_rms=component.a1_rms,
-        a2_rms=component.a2_rms,
-        a3_rms=component.a3_rms,
-        a4_rms=component.a4_rms,
-        a5_rms=component.a5_rms,
-        a6_rms=component.a6_rms,
-        a7_rms=component.a7_rms,
-        a1_e=component.a1_e,
-        a2_e=component.a2_e,
-        a3_e=component.a3_e,
-        a4_e=component.a4_e,
-        a5_e=component.a5_e,
-        a6_e=component.a6_e,
-        a7_e=component.a7_e,
-        q1=component.q1,
-        q2=component.q2,
-        q3=component.q3,
-        q4=component.q4,
-        q5=component.q5,
-        q6=component.q6,
-        q7=component.q7,
-        curr_a1_max=component.curr_a1_max,
-        curr_a2_max=component.curr_a2_max,
-        curr_a3_max=component.curr_a3_max,
-        curr_a4_max=component.curr_a4_max,
-        curr_a5_max=component.curr_a5_max,
-        curr_a6_max=component.curr_a6_max,
-        curr_a7_max=component.curr_a7_max,
-        curr_a1_min=component.curr_a1_min,
-        curr_a2_min=component.curr_a2_min,
-        curr_a3_min=component.curr_a3_min,
-        curr_a4_min=component.curr_a4_min,
-        curr_a5_min=component.curr_a5_min,
-        curr_a6_min=component.curr_a6_min,
-        curr_a7_min=component.curr_a7_min,
-        a1=component.a1,
-        a2=component.a2,
-        a3=component.a3,
-        a4=component.a4,
-        a5=component.a5,
-        a6=component.a6,
-        a7=component.a7,
-        p_change=component.p_change,
-        level=component.level,
-        source_key=component.source_key,
-        source_path=component.source_path,
+        **{field: getattr(component, field) for field in SNAPSHOT_COPY_FIELDS}
     )
     return True
 
 
+def _archive_snapshots_sql(robot_list: list, batch_size: int = 1000) -> int:
+    """MySQL：按 robot 分批执行 INSERT ... SELECT，直接在库内复制数据"""
+    from .models import RobotComponent, RobotHighRiskSnapshot
+
+    quote = connection.ops.quote_name
+    source_meta = RobotComponent._meta
+    target_meta = RobotHighRiskSnapshot._meta
+    target_columns = [quote(target_meta.get_field(name).column) for name in SNAPSHOT_COPY_FIELDS]
+    source_columns = [quote(source_meta.get_field(name).column) for name in SNAPSHOT_COPY_FIELDS]
+    target_columns += [quote("created_at"), quote("updated_at")]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    archived_count = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(robot_list), batch_size):
+            robots = robot_list[start:start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {quote(target_meta.db_table)} ({', '.join(target_columns)}) "
+                f"SELECT {', '.join(source_columns)}, %s, %s "
+                f"FROM {quote(source_meta.db_table)} "
+                f"WHERE {quote(source_meta.get_field('robot').column)} IN ({', '.join(['%s'] * len(robots))})",
+                [now, now, *robots],
+            )
+            archived_count += max(cursor.rowcount or 0, 0)
+    return archived_count
+
+
+def _archive_snapshots_orm(robot_list: list, batch_size: int = 1000) -> int:
+    """非 MySQL 数据库：按 robot 分批读取字段值后 bulk_create"""
+    from .models import RobotComponent, RobotHighRiskSnapshot
+
+    archived_count = 0
+    for start in range(0, len(robot_list), batch_size):
+        robots = robot_list[start:start + batch_size]
+        snapshots = [
+            RobotHighRiskSnapshot(**values)
+            for values in RobotComponent.objects.filter(robot__in=robots).values(*SNAPSHOT_COPY_FIELDS)
+        ]
+        RobotHighRiskSnapshot.objects.bulk_create(snapshots, batch_size=batch_size)
+        archived_count += len(snapshots)
+    return archived_count
+
+
 def archive_high_risk_robots() -> dict:
     """
     将上次记录的高风险机器人数据存入历史快照表
@@ -535,7 +904,8 @@ def archive_high_risk_robots() -> dict:
     流程：
     1. 从 SystemConfig 获取上次记录的高风险机器人 robot 列表
     2. 根据 robot 列表从 robot_components 表获取数据
-    3. 将数据存入 _robot_high_risk_snapshots 表
+    3. 在一个事务内批量写入 _robot_high_risk_snapshots 表
+       （MySQL 使用 INSERT ... SELECT，其他数据库使用 bulk_create）
 
     Returns:
         归档结果统计
@@ -547,7 +917,6 @@ def archive_high_risk_robots() -> dict:
     last_high_risk_robots = SystemConfig.get('last_high_risk_robots', '[]')
 
     try:
-        import json
         robot_list = json.loads(last_high_risk_robots)
     except json.JSONDecodeError:
         log_print("警告：上次的高风险机器人列表格式错误，重新初始化")
@@ -563,16 +932,15 @@ def archive_high_risk_robots() -> dict:
             return {'archived_count': 0, 'message': '没有需要归档的高风险机器人'}
         log_print("未找到上次高风险列表，改用当前高风险机器人进行归档")
 
+    robot_list = list(dict.fromkeys(robot_list))
     log_print(f"准备归档 {len(robot_list)} 个高风险机器人: {', '.join(robot_list[:10])}{'...' if len(robot_list) > 10 else ''}")
 
-    # 获取这些机器人的数据
-    components = RobotComponent.objects.filter(robot__in=robot_list)
-    archived_count = 0
-
     try:
-        for component in components:
-            create_high_risk_snapshot(component)
-            archived_count += 1
+        with transaction.atomic():
+            if connection.vendor == "mysql":
+                archived_count = _archive_snapshots_sql(robot_list)
+            else:
+                archived_count = _archive_snapshots_orm(robot_list)
     except DatabaseError as exc:
         logger.exception("Failed to archive high risk snapshots")
         log_print(f"归档高风险快照失败: {exc}")
@@ -616,6 +984,10 @@ def save_current_high_risk_robots() -> None:
         log_print("当前没有高风险机器人需要记录")
 
 
+def _weekly_result_patterns(folders: list) -> list:
+    return [os.path.join(folder, WEEKLY_RESULT_PATTERN) for folder in folders]
+
+
 def get_latest_weeklyresult_csv(folder_path: str = None, project: str = None) -> str:
     """
     获取最新的 weeklyresult.csv 文件路径
@@ -634,23 +1006,16 @@ def get_latest_weeklyresult_csv(folder_path: str = None, project: str = None) ->
     if not folder_paths:
         raise FileNotFoundError("未配置 weeklyresult.csv 搜索路径")
 
-    # 直接在指定路径查找所有 weeklyresult.csv 文件
+    # 从目录索引中查找所有 weeklyresult.csv 文件
     csv_files = []
-    patterns = []
     for folder in folder_paths:
-        pattern = os.path.join(folder, '*weeklyresult.csv')
-        patterns.append(pattern)
-        csv_files.extend(glob.glob(pattern))
+        csv_files.extend(list_weeklyresult_files(folder))
 
     if not csv_files:
-        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(patterns)}")
+        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(_weekly_result_patterns(folder_paths))}")
 
-    # 按创建时间降序排序获取最新文件（Windows ctime 为创建时间）
-    target_files = [(f, os.path.getctime(f)) for f in csv_files]
-    sorted_files = sorted(target_files, key=lambda x: x[1], reverse=True)
-    latest_file = sorted_files[0][0]
-
-    return latest_file
+    # 按创建时间获取最新文件（Windows ctime 为创建时间）
+    return max(csv_files, key=lambda entry: entry["ctime"])["path"]
 
 
 def get_all_weeklyresult_csvs(folder_path: str = None, project: str = None) -> list:
@@ -673,22 +1038,15 @@ def get_all_weeklyresult_csvs(folder_path: str = None, project: str = None) -> l
 
     # 在所有路径中查找 weeklyresult.csv 文件
     csv_files = []
-    patterns = []
     for folder in folder_paths:
-        pattern = os.path.join(folder, '*weeklyresult.csv')
-        patterns.append(pattern)
-        found_files = glob.glob(pattern)
-        for f in found_files:
-            csv_files.append((f, os.path.getmtime(f), folder))
+        csv_files.extend(list_weeklyresult_files(folder))
 
     if not csv_files:
-        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(patterns)}")
-
-    # 按修改时间降序排序
-    sorted_files = sorted(csv_files, key=lambda x: x[1], reverse=True)
+        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(_weekly_result_patterns(folder_paths))}")
 
-    # 返回文件路径列表
-    return [f[0] for f in sorted_files]
+    # 按修改时间降序排序，返回文件路径列表
+    csv_files.sort(key=lambda entry: entry["mtime"], reverse=True)
+    return [entry["path"] for entry in csv_files]
 
 
 def get_latest_weeklyresult_csvs(folder_path: str = None, project: str = None) -> list:
@@ -710,21 +1068,16 @@ def get_latest_weeklyresult_csvs(folder_path: str = None, project: str = None) -
         raise FileNotFoundError("未配置 weeklyresult.csv 搜索路径")
 
     latest_files = []
-    patterns = []
     for folder in folder_paths:
-        pattern = os.path.join(folder, '*weeklyresult.csv')
-        patterns.append(pattern)
-        matched = glob.glob(pattern)
-        if not matched:
-            continue
-        latest = max(matched, key=lambda x: os.path.getmtime(x))
-        latest_files.append((latest, os.path.getmtime(latest)))
+        latest = latest_weeklyresult_file(folder)
+        if latest is not None:
+            latest_files.append(latest)
 
     if not latest_files:
-        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(patterns)}")
+        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(_weekly_result_patterns(folder_paths))}")
 
-    sorted_files = sorted(latest_files, key=lambda x: x[1], reverse=True)
-    return [f[0] for f in sorted_files]
+    latest_files.sort(key=lambda entry: entry["mtime"], reverse=True)
+    return [entry["path"] for entry in latest_files]
 
 
 def get_latest_weeklyresult_csvs_with_meta(folder_path: str = None, project: str = None) -> list:
@@ -736,25 +1089,22 @@ def get_latest_weeklyresult_csvs_with_meta(folder_path: str = None, project: str
         raise FileNotFoundError("未配置 weeklyresult.csv 搜索路径")
 
     latest_files = []
-    patterns = []
     for entry in sources:
         folder = entry["folder"]
-        pattern = os.path.join(folder, '*weeklyresult.csv')
-        patterns.append(pattern)
-        matched = glob.glob(pattern)
-        if not matched:
+        latest = latest_weeklyresult_file(folder)
+        if latest is None:
             continue
-        latest = max(matched, key=lambda x: os.path.getmtime(x))
         latest_files.append({
-            "path": latest,
+            "path": latest["path"],
             "folder": folder,
-            "mtime": os.path.getmtime(latest),
+            "mtime": latest["mtime"],
             "source_key": entry.get("key"),
             "source_path": folder,
         })
 
     if not latest_files:
-        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(patterns)}")
+        folders = [entry["folder"] for entry in sources]
+        raise FileNotFoundError(f"未找到匹配的 weeklyresult.csv 文件: {', '.join(_weekly_result_patterns(folders))}")
 
     latest_files.sort(key=lambda item: item["mtime"], reverse=True)
     return latest_files
@@ -833,33 +1183,315 @@ def get_available_csv_files(folder_path: str = None, project: str = None) -> lis
     """
     # 测试阶段使用本地路径
     folder_paths = _resolve_weekly_result_folders(folder_path)
-    csv_files = []
-    for folder in folder_paths:
-        pattern = os.path.join(folder, '*weeklyresult.csv')
-        csv_files.extend(glob.glob(pattern))
-
     results = []
-    for f in csv_files:
-        week_start, week_end = parse_week_from_filename(f)
-        results.append({
-            'path': f,
-            'name': os.path.basename(f),
-            'created_time': datetime.fromtimestamp(os.path.getmtime(f)).isoformat(),
-            'week_start': week_start.isoformat() if week_start else None,
-            'week_end': week_end.isoformat() if week_end else None,
-        })
+    for folder in folder_paths:
+        for entry in list_weeklyresult_files(folder):
+            week_start, week_end = entry["week_start"], entry["week_end"]
+            results.append({
+                'path': entry["path"],
+                'name': entry["name"],
+                'created_time': datetime.fromtimestamp(entry["mtime"]).isoformat(),
+                'week_start': week_start.isoformat() if week_start else None,
+                'week_end': week_end.isoformat() if week_end else None,
+            })
 
     # 按修改时间降序排序
     results.sort(key=lambda x: x['created_time'], reverse=True)
     return results
 
 
+def _import_weekly_result_file(
+    file_info: dict,
+    use_mysql_load_data: bool = False,
+    import_mode: str = IMPORT_MODE_REPLACE,
+    batch_size: int = 1000,
+) -> dict:
+    """
+    导入单个来源的 weeklyresult CSV，删除旧数据与写入新数据在同一个事务内完成
+
+    Returns:
+        当前文件的统计信息；imported 为 False 表示文件没有有效 robot 数据
+    """
+    current_file = file_info["path"]
+    source_key = file_info.get("source_key")
+    source_path = file_info.get("source_path") or file_info.get("folder")
+
+    # 解析日期
+    week_start, week_end = parse_week_from_filename(current_file)
+    if week_start:
+        log_print(f"解析日期范围: {week_start} ~ {week_end}")
+
+    result = None
+    if use_mysql_load_data:
+        log_print("使用 MySQL LOAD DATA 进行快速导入...")
+        try:
+            # 换入阶段在 _mysql_load_csv 内部使用短事务，载入与规整不占用 robot_components 的锁
+            result = _mysql_load_csv(
+                current_file,
+                log_print,
+                source_key=source_key,
+                source_path=source_path,
+            )
+            result.setdefault("records_unchanged", 0)
+            result["imported"] = True
+        except Exception as exc:
+            log_print(f"MySQL LOAD DATA 导入失败，回退到 ORM 批量导入: {exc}")
+            result = None
+
+    if result is None:
+        result = _orm_import_csv(
+            current_file,
+            import_mode=import_mode,
+            source_key=source_key,
+            source_path=source_path,
+            batch_size=batch_size,
+        )
+
+    result["stage_metrics"] = _file_stage_metrics(result, os.path.basename(current_file))
+    if not result["imported"]:
+        log_print("当前文件没有有效的 robot 数据，跳过导入")
+        return result
+
+    # 当前文件处理完成
+    log_print(f"\n文件 {os.path.basename(current_file)} 处理完成!")
+    log_print(f"  - 新增: {result['records_created']} 条")
+    log_print(f"  - 更新: {result['records_updated']} 条")
+    log_print(f"  - 删除: {result['records_deleted']} 条")
+    if import_mode == IMPORT_MODE_DIFF:
+        log_print(f"  - 未变化: {result['records_unchanged']} 条")
+    log_print(f"  - 跳过: {result['skipped_no_robot']} 条")
+    return result
+
+
+def _orm_import_csv(
+    file_path: str,
+    import_mode: str = IMPORT_MODE_REPLACE,
+    source_key: Optional[str] = None,
+    source_path: Optional[str] = None,
+    batch_size: int = 1000,
+) -> dict:
+    """
+    ORM 导入：读取共享读取层提供的 UTF-8 文件，在单个事务中分块导入
+    """
+    started = time.perf_counter()
+    csv_path, encoding = utf8_copy(file_path)
+    decode_seconds = time.perf_counter() - started
+    with transaction.atomic():
+        result = _import_component_chunks(
+            csv_path,
+            encoding,
+            import_mode=import_mode,
+            source_key=source_key,
+            source_path=source_path,
+            batch_size=batch_size,
+        )
+        if not result["imported"]:
+            # 没有有效数据时不删除旧数据
+            transaction.set_rollback(True)
+    result["timings"]["decode"] = round(decode_seconds, 3)
+    return result
+
+
+def _ensure_group_ids(shop_names, group_ids: dict, batch_size: int = 1000) -> dict:
+    """补齐车间分组，把 key -> id 累加到 group_ids（需在事务内调用）"""
+    from .models import RobotGroup
+
+    missing = [key for key in shop_names if key not in group_ids]
+    if not missing:
+        return group_ids
+    group_ids.update(RobotGroup.objects.filter(key__in=missing).values_list("key", "id"))
+    missing = [key for key in missing if key not in group_ids]
+    if missing:
+        RobotGroup.objects.bulk_create(
+            [RobotGroup(key=key, name=key, expected_total=0) for key in missing],
+            ignore_conflicts=True,
+            batch_size=batch_size,
+        )
+        # 加锁读取：并行导入时其他来源刚提交的分组不在当前事务的一致性快照里
+        group_ids.update(
+            RobotGroup.objects.select_for_update().filter(key__in=missing).values_list("key", "id")
+        )
+    return group_ids
+
+
+def _import_component_chunks(
+    file_path: str,
+    encoding: str,
+    import_mode: str = IMPORT_MODE_REPLACE,
+    source_key: Optional[str] = None,
+    source_path: Optional[str] = None,
+    batch_size: int = 1000,
+) -> dict:
+    """
+    按 WEEKLY_RESULT_IMPORT_CHUNK_SIZE 分块读取 CSV，每块转换后立即写入，
+    内存峰值只与块大小相关（需在事务内调用）
+    """
+    from .models import RobotComponent
+
+    chunk_size = max(int(getattr(settings, "WEEKLY_RESULT_IMPORT_CHUNK_SIZE", 20000) or 20000), batch_size)
+    stats = {
+        "total_rows": 0,
+        "skipped_no_robot": 0,
+        "written_rows": 0,
+    }
+    # 各阶段累计耗时（秒）：读取+转换 / 删除 / 写入
+    timings = {"parse": 0.0, "delete": 0.0, "insert": 0.0}
+    shop_stats = {}
+    group_ids = {}
+
+    if source_key:
+        scope_qs = RobotComponent.objects.filter(source_key=source_key)
+    elif source_path:
+        scope_qs = RobotComponent.objects.filter(source_path=source_path)
+    else:
+        scope_qs = None
+        if import_mode == IMPORT_MODE_DIFF:
+            log_print("未识别数据来源，差异导入改为按 robot 替换")
+            import_mode = IMPORT_MODE_REPLACE
+
+    def converted_chunks():
+        log_print(f"正在分块读取CSV文件（编码 {encoding}，每块 {chunk_size} 行）...")
+        with pd.read_csv(file_path, encoding=encoding, dtype=CSV_TEXT_DTYPES, chunksize=chunk_size) as reader:
+            chunk_iter = iter(reader)
+            while True:
+                started = time.perf_counter()
+                frame = next(chunk_iter, None)
+                if frame is None:
+                    timings["parse"] += time.perf_counter() - started
+                    break
+                robot_col, shop_col = _component_key_columns(frame)
+                _ensure_group_ids(set(shop_col[robot_col != ""].unique()), group_ids, batch_size)
+                rows, skipped = _convert_component_frame(
+                    frame,
+                    group_ids,
+                    source_key=source_key,
+                    source_path=source_path,
+                )
+                stats["total_rows"] += len(frame)
+                stats["skipped_no_robot"] += skipped
+                stats["written_rows"] += len(rows)
+                timings["parse"] += time.perf_counter() - started
+                log_print(f"已处理 {stats['total_rows']} 行...")
+                yield rows
+
+    records_deleted = 0
+    records_updated = 0
+    records_unchanged = 0
+    if import_mode == IMPORT_MODE_DIFF:
+        started = time.perf_counter()
+        diff_result = _apply_component_diff(
+            scope_qs,
+            ([dict(zip(COMPONENT_INSERT_FIELDS, row)) for row in rows] for rows in converted_chunks()),
+            batch_size=batch_size,
+        )
+        # 差异写入与分块读取交替进行，写入耗时（含差异删除）= 总耗时 - 读取耗时
+        timings["insert"] = time.perf_counter() - started - timings["parse"]
+        records_created = diff_result["records_created"]
+        records_updated = diff_result["records_updated"]
+        records_deleted = diff_result["records_deleted"]
+        records_unchanged = diff_result["records_unchanged"]
+        shop_stats = diff_result["shop_stats"]
+        if diff_result["duplicate_rows"]:
+            log_print(f"  - 重复 robot 行(仅保留最后一条): {diff_result['duplicate_rows']} 条")
+    else:
+        max_existing_id = None
+        if scope_qs is not None:
+            log_print(f"删除来源 {source_key or source_path} 下的旧数据...")
+            started = time.perf_counter()
+            # delete() 的总数包含级联删除的关联行，只统计 RobotComponent 本身
+            _, deleted_by_model = scope_qs.delete()
+            records_deleted = deleted_by_model.get(RobotComponent._meta.label, 0)
+            timings["delete"] += time.perf_counter() - started
+        else:
+            # 没有来源信息时按块内 robot 删除，只删除本次导入开始前已存在的记录
+            max_existing_id = RobotComponent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+        shop_index = COMPONENT_INSERT_FIELDS.index("shop")
+        robot_index = COMPONENT_INSERT_FIELDS.index("robot")
+        for rows in converted_chunks():
+            if max_existing_id is not None and rows:
+                started = time.perf_counter()
+                _, deleted_by_model = RobotComponent.objects.filter(
+                    robot__in={row[robot_index] for row in rows},
+                    id__lte=max_existing_id,
+                ).delete()
+                records_deleted += deleted_by_model.get(RobotComponent._meta.label, 0)
+                timings["delete"] += time.perf_counter() - started
+            started = time.perf_counter()
+            _bulk_insert_component_rows(rows, batch_size=batch_size)
+            timings["insert"] += time.perf_counter() - started
+            for shop, count in Counter(row[shop_index] for row in rows).items():
+                shop_stats.setdefault(shop, {"created": 0, "updated": 0})["created"] += count
+        records_created = stats["written_rows"]
+
+    return {
+        "imported": stats["written_rows"] > 0,
+        "records_created": records_created,
+        "records_updated": records_updated,
+        "records_deleted": records_deleted,
+        "records_unchanged": records_unchanged,
+        "skipped_no_robot": stats["skipped_no_robot"],
+        "shop_stats": shop_stats,
+        "total_rows": stats["total_rows"],
+        "timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+    }
+
+
+def _init_import_worker(settings_module: str) -> None:
+    """spawn 出的导入进程不继承父进程状态，需要先初始化 Django"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def _run_source_import(file_info: dict, **options) -> dict:
+    """并行导入的工作函数：每个来源使用独立的数据库连接，结束后关闭"""
+    try:
+        log_print(f"开始处理文件: {os.path.basename(file_info['path'])}")
+        return _import_weekly_result_file(file_info, **options)
+    finally:
+        connections.close_all()
+
+
+def _import_sources_in_parallel(csv_files: list, workers: int, **options) -> list:
+    """
+    按来源并行导入（各来源写入互不重叠的 source_key 分区）
+
+    Returns:
+        与 csv_files 顺序一致的单文件统计列表
+    """
+    workers = min(workers, len(csv_files))
+    executor = None
+    try:
+        # 当前进程带有数据库连接、缓存清理线程和 Redis 客户端，fork 可能复制持有中的锁而死锁；
+        # 使用 spawn 启动全新的解释器，在 initializer 中重新执行 django.setup()
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_import_worker,
+            initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "iot_monitor.settings"),),
+        )
+        futures = [executor.submit(_run_source_import, info, **options) for info in csv_files]
+    except (AssertionError, OSError, ValueError) as exc:
+        # Celery prefork 等守护进程内无法再创建子进程，退回线程池
+        log_print(f"无法创建导入进程池，改用线程并行导入: {exc}")
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = [executor.submit(_run_source_import, info, **options) for info in csv_files]
+    with executor:
+        return [future.result() for future in futures]
+
+
 def import_robot_components_csv(
     file_path: str = None,
     folder_path: str = None,
     project: str = None,
     source: str = "manual",
-    use_mysql_load_data: Optional[bool] = None
+    use_mysql_load_data: Optional[bool] = None,
+    import_mode: Optional[str] = None,
+    workers: Optional[int] = None,
 ) -> dict:
     """
     直接将 weeklyresult.csv 文件导入到 RobotComponent 表
@@ -872,17 +1504,25 @@ def import_robot_components_csv(
         folder_path: 文件夹路径（用于自动查找）
         project: 项目名称（用于自动查找）
         source: 数据来源 ("manual" 手动同步 / "auto" 自动同步)
+        import_mode: 导入模式 ("replace" 删除后全量重建 / "diff" 按行哈希差异写入)，
+            未提供时使用 settings.WEEKLY_RESULT_IMPORT_MODE
+        workers: 多来源并行导入的并发数，未提供时使用 settings.WEEKLY_RESULT_IMPORT_WORKERS，
+            1 表示逐个来源串行导入
 
     返回:
         导入结果统计
     """
-    from .models import RobotComponent, RobotGroup, RefreshLog
+    from .models import RobotComponent, RefreshLog
 
     warnings = []
+    stage_metrics = []
 
     # 获取文件路径（支持多文件）
     log_print("开始导入流程...")
-    sync_weekly_result_path_config()
+    started = time.perf_counter()
+    config_sources = sync_weekly_result_path_config()
+    stage_metrics.append(_stage_metric("config_sync", time.perf_counter() - started, len(config_sources)))
+    started = time.perf_counter()
     csv_files = []
     skipped_files = []
     if file_path is None:
@@ -916,6 +1556,7 @@ def import_robot_components_csv(
             "source_key": matched_source.get("key") if matched_source else None,
             "source_path": matched_source.get("folder") if matched_source else os.path.dirname(file_path),
         }]
+    stage_metrics.append(_stage_metric("discover", time.perf_counter() - started, len(csv_files)))
 
     if not csv_files:
         log_print("未发现更新的CSV文件，跳过同步")
@@ -933,7 +1574,11 @@ def import_robot_components_csv(
 
     # 步骤0：先归档上次的高风险数据（必须在导入新数据之前执行！）
     log_print("开始归档上次的高风险数据...")
+    started = time.perf_counter()
     archive_result = archive_high_risk_robots()
+    stage_metrics.append(
+        _stage_metric("archive", time.perf_counter() - started, archive_result.get("archived_count", 0))
+    )
     if not archive_result.get("success", True):
         warnings.append({
             "stage": "archive_high_risk",
@@ -945,268 +1590,58 @@ def import_robot_components_csv(
     # 全局统计信息（累加所有文件）
     total_records_created = 0
     total_records_updated = 0
+    total_records_deleted = 0
+    total_records_unchanged = 0
     total_skipped = 0
     all_shop_stats = {}  # 累加各车间统计
 
-    # 处理辅助函数（定义在循环外）
-    def safe_float(val):
-        if pd.isna(val) or val == '':
-            return None
-        if isinstance(val, str):
-            return None
-        try:
-            return float(val)
-        except (ValueError, TypeError):
-            return None
-
-    def safe_str(val):
-        if pd.isna(val):
-            return ''
-        return str(val) if val is not None else ''
-
-    def safe_int(val):
-        if pd.isna(val) or val == '':
-            return 0
-        try:
-            return int(val)
-        except (ValueError, TypeError):
-            return 0
-
     if use_mysql_load_data is None:
         use_mysql_load_data = getattr(settings, "ENABLE_MYSQL_LOAD_DATA", False)
 
-    # 循环处理每个 CSV 文件
-    batch_size = 1000
-
-    for file_idx, file_info in enumerate(csv_files, 1):
-        current_file = file_info["path"]
-        source_key = file_info.get("source_key")
-        source_path = file_info.get("source_path") or file_info.get("folder")
-        log_print(f"\n{'='*60}")
-        log_print(f"正在处理第 {file_idx}/{len(csv_files)} 个文件: {os.path.basename(current_file)}")
-        log_print(f"{'='*60}")
-
-        # 解析日期
-        week_start, week_end = parse_week_from_filename(current_file)
-        source_file = os.path.basename(current_file)
-        if week_start:
-            log_print(f"解析日期范围: {week_start} ~ {week_end}")
-
-        load_result = None
-        if use_mysql_load_data:
-            log_print("使用 MySQL LOAD DATA 进行快速导入...")
-            try:
-                load_result = _mysql_load_csv(
-                    current_file,
-                    log_print,
-                    source_key=source_key,
-                    source_path=source_path,
-                )
-            except Exception as exc:
-                log_print(f"MySQL LOAD DATA 导入失败，回退到 ORM 批量导入: {exc}")
-                load_result = None
-
-        if load_result is not None:
-            records_created = load_result["records_created"]
-            records_updated = load_result["records_updated"]
-            shop_stats = load_result["shop_stats"]
-            skipped_no_robot = load_result["skipped_no_robot"]
-            total_rows = load_result["total_rows"]
-            parsed_rows = []
-        else:
-            # 读取 CSV 文件（兼容常见中文编码）
-            log_print("正在读取CSV文件...")
-            df = None
-            read_errors = []
-            for encoding in ("utf-8", "utf-8-sig", "gb18030"):
-                try:
-                    df = pd.read_csv(current_file, encoding=encoding)
-                    log_print(f"已使用编码 {encoding} 读取CSV")
-                    break
-                except UnicodeDecodeError as e:
-                    read_errors.append(f"{encoding}: {e}")
-            if df is None:
-                raise UnicodeDecodeError(
-                    "csv",
-                    b"",
-                    0,
-                    0,
-                    "无法识别CSV编码，已尝试 utf-8/utf-8-sig/gb18030; " + "; ".join(read_errors)
-                )
-            total_rows = len(df)
-            log_print(f"读取完成，共 {total_rows} 行数据")
-
-            # 当前文件统计信息
-            records_created = 0
-            records_updated = 0
-            records_protected = 0
-            shop_stats = {}
-            skipped_no_robot = 0
-
-            log_print("开始处理数据行...")
-
-            raw_records = df.to_dict(orient="records")
-            parsed_rows = []
-            shop_names = set()
-            robots_to_replace = set()
-
-            for idx, row in enumerate(raw_records, 1):
-                shop_name = safe_str(row.get('shop', ''))
-                if not shop_name:
-                    shop_name = '未分配'
-
-                robot_val = safe_str(row.get('robot', ''))
-                if not robot_val:
-                    skipped_no_robot += 1
-                    continue
-
-                parsed_rows.append((robot_val, shop_name, row))
-                shop_names.add(shop_name)
-                robots_to_replace.add(robot_val)
-
-                if shop_name not in shop_stats:
-                    shop_stats[shop_name] = {'created': 0, 'updated': 0}
-
-                if idx % 5000 == 0:
-                    log_print(f"已预处理 {idx}/{total_rows} 行...")
-
-        if load_result is None:
-            if not parsed_rows:
-                log_print("当前文件没有有效的 robot 数据，跳过导入")
-                total_skipped += skipped_no_robot
-                continue
-
-            existing_groups = {g.key: g for g in RobotGroup.objects.filter(key__in=shop_names)}
-            missing_keys = [key for key in shop_names if key not in existing_groups]
-            if missing_keys:
-                RobotGroup.objects.bulk_create(
-                    [RobotGroup(key=key, name=key, expected_total=0) for key in missing_keys],
-                    ignore_conflicts=True,
-                    batch_size=batch_size,
-                )
-                existing_groups = {g.key: g for g in RobotGroup.objects.filter(key__in=shop_names)}
-
-            if source_key or source_path:
-                scope_desc = source_key or source_path
-                log_print(f"删除来源 {scope_desc} 下的旧数据...")
-                delete_qs = RobotComponent.objects.all()
-                if source_key:
-                    delete_qs = delete_qs.filter(source_key=source_key)
-                else:
-                    delete_qs = delete_qs.filter(source_path=source_path)
-                delete_qs.delete()
-            elif robots_to_replace:
-                log_print(f"删除当前文件涉及的 {len(robots_to_replace)} 个机器人旧数据...")
-                RobotComponent.objects.filter(robot__in=robots_to_replace).delete()
-
-            pending_create = []
-
-            for idx, (robot_val, shop_name, row) in enumerate(parsed_rows, 1):
-                group = existing_groups.get(shop_name)
-                if group is None:
-                    skipped_no_robot += 1
-                    continue
-
-                values = dict(
-                    group_id=group.id,
-                    robot=robot_val,
-                    shop=shop_name,
-                    reference=safe_str(row.get('reference', '')),
-                    number=safe_int(row.get('number', 0)),
-                    type=safe_str(row.get('type', '')),
-                    tech=safe_str(row.get('tech', '')),
-                    mark=safe_int(row.get('mark', 0)),
-                    remark=safe_str(row.get('remark', '')),
-                    level=safe_str(row.get('level', 'L')),
-                    error1_c1=safe_float(row.get('error1_c1')),
-                    tem1_m=safe_float(row.get('tem1_m')),
-                    tem2_m=safe_float(row.get('tem2_m')),
-                    tem3_m=safe_float(row.get('tem3_m')),
-                    tem4_m=safe_float(row.get('tem4_m')),
-                    tem5_m=safe_float(row.get('tem5_m')),
-                    tem6_m=safe_float(row.get('tem6_m')),
-                    tem7_m=safe_float(row.get('tem7_m')),
-                    a1_e_rate=safe_float(row.get('A1_e_rate')),
-                    a2_e_rate=safe_float(row.get('A2_e_rate')),
-                    a3_e_rate=safe_float(row.get('A3_e_rate')),
-                    a4_e_rate=safe_float(row.get('A4_e_rate')),
-                    a5_e_rate=safe_float(row.get('A5_e_rate')),
-                    a6_e_rate=safe_float(row.get('A6_e_rate')),
-                    a7_e_rate=safe_float(row.get('A7_e_rate')),
-                    a1_rms=safe_float(row.get('A1_Rms')),
-                    a2_rms=safe_float(row.get('A2_Rms')),
-                    a3_rms=safe_float(row.get('A3_Rms')),
-                    a4_rms=safe_float(row.get('A4_Rms')),
-                    a5_rms=safe_float(row.get('A5_Rms')),
-                    a6_rms=safe_float(row.get('A6_Rms')),
-                    a7_rms=safe_float(row.get('A7_Rms')),
-                    a1_e=safe_float(row.get('A1_E')),
-                    a2_e=safe_float(row.get('A2_E')),
-                    a3_e=safe_float(row.get('A3_E')),
-                    a4_e=safe_float(row.get('A4_E')),
-                    a5_e=safe_float(row.get('A5_E')),
-                    a6_e=safe_float(row.get('A6_E')),
-                    a7_e=safe_float(row.get('A7_E')),
-                    q1=safe_float(row.get('Q1')),
-                    q2=safe_float(row.get('Q2')),
-                    q3=safe_float(row.get('Q3')),
-                    q4=safe_float(row.get('Q4')),
-                    q5=safe_float(row.get('Q5')),
-                    q6=safe_float(row.get('Q6')),
-                    q7=safe_float(row.get('Q7')),
-                    curr_a1_max=safe_float(row.get('Curr_A1_max')),
-                    curr_a2_max=safe_float(row.get('Curr_A2_max')),
-                    curr_a3_max=safe_float(row.get('Curr_A3_max')),
-                    curr_a4_max=safe_float(row.get('Curr_A4_max')),
-                    curr_a5_max=safe_float(row.get('Curr_A5_max')),
-                    curr_a6_max=safe_float(row.get('Curr_A6_max')),
-                    curr_a7_max=safe_float(row.get('Curr_A7_max')),
-                    curr_a1_min=safe_float(row.get('Curr_A1_min')),
-                    curr_a2_min=safe_float(row.get('Curr_A2_min')),
-                    curr_a3_min=safe_float(row.get('Curr_A3_min')),
-                    curr_a4_min=safe_float(row.get('Curr_A4_min')),
-                    curr_a5_min=safe_float(row.get('Curr_A5_min')),
-                    curr_a6_min=safe_float(row.get('Curr_A6_min')),
-                    curr_a7_min=safe_float(row.get('Curr_A7_min')),
-                    a1=safe_str(row.get('A1')),
-                    a2=safe_str(row.get('A2')),
-                    a3=safe_str(row.get('A3')),
-                    a4=safe_str(row.get('A4')),
-                    a5=safe_str(row.get('A5')),
-                    a6=safe_str(row.get('A6')),
-                    a7=safe_str(row.get('A7')),
-                    p_change=safe_float(row.get('P_Change')),
-                    source_key=source_key,
-                    source_path=source_path,
-                )
-
-                pending_create.append(RobotComponent(**values))
-                records_created += 1
-                shop_stats[shop_name]['created'] += 1
-
-                if len(pending_create) >= batch_size:
-                    RobotComponent.objects.bulk_create(pending_create, batch_size=batch_size)
-                    pending_create = []
-
-                if idx % 5000 == 0:
-                    log_print(f"已准备 {idx}/{len(parsed_rows)} 行...")
+    import_mode = _resolve_import_mode(import_mode)
+    log_print(f"导入模式: {import_mode}")
+    if import_mode == IMPORT_MODE_DIFF and use_mysql_load_data:
+        # LOAD DATA 快速路径只支持整源替换，差异模式统一走 ORM
+        log_print("差异导入模式不使用 MySQL LOAD DATA，改用 ORM 差异写入")
+        use_mysql_load_data = False
 
-            if pending_create:
-                RobotComponent.objects.bulk_create(pending_create, batch_size=batch_size)
+    # 循环处理每个 CSV 文件（每个来源一个事务，可按来源并行）
+    batch_size = 1000
+    if workers is None:
+        workers = getattr(settings, "WEEKLY_RESULT_IMPORT_WORKERS", 1)
+    workers = max(int(workers or 1), 1)
+    import_options = dict(
+        use_mysql_load_data=use_mysql_load_data,
+        import_mode=import_mode,
+        batch_size=batch_size,
+    )
 
-        # 当前文件处理完成，累加统计到全局统计
-        log_print(f"\n文件 {os.path.basename(current_file)} 处理完成!")
-        log_print(f"  - 新增: {records_created} 条")
-        log_print(f"  - 更新: {records_updated} 条")
-        log_print(f"  - 跳过: {skipped_no_robot} 条")
+    if workers > 1 and len(csv_files) > 1 and not connection.in_atomic_block:
+        log_print(f"按来源并行导入 {len(csv_files)} 个文件，并发数: {min(workers, len(csv_files))}")
+        file_results = _import_sources_in_parallel(csv_files, workers, **import_options)
+    else:
+        file_results = []
+        for file_idx, file_info in enumerate(csv_files, 1):
+            log_print(f"\n{'='*60}")
+            log_print(f"正在处理第 {file_idx}/{len(csv_files)} 个文件: {os.path.basename(file_info['path'])}")
+            log_print(f"{'='*60}")
+            file_results.append(_import_weekly_result_file(file_info, **import_options))
+
+    for file_info, file_result in zip(csv_files, file_results):
+        stage_metrics.extend(file_result.get("stage_metrics", []))
+        total_skipped += file_result["skipped_no_robot"]
+        if not file_result["imported"]:
+            # 文件没有有效的 robot 数据，不更新导入状态
+            continue
 
         # 累加到全局统计
-        total_records_created += records_created
-        total_records_updated += records_updated
-        total_skipped += skipped_no_robot
+        total_records_created += file_result["records_created"]
+        total_records_updated += file_result["records_updated"]
+        total_records_deleted += file_result["records_deleted"]
+        total_records_unchanged += file_result["records_unchanged"]
 
         # 累加车间统计
-        for shop, stats in shop_stats.items():
+        for shop, stats in file_result["shop_stats"].items():
             if shop not in all_shop_stats:
                 all_shop_stats[shop] = {'created': 0, 'updated': 0}
             all_shop_stats[shop]['created'] += stats['created']
@@ -1214,7 +1649,7 @@ def import_robot_components_csv(
 
         _set_last_import_state(
             file_info["folder"],
-            current_file,
+            file_info["path"],
             file_info["mtime"],
         )
 
@@ -1225,13 +1660,37 @@ def import_robot_components_csv(
     log_print(f"总统计:")
     log_print(f"  - 总新增记录: {total_records_created} 条")
     log_print(f"  - 总更新记录: {total_records_updated} 条")
+    log_print(f"  - 总删除记录: {total_records_deleted} 条")
     log_print(f"  - 总跳过记录: {total_skipped} 条")
-    log_print(f"  - 总有效记录: {total_records_created + total_records_updated} 条")
+    log_print(f"  - 总未变化记录: {total_records_unchanged} 条")
+    log_print(f"  - 总有效记录: {total_records_created + total_records_updated + total_records_unchanged} 条")
     log_print("\n各车间总统计:")
     for shop, stats in sorted(all_shop_stats.items()):
         log_print(f"  - {shop}: 新增 {stats['created']} 条, 更新 {stats['updated']} 条")
     log_print(f"{'='*60}\n")
 
+    # 重建车间统计物化表，组列表接口直接按主键读取
+    from django.db.utils import DatabaseError
+    from .group_stats import rebuild_group_stats
+
+    started = time.perf_counter()
+    group_stats_rows = 0
+    try:
+        group_stats_rows = rebuild_group_stats()
+        log_print(f"车间统计已重建: {group_stats_rows} 个组")
+    except DatabaseError as exc:
+        log_print(f"车间统计重建失败: {exc}")
+    stage_metrics.append(_stage_metric("group_stats", time.perf_counter() - started, group_stats_rows))
+
+    # 重建机器人 → 来源目录索引，编辑回写 CSV 时不再逐个扫描 weeklyresult
+    from .robot_source_index import rebuild_robot_source_index
+
+    try:
+        indexed_robots = rebuild_robot_source_index()
+        log_print(f"机器人来源索引已重建: {indexed_robots} 台")
+    except Exception as exc:
+        log_print(f"机器人来源索引重建失败: {exc}")
+
     # 记录同步时间
     from django.utils import timezone
     from .models import SystemConfig
@@ -1250,7 +1709,7 @@ def import_robot_components_csv(
     first_file = csv_files[0]["path"] if csv_files else "unknown"
     first_week_start, _ = parse_week_from_filename(first_file)
 
-    RefreshLog.objects.create(
+    refresh_log = RefreshLog.objects.create(
         source=source,
         trigger="scheduled" if source == "auto" else "manual",
         status="success",
@@ -1258,18 +1717,29 @@ def import_robot_components_csv(
         file_date=first_week_start,
         records_created=total_records_created,
         records_updated=total_records_updated,
-        records_deleted=0,
-        total_records=total_records_created + total_records_updated,
+        records_deleted=total_records_deleted,
+        total_records=total_records_created + total_records_updated + total_records_unchanged,
     )
     log_print(f"已记录刷新日志: {source} 同步完成")
 
+    started = time.perf_counter()
+    reference_rows = 0
     try:
         from .tasks import _refresh_reference_dict
         log_print("开始同步 reference 字典...")
-        _refresh_reference_dict()
+        reference_result = _refresh_reference_dict() or {}
+        reference_rows = sum(
+            reference_result.get(key, 0) for key in ("records_created", "records_updated", "records_skipped")
+        )
         log_print("reference 字典同步完成")
     except Exception as exc:
         log_print(f"reference 字典同步失败: {exc}")
+    stage_metrics.append(_stage_metric("reference_dict", time.perf_counter() - started, reference_rows))
+    _save_stage_metrics(refresh_log, stage_metrics)
+
+    # robot_components 与刷新日志已更新，使缓存的只读接口响应失效
+    from .response_cache import bump_data_generation
+    bump_data_generation()
 
     return {
         'success': True,
@@ -1277,11 +1747,16 @@ def import_robot_components_csv(
         'source_file': os.path.basename(first_file),
         'records_created': total_records_created,
         'records_updated': total_records_updated,
+        'records_deleted': total_records_deleted,
+        'records_unchanged': total_records_unchanged,
         'records_protected': 0,
-        'total_records': total_records_created + total_records_updated,
+        'total_records': total_records_created + total_records_updated + total_records_unchanged,
         'shop_stats': all_shop_stats,
         'skipped_no_robot': total_skipped,
-        'total_rows': total_records_created + total_records_updated + total_skipped,
+        'total_rows': total_records_created + total_records_updated + total_records_unchanged + total_skipped,
+        'import_mode': import_mode,
         'date': first_week_start.isoformat() if first_week_start else None,
         'warnings': warnings,
+        'refresh_log_id': refresh_log.id,
+        'stage_metrics': stage_metrics,
     }